@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex Async API
+------------------
+各 endpoint wrapper 的 asyncio 版本，讓互不相依的查詢可以用
+asyncio.gather 同時送出，總耗時約等於最慢的那一個請求。
+
+可被其他 Python 檔案 import：
+    from bitfinex_async import get_funding_credits_async, get_frr_history_async
+
+    credits, frr = await asyncio.gather(
+        get_funding_credits_async("fUST"),
+        get_frr_history_async("fUST"),
+    )
+
+每個請求在 worker thread 裡執行同步版本，共用 bitfinex_client 的連線池；
+同步模組在第一次呼叫時才 import，只用公開 API 的程式不需要設定 API key。
+"""
+
+import asyncio
+
+
+async def _run(func, *args, **kwargs):
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+# ---------------------------------------------------------
+# 帳戶 / 錢包
+# ---------------------------------------------------------
+
+async def get_wallets_async():
+    from bitfinex_wallets_reader import get_wallets
+    return await _run(get_wallets)
+
+
+async def get_ledgers_async(currency="UST", category=28, wallet="funding", limit=25, start=None, end=None):
+    from bitfinex_ledgers import get_ledgers
+    return await _run(get_ledgers, currency, category, wallet, limit, start, end)
+
+
+# ---------------------------------------------------------
+# 放貸
+# ---------------------------------------------------------
+
+async def get_funding_offers_async():
+    from bitfinex_funding_active_offer import get_funding_offers
+    return await _run(get_funding_offers)
+
+
+async def get_funding_credits_async(symbol="fUSD", raw=False):
+    from bitfinex_funding_credits import get_funding_credits
+    return await _run(get_funding_credits, symbol, raw)
+
+
+async def get_funding_loans_async(symbol="fUST", raw=False):
+    from bitfinex_funding_loan import get_funding_loans
+    return await _run(get_funding_loans, symbol, raw)
+
+
+async def get_funding_info_async(symbol="fUST"):
+    from bitfinex_fundinginfo import get_funding_info
+    return await _run(get_funding_info, symbol)
+
+
+# ---------------------------------------------------------
+# 公開市場資料
+# ---------------------------------------------------------
+
+async def get_orderbook_async(symbol="fUST", precision="P1", length=25):
+    from bitfinex_orderbook import get_orderbook
+    return await _run(get_orderbook, symbol, precision, length)
+
+
+async def get_frr_history_async(symbol="fUST", limit=1):
+    from bitfinex_state import get_frr_history
+    return await _run(get_frr_history, symbol, limit)
+
+
+# ---------------------------------------------------------
+# 可直接執行測試
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+
+    async def _demo():
+        start = time.perf_counter()
+        orderbook, frr = await asyncio.gather(
+            get_orderbook_async("fUST", "P1", 25),
+            get_frr_history_async("fUST"),
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"📊 Orderbook {len(orderbook)} 筆, FRR: {frr} ({elapsed:.1f} ms)")
+
+    asyncio.run(_demo())
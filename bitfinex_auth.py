@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex Request Signer
+-----------------------
+所有需要認證的 API 共用這個簽章器：
+
+    from bitfinex_auth import get_signer
+    headers = get_signer().sign(endpoint, body)
+
+1️⃣ nonce 嚴格遞增：
+   同一個 process 內以 lock 保護，跨 process 以檔案鎖保護，
+   並把最後使用的 nonce（high-water mark）寫入檔案，
+   重新啟動或多支程式共用同一把 key 也不會出現 "nonce: small"
+2️⃣ HMAC-SHA384 物件只在建立時帶入 secret，每次簽章 copy() 後再 update
+
+nonce 檔案位置可用環境變數 BFX_NONCE_FILE 指定，
+預設為本資料夾下的 .bfx_nonce_<key 雜湊>
+"""
+
+import os
+import time
+import hmac
+import hashlib
+import threading
+from greenleaf_config import get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows：只保證同一 process 內遞增
+    fcntl = None
+
+
+# ---------------------------------------------------------
+# Nonce 來源
+# ---------------------------------------------------------
+
+class NonceSource:
+    """
+    產生嚴格遞增的毫秒 nonce
+    path 為 None 時只在記憶體中保存 high-water mark
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            now = int(time.time() * 1000)
+
+            if self._path is None:
+                nonce = max(now, self._last + 1)
+            else:
+                nonce = self._next_persisted(now)
+
+            self._last = nonce
+            return nonce
+
+    def _next_persisted(self, now):
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+
+            raw = os.read(fd, 32).strip()
+            stored = int(raw) if raw else 0
+            nonce = max(now, stored + 1, self._last + 1)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(nonce).encode("ascii"))
+            return nonce
+        finally:
+            # 關閉檔案時會一併釋放 flock
+            os.close(fd)
+
+
+# ---------------------------------------------------------
+# 簽章器
+# ---------------------------------------------------------
+
+class Signer:
+    def __init__(self, api_key, api_secret, nonce_source=None):
+        self.api_key = api_key
+        self._nonces = nonce_source or NonceSource()
+        self._mac = hmac.new(api_secret.encode("utf8"), digestmod=hashlib.sha384)
+
+    def signature(self, message):
+        mac = self._mac.copy()
+        mac.update(message.encode("utf8"))
+        return mac.hexdigest()
+
+    def sign(self, endpoint, body=None):
+        """
+        產生認證標頭
+        endpoint: 例如 "auth/r/wallets"
+        body: 實際送出的 JSON 字串（沒有 body 時為 None）
+        """
+        nonce = str(self._nonces.next())
+        message = f"/api/v2/{endpoint}{nonce}"
+
+        if body is not None:
+            message += body
+
+        return {
+            "bfx-apikey": self.api_key,
+            "bfx-nonce": nonce,
+            "bfx-signature": self.signature(message)
+        }
+
+    def ws_auth(self, filters=None):
+        """
+        WebSocket 認證訊息（authPayload = "AUTH" + nonce）
+        filters: 例如 ["funding", "wallet"]，只接收這些事件
+        """
+        nonce = str(self._nonces.next())
+        payload = f"AUTH{nonce}"
+
+        message = {
+            "event": "auth",
+            "apiKey": self.api_key,
+            "authSig": self.signature(payload),
+            "authPayload": payload,
+            "authNonce": nonce,
+        }
+        if filters:
+            message["filter"] = list(filters)
+        return message
+
+
+# ---------------------------------------------------------
+# 共用簽章器（第一次簽章時才讀取 API key）
+# ---------------------------------------------------------
+
+_signer = None
+_signer_lock = threading.Lock()
+
+
+def _default_nonce_path(api_key):
+    path = get_config().get("BFX_NONCE_FILE")
+    if path:
+        return path
+
+    key_hash = hashlib.sha256(api_key.encode("utf8")).hexdigest()[:12]
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f".bfx_nonce_{key_hash}")
+
+
+def get_signer():
+    global _signer
+
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                api_key, api_secret = get_config().require(
+                    "BFX_API_KEY", "BFX_API_SECRET",
+                    message="❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容"
+                )
+
+                nonces = NonceSource(_default_nonce_path(api_key))
+                _signer = Signer(api_key, api_secret, nonces)
+    return _signer
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    source = NonceSource()
+    nonces = [source.next() for _ in range(5)]
+    print("nonce:", nonces)
+
+    signer = Signer("demo-key", "demo-secret", source)
+    print(signer.sign("auth/r/wallets"))
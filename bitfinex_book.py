@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Funding 訂單簿（NumPy 陣列版）
+------------------------------
+get_orderbook() 回傳 list of lists，每次整理都要逐筆處理；
+FundingBook 把整本訂單簿存成一個 NumPy structured array：
+
+    欄位：rate, period, count, amount, apr（年化 %）
+
+年化、去重、找最高 APR、排序前幾名都是向量化運算，不必逐筆 append。
+
+可被其他 Python 檔案 import：
+    from bitfinex_book import FundingBook
+
+    book = FundingBook.from_raw(raw).unique_by_period()
+    best = find_max_apr(book, 30)      # bitfinex_rate_selector 可直接使用
+    top5 = get_top5_rates(book)        # bitfinex_orderbook 可直接使用
+
+需要安裝：
+    pip install numpy
+"""
+
+import numpy as np
+
+
+BOOK_DTYPE = np.dtype([
+    ("rate", "f8"),
+    ("period", "i4"),
+    ("count", "i4"),
+    ("amount", "f8"),
+    ("apr", "f8"),
+])
+
+
+def annual_rate_percent(rates):
+    """
+    日利率 → 年化百分比（四捨五入到小數第二位）
+    與 round(rate * 365 * 100, 2) 結果一致：np.round 對剛好落在 .5 附近的值
+    可能進位方向不同，這些少數值改用 Python round() 重算
+    """
+    scaled = rates * 365 * 100
+    result = np.round(scaled, 2)
+
+    frac = np.abs(scaled * 100 - np.floor(scaled * 100) - 0.5)
+    for i in np.flatnonzero(frac < 1e-6):
+        result[i] = round(float(scaled[i]), 2)
+    return result
+
+
+class FundingBook:
+    def __init__(self, data):
+        self.data = data
+
+    # -----------------------------
+    # 建立
+    # -----------------------------
+
+    @classmethod
+    def from_raw(cls, raw):
+        """
+        raw: REST / WebSocket 的原始訂單簿 [[rate, period, count, amount], ...]
+        一次算好所有年化利率
+        """
+        data = np.zeros(len(raw), dtype=BOOK_DTYPE)
+        if len(raw):
+            columns = np.asarray([row[:4] for row in raw], dtype="f8")
+            data["rate"] = columns[:, 0]
+            data["period"] = columns[:, 1]
+            data["count"] = columns[:, 2]
+            data["amount"] = columns[:, 3]
+            data["apr"] = annual_rate_percent(data["rate"])
+        return cls(data)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """rows: 已整理過的 [rate, period, count, amount, apr]"""
+        data = np.zeros(len(rows), dtype=BOOK_DTYPE)
+        if len(rows):
+            columns = np.asarray([row[:5] for row in rows], dtype="f8")
+            for i, name in enumerate(BOOK_DTYPE.names):
+                data[name] = columns[:, i]
+        return cls(data)
+
+    # -----------------------------
+    # 向量化操作
+    # -----------------------------
+
+    def unique_by_period(self):
+        """每個 period 只保留第一筆（與 unique_by_index(data, 1) 相同）"""
+        _, first = np.unique(self.data["period"], return_index=True)
+        first.sort()
+        return FundingBook(self.data[first])
+
+    def filter(self, min_period=None, max_period=None, min_amount=None):
+        mask = np.ones(len(self.data), dtype=bool)
+        if min_period is not None:
+            mask &= self.data["period"] >= min_period
+        if max_period is not None:
+            mask &= self.data["period"] <= max_period
+        if min_amount is not None:
+            mask &= np.abs(self.data["amount"]) >= min_amount
+        return FundingBook(self.data[mask])
+
+    def max_apr(self, max_days=None):
+        """年化率最高的一筆（同分取第一筆），沒有符合的回傳 None"""
+        data = self.data
+        if max_days is not None:
+            data = data[data["period"] <= max_days]
+        if len(data) == 0:
+            return None
+        return self._row(data[int(np.argmax(data["apr"]))])
+
+    def top(self, k):
+        """年化率最高的前 k 筆（同分保持原順序）"""
+        if len(self.data) == 0:
+            return []
+        order = np.argsort(-self.data["apr"], kind="stable")[:k]
+        return [self._row(item) for item in self.data[order]]
+
+    # -----------------------------
+    # 轉回 list
+    # -----------------------------
+
+    @staticmethod
+    def _row(item):
+        return [float(item["rate"]), int(item["period"]), int(item["count"]),
+                float(item["amount"]), float(item["apr"])]
+
+    def rows(self):
+        return [self._row(item) for item in self.data]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.rows())
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    raw = [
+        [0.0003965, 20, 1, -2026983.51368533],
+        [0.0003287, 120, 2, -3705002.31490664],
+        [0.0002021, 20, 1, -198984.73163536],
+        [0.0001865, 15, 1, -150447.89574246],
+    ]
+    book = FundingBook.from_raw(raw).unique_by_period()
+    print("📊 整理後：", book.rows())
+    print("📌 30 天內最高：", book.max_apr(30))
+    print("🔥 前兩名：", book.top(2))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+公開市場資料快取
+----------------
+get_orderbook / get_frr_history 每次 Telegram 查詢與每次 main.py 執行都會重新抓取；
+這裡提供 process 內的 TTL 快取（可選擇同時寫入磁碟），並且 single-flight：
+同一個 key 同時有多個請求時只送出一次 API，其他請求等待同一份結果。
+
+使用方法：
+    from bitfinex_cache import cached
+
+    @cached("book")
+    def _fetch_raw_orderbook(symbol, precision, length):
+        ...
+
+TTL（秒）可用 .env 調整，名稱為 BFX_CACHE_TTL_<NAMESPACE>：
+    BFX_CACHE_TTL_BOOK=2
+    BFX_CACHE_TTL_FUNDING_STATS=60
+設定 GREENLEAF_CACHE_DIR 時會同時寫入磁碟，讓 cron 執行的短程式也能共用。
+
+快取回傳的是同一個物件，呼叫端不可修改。
+"""
+
+import os
+import json
+import time
+import hashlib
+import inspect
+import threading
+import functools
+from greenleaf_config import get_config
+
+
+DEFAULT_TTLS = {
+    "book": 2.0,
+    "funding_stats": 60.0,
+}
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SnapshotCache:
+    def __init__(self, disk_dir=None):
+        self.disk_dir = disk_dir
+        self._entries = {}   # (namespace, key) -> (expires_at, value)
+        self._flights = {}   # (namespace, key) -> _Flight
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # 磁碟
+    # -----------------------------
+
+    def _disk_path(self, namespace, key):
+        digest = hashlib.sha1(repr(key).encode("utf8")).hexdigest()[:16]
+        return os.path.join(self.disk_dir, f"{namespace}-{digest}.json")
+
+    def _read_disk(self, namespace, key, ttl):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(namespace, key), encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - stored["ts"] > ttl:
+            return None
+        return stored
+
+    def _write_disk(self, namespace, key, value):
+        if not self.disk_dir:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(namespace, key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "value": value}, f)
+        os.replace(tmp, path)
+
+    # -----------------------------
+    # 主要功能
+    # -----------------------------
+
+    def get_or_fetch(self, namespace, key, fetch, ttl):
+        """
+        快取未過期時直接回傳；否則由第一個請求呼叫 fetch()，
+        同時間其他相同 key 的請求等待並共用結果（錯誤也一併傳回，但不快取）
+        """
+        cache_key = (namespace, key)
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            flight = self._flights.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[cache_key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            stored = self._read_disk(namespace, key, ttl)
+            if stored is not None:
+                value = stored["value"]
+                expires = time.monotonic() + ttl - (time.time() - stored["ts"])
+            else:
+                value = fetch()
+                expires = time.monotonic() + ttl
+                self._write_disk(namespace, key, value)
+
+            with self._lock:
+                self._entries[cache_key] = (expires, value)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[cache_key]
+            flight.done.set()
+
+    def invalidate(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[cache_key]
+
+
+# ---------------------------------------------------------
+# 共用快取與 decorator
+# ---------------------------------------------------------
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SnapshotCache(get_config().get("GREENLEAF_CACHE_DIR"))
+    return _cache
+
+
+def get_ttl(namespace):
+    return get_config().get_float(f"BFX_CACHE_TTL_{namespace.upper()}", DEFAULT_TTLS.get(namespace, 5.0))
+
+
+def cached(namespace, ttl=None):
+    """
+    以函式參數（含預設值）為 key 快取回傳值
+    ttl 未指定時使用 get_ttl(namespace)
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+
+            seconds = get_ttl(namespace) if ttl is None else ttl
+            if seconds <= 0:
+                return func(*args, **kwargs)
+            return get_cache().get_or_fetch(namespace, key, lambda: func(*args, **kwargs), seconds)
+
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    calls = []
+
+    @cached("demo", ttl=1.0)
+    def slow_fetch(symbol="fUST"):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return {"symbol": symbol}
+
+    threads = [threading.Thread(target=slow_fetch) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print("10 個同時請求，實際呼叫次數：", len(calls))
+    slow_fetch("fUST")
+    print("TTL 內再次請求，實際呼叫次數：", len(calls))
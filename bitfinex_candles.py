@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex Public API – Candles（funding 利率 K 線）
+https://docs.bitfinex.com/reference/rest-public-candles
+
+funding 的 candle key 需要指定期間：
+    trade:1m:fUST:p2          只看 2 天期
+    trade:1m:fUST:a30:p2:p30  2 ~ 30 天期的彙總
+
+candle array：
+[MTS, OPEN, CLOSE, HIGH, LOW, VOLUME]
+OPEN / CLOSE / HIGH / LOW 為日利率；沒有成交的時間不會有 candle
+
+可被其他 Python 檔案 import：
+    from bitfinex_candles import get_candles, candle_key
+
+    rows = get_candles(candle_key("fUST", "1m", "a30:p2:p30"), start=..., end=...)
+"""
+
+from bitfinex_client import get_api_url, http_get
+
+# timeframe → 毫秒
+TIMEFRAMES = {
+    "1m": 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 3600 * 1000,
+    "3h": 3 * 3600 * 1000,
+    "6h": 6 * 3600 * 1000,
+    "12h": 12 * 3600 * 1000,
+    "1D": 86400 * 1000,
+    "1W": 7 * 86400 * 1000,
+    "14D": 14 * 86400 * 1000,
+}
+
+PAGE_LIMIT = 10000   # 單頁上限
+
+
+def candle_key(symbol="fUST", timeframe="1m", period="a30:p2:p30"):
+    if timeframe not in TIMEFRAMES:
+        raise Exception(f"❌ 不支援的 timeframe：{timeframe}（可用 {' / '.join(TIMEFRAMES)}）")
+    return f"trade:{timeframe}:{symbol}:{period}"
+
+
+def parse_key(key):
+    """"trade:1m:fUST:a30:p2:p30" → ("1m", "fUST", "a30:p2:p30")"""
+    _, timeframe, symbol, period = key.split(":", 3)
+    return timeframe, symbol, period
+
+
+def get_candles(key, start=None, end=None, limit=PAGE_LIMIT):
+    """
+    查詢 start <= MTS <= end 的 candles（新 → 舊，最多 limit 筆）
+    """
+    params = {"limit": limit}
+    if start is not None:
+        params["start"] = start
+    if end is not None:
+        params["end"] = end
+
+    resp = http_get(get_api_url(public=True) + f"/candles/{key}/hist", params=params)
+    resp.raise_for_status()
+    return resp.json()
+
+
+# 測試用
+if __name__ == "__main__":
+    rows = get_candles(candle_key(), limit=5)
+    for mts, open_, close, high, low, volume in rows:
+        print(mts, f"close 年化 {close * 365 * 100:.2f}%", f"volume {volume:.2f}")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex 共用 HTTP Client
+--------------------------
+所有 bitfinex_*.py 的 API 呼叫都經過這裡，共用同一個 requests.Session，
+讓 api.bitfinex.com 的 TCP + TLS 連線可以 keep-alive 重複使用，
+不必每次呼叫都重新握手。
+
+可被其他 Python 檔案 import：
+    from bitfinex_client import http_get, http_post, auth_post
+
+可用環境變數或 .env 調整：
+    BFX_API_URL                認證 API 網址（預設 https://api.bitfinex.com/v2）
+    BFX_API_PUB_URL            公開 API 網址（預設 https://api-pub.bitfinex.com/v2）
+    BFX_WS_URL / BFX_WS_PUB_URL  WebSocket 網址（bitfinex_ws_account / bitfinex_ws_book）
+    BFX_RATE_LIMIT             設為 0 時不經過 bitfinex_ratelimit（只用於本地測試伺服器）
+    BFX_HTTP_CONNECT_TIMEOUT   連線逾時秒數（預設 5）
+    BFX_HTTP_READ_TIMEOUT      讀取逾時秒數（預設 15）
+    BFX_HTTP_POOL_CONNECTIONS  連線池數量（每個 host 一個，預設 4）
+    BFX_HTTP_POOL_MAXSIZE      每個 host 最多保留的連線數（預設 16）
+    BFX_HTTP_MAX_RETRIES       429 / 5xx 最多重試次數（預設 3）
+    BFX_HTTP_BACKOFF_BASE      第一次重試前等待秒數，之後每次加倍（預設 0.5）
+    BFX_HTTP_BACKOFF_MAX       單次等待上限秒數（預設 8）
+    BFX_NONCE_RETRY_SECONDS    "nonce: small" 持續重送的時間上限（秒，預設 30）
+
+送出 Bitfinex 請求前會先向 bitfinex_ratelimit 取得 token；
+429 一律重試，5xx 只重試讀取類請求（GET 與 auth/r/），避免重複掛單。
+平行送出的認證請求可能不照 nonce 順序抵達而被拒絕（"nonce: small"），
+被拒絕的請求不會執行，auth_post 會重新簽章再送，直到成功或超過 BFX_NONCE_RETRY_SECONDS 秒
+（不限次數：同時送出的筆數越多，越容易連續被拒絕）。
+
+離線測試時把網址指向 bitfinex_fake_server 即可，不必修改任何模組。
+"""
+
+import json
+import time
+import random
+import threading
+from bitfinex_ratelimit import get_rate_limiter
+from greenleaf_config import get_config
+
+
+API = "https://api.bitfinex.com/v2"
+API_PUB = "https://api-pub.bitfinex.com/v2"
+WS = "wss://api.bitfinex.com/ws/2"
+WS_PUB = "wss://api-pub.bitfinex.com/ws/2"
+
+_session = None
+_settings = None
+_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+# 設定
+# ---------------------------------------------------------
+
+def _default_settings():
+    config = get_config()
+    return {
+        "connect_timeout": config.get_float("BFX_HTTP_CONNECT_TIMEOUT", 5.0),
+        "read_timeout": config.get_float("BFX_HTTP_READ_TIMEOUT", 15.0),
+        "pool_connections": config.get_int("BFX_HTTP_POOL_CONNECTIONS", 4),
+        "pool_maxsize": config.get_int("BFX_HTTP_POOL_MAXSIZE", 16),
+        "max_retries": config.get_int("BFX_HTTP_MAX_RETRIES", 3),
+        "backoff_base": config.get_float("BFX_HTTP_BACKOFF_BASE", 0.5),
+        "backoff_max": config.get_float("BFX_HTTP_BACKOFF_MAX", 8.0),
+        "rate_limit": config.get("BFX_RATE_LIMIT", "1") != "0",
+        "nonce_retry_seconds": config.get_float("BFX_NONCE_RETRY_SECONDS", 30.0),
+    }
+
+
+def get_api_url(public=False):
+    """REST 網址（結尾沒有 /）"""
+    if public:
+        return get_config().get("BFX_API_PUB_URL", API_PUB).rstrip("/")
+    return get_config().get("BFX_API_URL", API).rstrip("/")
+
+
+def get_ws_url(public=False):
+    if public:
+        return get_config().get("BFX_WS_PUB_URL", WS_PUB)
+    return get_config().get("BFX_WS_URL", WS)
+
+
+def configure(connect_timeout=None, read_timeout=None, pool_connections=None, pool_maxsize=None,
+              max_retries=None, backoff_base=None, backoff_max=None):
+    """
+    調整逾時、連線池大小與重試設定
+    未指定的參數沿用環境變數 / 預設值；已建立的 Session 會被關閉並重建
+    """
+    global _settings, _session
+
+    with _lock:
+        settings = _default_settings() if _settings is None else dict(_settings)
+        overrides = {
+            "connect_timeout": connect_timeout,
+            "read_timeout": read_timeout,
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "max_retries": max_retries,
+            "backoff_base": backoff_base,
+            "backoff_max": backoff_max,
+        }
+        for key, value in overrides.items():
+            if value is not None:
+                settings[key] = value
+
+        _settings = settings
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _new_session(settings):
+    # 延後 import：只 import 模組、沒有實際呼叫 API 的程式不必載入 requests
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings["pool_connections"],
+        pool_maxsize=settings["pool_maxsize"],
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """取得共用 Session（第一次呼叫時才建立）"""
+    global _session, _settings
+
+    if _session is None:
+        with _lock:
+            if _settings is None:
+                _settings = _default_settings()
+            if _session is None:
+                _session = _new_session(_settings)
+    return _session
+
+
+def close():
+    """關閉共用 Session 與所有保留中的連線"""
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ---------------------------------------------------------
+# 主要 API 函式（給其他檔案呼叫）
+# ---------------------------------------------------------
+
+def _endpoint_of(url):
+    """從完整網址取出 endpoint（例如 "book/fUST/P1"），非 Bitfinex 網址回傳 None"""
+    for base in (get_api_url(), get_api_url(public=True)):
+        if url.startswith(base + "/"):
+            return url[len(base) + 1:]
+    return None
+
+
+def _backoff_delay(attempt, response):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), _settings["backoff_max"])
+        except ValueError:
+            pass
+
+    delay = _settings["backoff_base"] * (2 ** attempt)
+    return min(delay, _settings["backoff_max"]) * random.uniform(0.8, 1.2)
+
+
+def _nonce_rejected(response):
+    return response.status_code >= 400 and "nonce: small" in response.text
+
+
+def _send(method, url, build_kwargs, priority=None, retry_nonce=False):
+    """
+    送出請求並處理 rate limit 與重試
+    build_kwargs: 每次嘗試都會重新呼叫（簽章請求需要新的 nonce）
+    retry_nonce: 被以 "nonce: small" 拒絕時重新簽章再送，直到超過 nonce_retry_seconds
+    """
+    session = get_session()
+    endpoint = _endpoint_of(url)
+    limiter = get_rate_limiter() if endpoint is not None and _settings["rate_limit"] else None
+    retry_server_errors = method == "GET" or (endpoint or "").startswith("auth/r/")
+
+    attempt = 0
+    nonce_deadline = time.monotonic() + _settings["nonce_retry_seconds"]
+    while True:
+        kwargs = build_kwargs()
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = (_settings["connect_timeout"], _settings["read_timeout"])
+
+        if limiter is not None:
+            limiter.acquire(endpoint, priority)
+
+        response = session.request(method, url, **kwargs)
+
+        if retry_nonce and _nonce_rejected(response) and time.monotonic() < nonce_deadline:
+            # 稍微錯開，避免同一批請求再次同時抵達
+            time.sleep(random.uniform(0, 0.05))
+            continue
+
+        status = response.status_code
+        retryable = status == 429 or (status >= 500 and retry_server_errors)
+        if not retryable or attempt >= _settings["max_retries"]:
+            return response
+
+        delay = _backoff_delay(attempt, response)
+        if status == 429 and limiter is not None:
+            limiter.penalize(endpoint, delay)
+
+        time.sleep(delay)
+        attempt += 1
+
+
+def http_request(method, url, priority=None, **kwargs):
+    """
+    透過共用 Session 發送請求
+    未指定 timeout 時使用 (connect_timeout, read_timeout)
+    priority: bitfinex_ratelimit.PRIORITY_*，未指定時依 endpoint 判斷
+    """
+    return _send(method, url, lambda: dict(kwargs), priority)
+
+
+def http_get(url, **kwargs):
+    return http_request("GET", url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return http_request("POST", url, **kwargs)
+
+
+def auth_post(endpoint, payload=None, priority=None, **kwargs):
+    """
+    發送需要認證的 POST 請求
+    endpoint: 例如 "auth/r/wallets"
+    payload: dict 或 None；序列化一次，簽章與送出使用同一份字串
+    """
+    from bitfinex_auth import get_signer
+
+    body = json.dumps(payload) if payload is not None else None
+    signer = get_signer()
+
+    def build_kwargs():
+        # 每次嘗試重新簽章，重試時 nonce 仍然遞增
+        headers = {
+            "Content-Type": "application/json",
+            **signer.sign(endpoint, body)
+        }
+        return {"headers": headers, "data": body, **kwargs}
+
+    return _send("POST", f"{get_api_url()}/{endpoint}", build_kwargs, priority, retry_nonce=True)
+
+
+# ---------------------------------------------------------
+# 可直接執行測試
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+
+    for i in range(3):
+        start = time.perf_counter()
+        resp = http_get(f"{get_api_url()}/platform/status")
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"第 {i+1} 次: {resp.status_code} {resp.text} ({elapsed:.1f} ms)")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Funding 訂單簿深度計算
+----------------------
+main.py 原本只挑一個最高利率，把每筆 200 UST 都掛在同一個利率，
+沒有考慮該利率的借款需求夠不夠吃下全部金額。
+
+DepthLadder 對 get_orderbook() 的結果（list、FundingBook 或原始訂單簿皆可）
+預先計算各利率層的累積金額（prefix sums），之後：
+
+1️⃣ fill_rate(X, max_period)：
+   借款需求（bid，amount < 0）由高利率往下累積，
+   回傳能讓 X UST 立即成交的最高利率層 (rate, period)
+2️⃣ queue_rate(N, max_period)：
+   放貸掛單（ask，amount > 0）由低利率往上累積，
+   回傳排在前面的金額不超過 N UST 的最高利率層 (rate, period)
+3️⃣ price_chunks(chunks, max_period)：
+   一次走過整本訂單簿，替每一筆分批金額算出成交利率，不必額外呼叫 API
+
+每個 max_period 的 prefix sums 只計算一次。
+
+使用方法：
+    from bitfinex_depth import DepthLadder
+    ladder = DepthLadder(orderbook)
+    priced = ladder.price_chunks([200, 200, 250], max_period=30)
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+
+class DepthLadder:
+    def __init__(self, orderbook):
+        rows = [item for item in orderbook if len(item) >= 4]
+        self._bids = sorted((item for item in rows if item[3] < 0), key=lambda x: x[0], reverse=True)
+        self._asks = sorted((item for item in rows if item[3] > 0), key=lambda x: x[0])
+        self._cache = {}
+
+    def _side(self, side, max_period):
+        """回傳 (levels, 累積金額)，依 max_period 篩選後快取"""
+        key = (side, max_period)
+        if key not in self._cache:
+            levels = self._bids if side == "bid" else self._asks
+            if max_period is not None:
+                levels = [item for item in levels if item[1] <= max_period]
+            cumulative = list(accumulate(abs(item[3]) for item in levels))
+            self._cache[key] = (levels, cumulative)
+        return self._cache[key]
+
+    # -----------------------------
+    # 單筆查詢
+    # -----------------------------
+
+    def bid_depth(self, max_period=None):
+        """period <= max_period 的借款需求總額"""
+        _, cumulative = self._side("bid", max_period)
+        return cumulative[-1] if cumulative else 0.0
+
+    def fill_rate(self, amount, max_period=None):
+        """能讓 amount 立即全部成交的最高利率層，深度不足時回傳 None"""
+        levels, cumulative = self._side("bid", max_period)
+        i = bisect_left(cumulative, amount)
+        if i >= len(levels):
+            return None
+        return levels[i][0], levels[i][1]
+
+    def queue_rate(self, ahead, max_period=None):
+        """
+        排在前面的放貸金額 <= ahead 的最高利率層
+        （掛在該層時，前面有該層及更低利率的所有掛單）
+        連第一層都超過 ahead 時回傳 None
+        """
+        levels, cumulative = self._side("ask", max_period)
+        i = bisect_right(cumulative, ahead) - 1
+        if i < 0:
+            return None
+        return levels[i][0], levels[i][1]
+
+    # -----------------------------
+    # 批次查詢
+    # -----------------------------
+
+    def price_chunks(self, chunks, max_period=None):
+        """
+        chunks: 依序要掛出的金額，例如 [200, 200, 250]
+        回傳與 chunks 相同順序的 list，每筆為
+            {"amount": ..., "rate": ..., "period": ..., "cumulative": ...}
+        超出借款需求深度的部分 rate / period 為 None，由呼叫端決定備用利率
+        """
+        levels, cumulative = self._side("bid", max_period)
+
+        result = []
+        level = 0
+        total = 0.0
+        for amount in chunks:
+            total += amount
+            while level < len(levels) and cumulative[level] < total:
+                level += 1
+
+            if level < len(levels):
+                rate, period = levels[level][0], levels[level][1]
+            else:
+                rate, period = None, None
+
+            result.append({"amount": amount, "rate": rate, "period": period, "cumulative": total})
+        return result
+
+    def query_many(self, queries, max_period=None):
+        """
+        queries: [("fill", X) 或 ("queue", N), ...]
+        回傳與 queries 相同順序的 (rate, period) 或 None
+        """
+        answers = []
+        for kind, value in queries:
+            if kind == "fill":
+                answers.append(self.fill_rate(value, max_period))
+            elif kind == "queue":
+                answers.append(self.queue_rate(value, max_period))
+            else:
+                raise ValueError(f"❌ 未知的查詢類型：{kind}")
+        return answers
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    sample_book = [
+        [0.0003965, 20, 1, -300, 14.47],
+        [0.0003287, 120, 2, -3705002.31490664, 12.0],
+        [0.0002021, 30, 1, -500, 7.38],
+        [0.0001865, 15, 1, -150447.89574246, 6.81],
+        [0.0001, 2, 3, 5000, 3.65],
+        [0.00012, 7, 1, 20000, 4.38],
+    ]
+
+    ladder = DepthLadder(sample_book)
+    print("📌 30 天內借款需求：", ladder.bid_depth(30))
+    print("📌 600 UST 立即成交利率：", ladder.fill_rate(600, 30))
+    print("📌 排隊前面 <= 10000 UST：", ladder.queue_rate(10000))
+    for chunk in ladder.price_chunks([200, 200, 250], max_period=30):
+        print(chunk)
@@ -0,0 +1,909 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex 本地測試伺服器
+----------------------
+所有模組都直接打正式 API，沒辦法離線測試，也沒辦法壓測掛單流程。
+FakeBitfinex 在本機模擬 GreenLeaf 用到的 REST 與 WebSocket：
+
+REST（http://127.0.0.1:<port>/v2）
+    公開：platform/status、book/{symbol}/{prec}、funding/stats/{symbol}/hist
+    認證：auth/r/wallets、auth/r/funding/offers/{symbol}、auth/r/funding/credits/{symbol}、
+          auth/r/funding/loans/{symbol}、auth/r/ledgers/{currency}/hist、auth/r/info/funding/{symbol}、
+          auth/w/funding/offer/submit、auth/w/funding/offer/cancel、auth/w/funding/offer/cancel/all
+WebSocket（ws://127.0.0.1:<ws_port>/ws/2）
+    book channel（snapshot、增量更新、checksum）、認證 channel 0（ws / wu、fos / fon / fou / foc、fcs / fcn / fcc、fls）
+
+1️⃣ 簽章驗證：與 Bitfinex 相同的 HMAC-SHA384，nonce 必須遞增（否則回傳 "nonce: small"）
+2️⃣ 延遲注入：每個請求延遲 latency 秒（對數常態分布，latency_sigma 控制離散程度），
+   可另外用 error_rate 隨機回傳 5xx
+3️⃣ 簡單撮合：
+   - 借款需求（bid）與其他人的放貸掛單（ask）隨機產生，利率跟著基準利率隨機漂移
+   - 同天數、借款利率 >= 放貸利率即成交，放貸利率低的先成交
+   - 成交後變成 credit，每 1 天（模擬時間）支付利息（寫入 ledgers），到期後本金回到可用餘額
+   - time_scale 可加速放貸週期（例如 86400 = 每秒算一天；時間戳記仍是真實時間）
+
+使用方式：
+    python3 greenleaf.py fake-server --latency 0.08
+    # 依照輸出的設定寫入 .env（或環境變數），所有程式就會改連本地伺服器
+
+    python3 greenleaf.py fake-server --bench 500   # 壓測批次掛單
+
+在 Python 裡使用：
+    from bitfinex_fake_server import FakeBitfinex
+
+    with FakeBitfinex(latency=0.05) as server:
+        os.environ.update(server.env())
+        ...
+
+需要安裝：
+    pip install websockets
+"""
+
+import hmac
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import itertools
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+DAY_MS = 86400 * 1000
+PERIODS = (2, 3, 4, 5, 7, 10, 14, 15, 20, 30, 60, 90, 120)
+MIN_OFFER = 150          # 最低掛單金額
+LENDING_FEE = 0.15       # 利息手續費
+MAX_LEVELS = 200         # 每一邊最多保留的價位
+
+
+class FakeApiError(Exception):
+    def __init__(self, code, message, status=500):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+# ---------------------------------------------------------
+# 交易所狀態與撮合
+# ---------------------------------------------------------
+
+class FakeExchange:
+    def __init__(self, balance=10000.0, currency="UST", base_rate=0.0003, time_scale=1.0, seed=None):
+        self.currency = currency
+        self.symbol = "f" + currency
+        self.base_rate = base_rate
+        self.day_ms = DAY_MS / time_scale   # 放貸週期的「一天」（真實毫秒）
+
+        self.balance = balance
+        self.available = balance
+        self.bids = {}        # (rate, period) -> 借款金額
+        self.asks = {}        # (rate, period) -> 其他人的放貸金額
+        self.offers = {}      # id -> 我們的掛單 dict
+        self.credits = {}     # id -> 我們的放貸 dict
+        self.ledgers = []
+        self.stats = []
+        self.listeners = []   # callback(event, data)；event 為帳戶事件代碼或 "book"
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(int(time.time()))
+        self._lock = threading.RLock()
+
+        for _ in range(60):
+            self._add_bid()
+            self._add_ask()
+        self._record_stats()
+
+    # -----------------------------
+    # 時間 / 事件
+    # -----------------------------
+
+    @staticmethod
+    def now_ms():
+        return int(time.time() * 1000)
+
+    def _emit(self, event, data=None):
+        for listener in self.listeners:
+            listener(event, data)
+
+    # -----------------------------
+    # 陣列格式（與 Bitfinex 相同欄位）
+    # -----------------------------
+
+    def wallet_arrays(self):
+        return [
+            ["exchange", self.currency, 0.0, 0, 0.0, None, None],
+            ["funding", self.currency, round(self.balance, 8), 0, round(self.available, 8), None, None],
+        ]
+
+    @staticmethod
+    def offer_array(offer):
+        return [
+            offer["id"], offer["symbol"], offer["mts_create"], offer["mts_update"],
+            round(offer["amount"], 8), offer["amount_orig"], offer["type"], None, None,
+            offer["flags"], offer["status"], None, None, None,
+            offer["rate"], offer["period"], False, False, None, False, None,
+        ]
+
+    @staticmethod
+    def credit_array(credit):
+        return [
+            credit["id"], credit["symbol"], 1, credit["mts_create"], credit["mts_update"],
+            credit["amount"], 0, credit["status"], "FIXED", None, None,
+            credit["rate"], credit["period"], credit["mts_opening"], credit["mts_last_payout"],
+            False, False, None, False, None, False, None,
+        ]
+
+    # -----------------------------
+    # 市場（隨機產生借款需求與其他人的掛單）
+    # -----------------------------
+
+    def _period_rate(self, period, spread=0.0):
+        # 天數越長利率越高一點
+        factor = 1 + 0.05 * math.log(period)
+        return round(self.base_rate * factor * self._random.lognormvariate(spread, 0.15), 8)
+
+    def _random_period(self):
+        return self._random.choices(PERIODS, weights=[12, 6, 4, 4, 6, 3, 2, 2, 2, 5, 1, 1, 2])[0]
+
+    def _add_bid(self):
+        period = self._random_period()
+        key = (self._period_rate(period, -0.1), period)
+        self.bids[key] = self.bids.get(key, 0.0) + round(self._random.lognormvariate(7.5, 1.0), 2)
+
+    def _add_ask(self):
+        period = self._random_period()
+        key = (self._period_rate(period, 0.1), period)
+        self.asks[key] = self.asks.get(key, 0.0) + round(self._random.lognormvariate(8.0, 1.0), 2)
+
+    def _trim(self):
+        """每一邊只保留最接近成交的 MAX_LEVELS 個價位"""
+        if len(self.bids) > MAX_LEVELS:
+            for key in sorted(self.bids, key=lambda k: k[0])[:len(self.bids) - MAX_LEVELS]:
+                del self.bids[key]
+        if len(self.asks) > MAX_LEVELS:
+            for key in sorted(self.asks, key=lambda k: -k[0])[:len(self.asks) - MAX_LEVELS]:
+                del self.asks[key]
+
+    def book(self, length=25):
+        """
+        與 REST book/{symbol}/P* 相同：bids（利率高→低）之後接 asks（利率低→高）
+        [RATE, PERIOD, COUNT, AMOUNT]，AMOUNT < 0 為借款需求
+        """
+        with self._lock:
+            bids = sorted(self.bids.items(), key=lambda item: -item[0][0])[:length]
+
+            asks = {}
+            for (rate, period), amount in self.asks.items():
+                asks[(rate, period)] = [1, amount]
+            for offer in self.offers.values():
+                level = asks.setdefault((offer["rate"], offer["period"]), [0, 0.0])
+                level[0] += 1
+                level[1] += offer["amount"]
+            asks = sorted(asks.items(), key=lambda item: item[0][0])[:length]
+
+        return (
+            [[rate, period, 1, -round(amount, 8)] for (rate, period), amount in bids]
+            + [[rate, period, count, round(amount, 8)] for (rate, period), (count, amount) in asks]
+        )
+
+    # -----------------------------
+    # 撮合
+    # -----------------------------
+
+    def _open_credit(self, offer, amount, now):
+        credit = {
+            "id": next(self._ids),
+            "symbol": offer["symbol"],
+            "mts_create": now,
+            "mts_update": now,
+            "amount": round(amount, 8),
+            "status": "ACTIVE",
+            "rate": offer["rate"],
+            "period": offer["period"],
+            "mts_opening": now,
+            "mts_last_payout": now,
+        }
+        self.credits[credit["id"]] = credit
+        self._emit("fcn", self.credit_array(credit))
+
+    def _fill_offer(self, offer, amount, now):
+        offer["amount"] -= amount
+        offer["mts_update"] = now
+        self._open_credit(offer, amount, now)
+
+        if offer["amount"] <= 1e-8:
+            offer["amount"] = 0.0
+            offer["status"] = f"EXECUTED at {offer['rate']}"
+            del self.offers[offer["id"]]
+            self._emit("foc", self.offer_array(offer))
+        else:
+            offer["status"] = "PARTIALLY FILLED"
+            self._emit("fou", self.offer_array(offer))
+
+    def _match_offer(self, offer, now):
+        """新掛單：和利率 >= 掛單利率、同天數的借款需求成交（利率高的先）"""
+        keys = sorted(
+            (key for key in self.bids if key[1] == offer["period"] and key[0] >= offer["rate"]),
+            key=lambda k: -k[0],
+        )
+        for key in keys:
+            if offer["id"] not in self.offers:
+                break
+            amount = min(self.bids[key], offer["amount"])
+            self.bids[key] -= amount
+            if self.bids[key] <= 1e-8:
+                del self.bids[key]
+            self._fill_offer(offer, amount, now)
+
+    def _match_bid(self, rate, period, amount, now):
+        """新的借款需求：吃掉同天數、利率 <= rate 的掛單（利率低的先，同利率先掛先成交）"""
+        candidates = [(key[0], 1, 0, key) for key in self.asks if key[1] == period and key[0] <= rate]
+        candidates += [(offer["rate"], 0, offer["mts_create"], offer["id"]) for offer in self.offers.values()
+                       if offer["period"] == period and offer["rate"] <= rate]
+        candidates.sort()
+
+        for ask_rate, synthetic, _, key in candidates:
+            if amount <= 1e-8:
+                break
+            if synthetic:
+                taken = min(self.asks[key], amount)
+                self.asks[key] -= taken
+                if self.asks[key] <= 1e-8:
+                    del self.asks[key]
+            else:
+                offer = self.offers[key]
+                taken = min(offer["amount"], amount)
+                self._fill_offer(offer, taken, now)
+            amount -= taken
+
+        if amount > 1e-8:
+            key = (rate, period)
+            self.bids[key] = self.bids.get(key, 0.0) + amount
+
+    # -----------------------------
+    # 帳戶操作（REST）
+    # -----------------------------
+
+    def submit_offer(self, payload):
+        try:
+            amount = float(payload["amount"])
+            rate = float(payload["rate"])
+            period = int(payload["period"])
+        except (KeyError, TypeError, ValueError):
+            raise FakeApiError(10020, "amount, rate and period are required")
+
+        symbol = payload.get("symbol", self.symbol)
+        if symbol != self.symbol:
+            raise FakeApiError(10020, f"symbol: invalid ({symbol})")
+        if amount < MIN_OFFER:
+            raise FakeApiError(10001, f"Invalid offer: incorrect amount, minimum is {MIN_OFFER} dollar or equivalent in USD")
+        if not 2 <= period <= 120:
+            raise FakeApiError(10001, "Invalid period: must be between 2 and 120")
+        if rate <= 0:
+            raise FakeApiError(10001, "Invalid rate")
+
+        with self._lock:
+            if amount > self.available + 1e-8:
+                raise FakeApiError(10001, f"Invalid offer: not enough balance (available {self.available:.2f})")
+
+            now = self.now_ms()
+            offer = {
+                "id": next(self._ids),
+                "symbol": symbol,
+                "mts_create": now,
+                "mts_update": now,
+                "amount": amount,
+                "amount_orig": amount,
+                "type": payload.get("type", "LIMIT"),
+                "flags": int(payload.get("flags", 0)),
+                "status": "ACTIVE",
+                "rate": rate,
+                "period": period,
+            }
+            self.offers[offer["id"]] = offer
+            self.available -= amount
+            self._emit("fon", self.offer_array(offer))
+            self._emit("wu", self.wallet_arrays()[1])
+
+            self._match_offer(offer, now)
+            self._emit("book")
+
+            text = f"Submitting funding offer of {amount} {self.currency} at {rate:.8f} for {period} days."
+            return [now, "fon-req", None, None, self.offer_array(offer), None, "SUCCESS", text]
+
+    def _cancel(self, offer, now):
+        del self.offers[offer["id"]]
+        self.available += offer["amount"]
+        offer["status"] = "CANCELED"
+        offer["mts_update"] = now
+        self._emit("foc", self.offer_array(offer))
+
+    def cancel_offer(self, payload):
+        with self._lock:
+            offer = self.offers.get(int(payload.get("id", 0)))
+            if offer is None:
+                raise FakeApiError(10001, "Offer not found")
+            now = self.now_ms()
+            self._cancel(offer, now)
+            self._emit("wu", self.wallet_arrays()[1])
+            self._emit("book")
+            return [now, "foc-req", None, None, self.offer_array(offer), None, "SUCCESS",
+                    f"Cancelled funding offer #{offer['id']}"]
+
+    def cancel_all(self, payload):
+        currency = (payload or {}).get("currency")
+        with self._lock:
+            now = self.now_ms()
+            if currency in (None, self.currency):
+                for offer in list(self.offers.values()):
+                    self._cancel(offer, now)
+                self._emit("wu", self.wallet_arrays()[1])
+                self._emit("book")
+            return [now, "foc_all-req", None, None, None, None, "SUCCESS", "None"]
+
+    def list_offers(self):
+        with self._lock:
+            return [self.offer_array(offer) for offer in self.offers.values()]
+
+    def list_credits(self):
+        with self._lock:
+            return [self.credit_array(credit) for credit in self.credits.values()]
+
+    def query_ledgers(self, payload):
+        payload = payload or {}
+        category = payload.get("category")
+        start, end = payload.get("start"), payload.get("end")
+        limit = min(int(payload.get("limit", 25)), 2500)
+
+        with self._lock:
+            rows = [
+                row for row in reversed(self.ledgers)
+                if (category in (None, 28))
+                and (start is None or row[3] >= start)
+                and (end is None or row[3] <= end)
+            ]
+        return rows[:limit]
+
+    def funding_info(self):
+        with self._lock:
+            credits = list(self.credits.values())
+        total = sum(c["amount"] for c in credits)
+        if not total:
+            return ["sym", self.symbol, [0, 0, 0, 0]]
+        now = self.now_ms()
+        rate = sum(c["amount"] * c["rate"] for c in credits) / total
+        remaining = sum(c["amount"] * (c["mts_opening"] + c["period"] * self.day_ms - now) for c in credits) / total
+        return ["sym", self.symbol, [0, rate, 0, round(remaining / self.day_ms, 4)]]
+
+    def query_stats(self, params):
+        start, end = params.get("start"), params.get("end")
+        limit = min(int(params.get("limit", 10)), 250)
+        with self._lock:
+            rows = [
+                row for row in reversed(self.stats)
+                if (start is None or row[0] >= int(start)) and (end is None or row[0] <= int(end))
+            ]
+        return rows[:limit]
+
+    # -----------------------------
+    # 時間推進
+    # -----------------------------
+
+    def _record_stats(self):
+        volume = sum(self.bids.values())
+        frr = sum(rate * amount for (rate, _), amount in self.bids.items()) / volume if volume else self.base_rate
+        used = sum(c["amount"] for c in self.credits.values())
+        avg_period = sum(period * amount for (_, period), amount in self.bids.items()) / volume if volume else 0
+        self.stats.append([
+            self.now_ms(), None, None, round(frr, 10), round(avg_period, 4), None, None,
+            round(sum(self.asks.values()) + used, 2), round(used, 2), None, None, 0,
+        ])
+        del self.stats[:-10000]
+
+    def _settle_credits(self, now):
+        changed = False
+        for credit in list(self.credits.values()):
+            due = credit["mts_opening"] + int(credit["period"] * self.day_ms)
+            payout_at = min(due, now)
+
+            # 每滿一天（或到期時）支付一次利息
+            if payout_at - credit["mts_last_payout"] >= self.day_ms or payout_at == due:
+                days = (payout_at - credit["mts_last_payout"]) / self.day_ms
+                interest = round(credit["amount"] * credit["rate"] * days * (1 - LENDING_FEE), 8)
+                if interest > 0:
+                    self.balance += interest
+                    self.available += interest
+                    self.ledgers.append([
+                        next(self._ids), self.currency, "funding", payout_at, None,
+                        interest, round(self.balance, 8), None, "Margin Funding Payment on wallet funding",
+                    ])
+                    changed = True
+                credit["mts_last_payout"] = payout_at
+
+            if now >= due:
+                del self.credits[credit["id"]]
+                self.available += credit["amount"]
+                credit["status"] = "CLOSED (expired)"
+                credit["mts_update"] = now
+                self._emit("fcc", self.credit_array(credit))
+                changed = True
+
+        if changed:
+            self._emit("wu", self.wallet_arrays()[1])
+
+    def tick(self):
+        """推進一次市場：基準利率漂移、新的借款需求 / 掛單、利息與到期、stats"""
+        with self._lock:
+            now = self.now_ms()
+            self.base_rate = min(max(self.base_rate * self._random.lognormvariate(0, 0.01), 0.00002), 0.003)
+
+            for _ in range(self._random.randint(0, 3)):
+                period = self._random_period()
+                rate = self._period_rate(period, 0.05)
+                self._match_bid(rate, period, round(self._random.lognormvariate(7.5, 1.2), 2), now)
+            for _ in range(self._random.randint(0, 2)):
+                self._add_ask()
+            self._trim()
+
+            self._settle_credits(now)
+            self._record_stats()
+            self._emit("book")
+
+
+# ---------------------------------------------------------
+# REST
+# ---------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive，與 bitfinex_client 的連線池相同行為
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        fake = self.server.fake
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf8") if length else ""
+
+        fake.inject_latency()
+        fake.requests += 1
+
+        if not url.path.startswith("/v2/"):
+            return self._reply(404, ["error", 10020, "endpoint: not found"])
+        endpoint = url.path[len("/v2/"):]
+
+        try:
+            if fake.error_rate and fake.random.random() < fake.error_rate:
+                raise FakeApiError(10000, "temporarily unavailable", status=503)
+
+            if endpoint.startswith("auth/"):
+                if method != "POST":
+                    raise FakeApiError(10020, "method: invalid", status=405)
+                fake.verify_rest(endpoint, self.headers, body)
+                payload = json.loads(body) if body else None
+                data = fake.route_auth(endpoint, payload)
+            else:
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                data = fake.route_public(endpoint, params)
+        except FakeApiError as e:
+            return self._reply(e.status, ["error", e.code, str(e)])
+        except json.JSONDecodeError:
+            return self._reply(500, ["error", 10020, "body: invalid json"])
+
+        self._reply(200, data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+# ---------------------------------------------------------
+# 伺服器（REST + WebSocket + 市場 tick）
+# ---------------------------------------------------------
+
+class _WsSession:
+    def __init__(self, ws):
+        self.ws = ws
+        self.authed = False
+        self.checksum = False
+        self.books = {}   # chanId -> 訂閱狀態
+
+class FakeBitfinex:
+    def __init__(self, host="127.0.0.1", port=0, ws_port=0, api_key="fake-key", api_secret="fake-secret",
+                 latency=0.0, latency_sigma=0.3, error_rate=0.0, tick_interval=1.0,
+                 balance=10000.0, time_scale=1.0, seed=None):
+        """
+        port / ws_port: 0 表示自動選擇可用的 port
+        latency: 每個請求的延遲中位數（秒）
+        tick_interval: 市場多久推進一次（秒，0 表示不自動推進，可手動呼叫 exchange.tick()）
+        """
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.tick_interval = tick_interval
+        self.random = random.Random(seed)
+        self.requests = 0
+
+        self.exchange = FakeExchange(balance, time_scale=time_scale, seed=seed)
+        self._mac = hmac.new(api_secret.encode("utf8"), digestmod=hashlib.sha384)
+        self._last_nonce = 0
+        self._nonce_lock = threading.Lock()
+
+        self._http = None
+        self._threads = []
+        self._stopped = threading.Event()
+        self._ws_loop = None
+        self._ws_ready = threading.Event()
+        self._ws_stop = None
+        self._events = None
+        self._sessions = set()
+        self._chan_ids = itertools.count(100)
+
+    # -----------------------------
+    # 網址
+    # -----------------------------
+
+    @property
+    def rest_url(self):
+        return f"http://{self.host}:{self.port}/v2"
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.host}:{self.ws_port}/ws/2"
+
+    def env(self):
+        """讓 GreenLeaf 改連本地伺服器的設定（環境變數或 .env）"""
+        return {
+            "BFX_API_URL": self.rest_url,
+            "BFX_API_PUB_URL": self.rest_url,
+            "BFX_WS_URL": self.ws_url,
+            "BFX_WS_PUB_URL": self.ws_url,
+            "BFX_API_KEY": self.api_key,
+            "BFX_API_SECRET": self.api_secret,
+        }
+
+    # -----------------------------
+    # 驗證 / 延遲
+    # -----------------------------
+
+    def latency_sample(self):
+        if self.latency <= 0:
+            return 0.0
+        return self.random.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def inject_latency(self):
+        time.sleep(self.latency_sample())
+
+    def _check_signature(self, api_key, message, signature):
+        if api_key != self.api_key:
+            raise FakeApiError(10100, "apikey: invalid")
+        mac = self._mac.copy()
+        mac.update(message.encode("utf8"))
+        if not hmac.compare_digest(mac.hexdigest(), signature or ""):
+            raise FakeApiError(10100, "apikey: digest invalid")
+
+    def _check_nonce(self, nonce):
+        try:
+            nonce = int(nonce)
+        except (TypeError, ValueError):
+            raise FakeApiError(10114, "nonce: invalid")
+        with self._nonce_lock:
+            if nonce <= self._last_nonce:
+                raise FakeApiError(10114, "nonce: small")
+            self._last_nonce = nonce
+
+    def verify_rest(self, endpoint, headers, body):
+        nonce = headers.get("bfx-nonce")
+        self._check_signature(headers.get("bfx-apikey"), f"/api/v2/{endpoint}{nonce}{body}", headers.get("bfx-signature"))
+        self._check_nonce(nonce)
+
+    # -----------------------------
+    # REST 路由
+    # -----------------------------
+
+    def route_public(self, endpoint, params):
+        parts = endpoint.split("/")
+        exchange = self.exchange
+
+        if endpoint == "platform/status":
+            return [1]
+        if parts[0] == "book" and len(parts) == 3:
+            return exchange.book(int(params.get("len", 25))) if parts[1] == exchange.symbol else []
+        if parts[:2] == ["funding", "stats"] and parts[-1] == "hist":
+            return exchange.query_stats(params) if parts[2] == exchange.symbol else []
+        raise FakeApiError(10020, f"endpoint: not found ({endpoint})", status=404)
+
+    def route_auth(self, endpoint, payload):
+        exchange = self.exchange
+        symbol = endpoint.rsplit("/", 1)[-1]
+
+        if endpoint == "auth/r/wallets":
+            with exchange._lock:
+                return exchange.wallet_arrays()
+        if endpoint == "auth/w/funding/offer/submit":
+            return exchange.submit_offer(payload or {})
+        if endpoint == "auth/w/funding/offer/cancel":
+            return exchange.cancel_offer(payload or {})
+        if endpoint == "auth/w/funding/offer/cancel/all":
+            return exchange.cancel_all(payload)
+        if endpoint in ("auth/r/funding/offers", f"auth/r/funding/offers/{exchange.symbol}"):
+            return exchange.list_offers()
+        if endpoint.startswith("auth/r/funding/credits/") and not endpoint.endswith("/hist"):
+            return exchange.list_credits() if symbol == exchange.symbol else []
+        if endpoint.startswith("auth/r/funding/loans/") and not endpoint.endswith("/hist"):
+            return []
+        if endpoint == f"auth/r/ledgers/{exchange.currency}/hist":
+            return exchange.query_ledgers(payload)
+        if endpoint.startswith("auth/r/info/funding/"):
+            return exchange.funding_info()
+        raise FakeApiError(10020, f"endpoint: not found ({endpoint})", status=404)
+
+    # -----------------------------
+    # WebSocket
+    # -----------------------------
+
+    async def _send(self, session, message):
+        import websockets
+        try:
+            await session.ws.send(json.dumps(message))
+        except websockets.ConnectionClosed:
+            pass
+
+    def _book_diff(self, sub):
+        """訂閱中的訂單簿與最新訂單簿的差異（同時更新伺服器端的副本與 checksum 用的本地訂單簿）"""
+        levels = {(row[0], row[1]): row for row in self.exchange.book(sub["len"])}
+        updates = []
+        for key, row in sub["levels"].items():
+            if key not in levels:
+                updates.append([row[0], row[1], 0, 1 if row[3] > 0 else -1])
+        for key, row in levels.items():
+            if sub["levels"].get(key) != row:
+                updates.append(row)
+        sub["levels"] = levels
+        for row in updates:
+            sub["book"].apply_update(row)
+        return updates
+
+    async def _publish(self, event, data):
+        for session in list(self._sessions):
+            if event == "book":
+                for chan_id, sub in session.books.items():
+                    for row in self._book_diff(sub):
+                        await self._send(session, [chan_id, row])
+                    if session.checksum and sub["book"].synced:
+                        await self._send(session, [chan_id, "cs", sub["book"].checksum()])
+            elif session.authed:
+                await self._send(session, [0, event, data])
+
+    def _on_exchange_event(self, event, data):
+        # 由 REST / tick thread 呼叫：交給 WebSocket event loop 依序送出
+        if self._ws_loop is not None and self._sessions:
+            self._ws_loop.call_soon_threadsafe(self._events.put_nowait, (event, data))
+
+    async def _publisher(self):
+        while True:
+            event, data = await self._events.get()
+            await self._publish(event, data)
+
+    async def _ws_auth(self, session, message):
+        payload = message.get("authPayload", "")
+        try:
+            self._check_signature(message.get("apiKey"), payload, message.get("authSig"))
+            self._check_nonce(message.get("authNonce") or payload[len("AUTH"):])
+        except FakeApiError as e:
+            await self._send(session, {"event": "auth", "status": "FAILED", "chanId": 0, "code": e.code, "msg": str(e)})
+            return
+
+        session.authed = True
+        exchange = self.exchange
+        await self._send(session, {"event": "auth", "status": "OK", "chanId": 0, "userId": 1})
+        with exchange._lock:
+            snapshots = [
+                ("ws", exchange.wallet_arrays()),
+                ("fos", exchange.list_offers()),
+                ("fcs", exchange.list_credits()),
+                ("fls", []),
+            ]
+        for event, rows in snapshots:
+            await self._send(session, [0, event, rows])
+
+    async def _ws_subscribe(self, session, message):
+        from bitfinex_ws_book import LocalFundingBook
+
+        if message.get("channel") != "book" or message.get("symbol") != self.exchange.symbol:
+            await self._send(session, {"event": "error", "msg": "symbol: invalid", "code": 10300})
+            return
+
+        chan_id = next(self._chan_ids)
+        length = int(message.get("len", 25))
+        sub = {"len": length, "levels": {}, "book": LocalFundingBook(message["symbol"], message.get("prec", "P0"), length)}
+        await self._send(session, {
+            "event": "subscribed", "channel": "book", "chanId": chan_id, "symbol": message["symbol"],
+            "prec": message.get("prec", "P0"), "freq": "F0", "len": str(length),
+        })
+
+        snapshot = self.exchange.book(length)
+        sub["levels"] = {(row[0], row[1]): row for row in snapshot}
+        sub["book"].apply_snapshot(snapshot)
+        session.books[chan_id] = sub
+        await self._send(session, [chan_id, snapshot])
+
+    async def _ws_handler(self, ws):
+        import websockets
+
+        session = _WsSession(ws)
+        self._sessions.add(session)
+        await self._send(session, {"event": "info", "version": 2, "platform": {"status": 1}})
+
+        try:
+            async for raw in ws:
+                await asyncio.sleep(self.latency_sample())
+                message = json.loads(raw)
+
+                if isinstance(message, list):
+                    # [0, "calc", null, [["wallet_funding_UST"], ...]]
+                    if session.authed and len(message) > 1 and message[1] == "calc":
+                        with self.exchange._lock:
+                            wallet = self.exchange.wallet_arrays()[1]
+                        await self._send(session, [0, "wu", wallet])
+                    continue
+
+                event = message.get("event")
+                if event == "auth":
+                    await self._ws_auth(session, message)
+                elif event == "conf":
+                    session.checksum = bool(int(message.get("flags", 0)) & 131072)
+                    await self._send(session, {"event": "conf", "status": "OK", "flags": message.get("flags", 0)})
+                elif event == "subscribe":
+                    await self._ws_subscribe(session, message)
+                elif event == "unsubscribe":
+                    session.books.pop(message.get("chanId"), None)
+                    await self._send(session, {"event": "unsubscribed", "status": "OK", "chanId": message.get("chanId")})
+                elif event == "ping":
+                    await self._send(session, {"event": "pong", "ts": int(time.time() * 1000), "cid": message.get("cid")})
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._sessions.discard(session)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(15)
+            for session in list(self._sessions):
+                for chan_id in list(session.books):
+                    await self._send(session, [chan_id, "hb"])
+                if session.authed:
+                    await self._send(session, [0, "hb"])
+
+    def _run_ws(self):
+        import websockets
+
+        async def main():
+            self._ws_stop = asyncio.Event()
+            self._events = asyncio.Queue()
+            async with websockets.serve(self._ws_handler, self.host, self.ws_port) as server:
+                self.ws_port = server.sockets[0].getsockname()[1]
+                tasks = [asyncio.create_task(self._heartbeat()), asyncio.create_task(self._publisher())]
+                self._ws_loop = asyncio.get_running_loop()
+                self._ws_ready.set()
+                await self._ws_stop.wait()
+                for task in tasks:
+                    task.cancel()
+
+        asyncio.run(main())
+
+    # -----------------------------
+    # 啟動 / 停止
+    # -----------------------------
+
+    def _run_ticks(self):
+        while not self._stopped.wait(self.tick_interval):
+            self.exchange.tick()
+
+    def start(self):
+        self._http = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._http.daemon_threads = True
+        self._http.fake = self
+        self.port = self._http.server_address[1]
+        self.exchange.listeners.append(self._on_exchange_event)
+
+        self._threads = [
+            threading.Thread(target=self._http.serve_forever, daemon=True),
+            threading.Thread(target=self._run_ws, daemon=True),
+        ]
+        if self.tick_interval > 0:
+            self._threads.append(threading.Thread(target=self._run_ticks, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+        if not self._ws_ready.wait(10):
+            raise Exception("❌ 本地 WebSocket 伺服器啟動失敗")
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._ws_loop is not None and self._ws_stop is not None:
+            self._ws_loop.call_soon_threadsafe(self._ws_stop.set)
+        for thread in self._threads:
+            thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------------------------------------------------------
+# 壓測
+# ---------------------------------------------------------
+
+def benchmark(orders=200, workers=(1, 4, 8, 16), latency=0.08, amount=200.0):
+    """
+    啟動本地伺服器，用 submit_funding_orders 送出 orders 筆掛單，
+    比較不同 BFX_SUBMIT_WORKERS 的吞吐量（每輪結束後 cancel-all 取回資金）
+    回傳 [(workers, 秒數, 每秒筆數), ...]
+
+    需在還沒 import bitfinex_client 的 process 內執行（設定只在第一次使用時讀取）
+    """
+    import os
+    import tempfile
+
+    server = FakeBitfinex(latency=latency, balance=orders * amount, tick_interval=0, seed=1)
+    with server:
+        os.environ.update(server.env())
+        os.environ["BFX_RATE_LIMIT"] = "0"
+        os.environ["BFX_NONCE_FILE"] = os.path.join(tempfile.mkdtemp(), "nonce")
+
+        from bitfinex_funding_submit_offer import submit_funding_orders
+        from bitfinex_funding_cancel_all_offer import cancel_all_funding_offers
+
+        # 掛在最高的借款利率之上，避免成交後資金不夠下一輪使用
+        rate = max(row[0] for row in server.exchange.book(250)) * 2
+        results = []
+
+        for count in workers:
+            started = time.perf_counter()
+            replies = submit_funding_orders([(amount, rate, 2)] * orders, max_workers=count)
+            elapsed = time.perf_counter() - started
+
+            failed = [r for r in replies if isinstance(r, Exception)]
+            if failed:
+                print(f"⚠️ workers={count}：{len(failed)} 筆失敗，例如 {failed[0]}")
+            results.append((count, elapsed, orders / elapsed))
+            cancel_all_funding_offers()
+
+    return results
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    for count, elapsed, rate in benchmark(orders=100, latency=0.05):
+        print(f"🚀 workers={count:>2}：{elapsed:.2f} 秒，{rate:.1f} 筆/秒")
@@ -13,48 +13,8 @@ from bitfinex_orders_api import get_funding_offers
 2️⃣ 回傳 Python list
 """
 
-from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
-
-# ----------------------------
-# 載入環境變數
-# ----------------------------
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
-
-# ----------------------------
-# 產生認證標頭
-# ----------------------------
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
+from bitfinex_client import auth_post
 
 # ----------------------------
 # 取得 funding offers
@@ -66,12 +26,7 @@ def get_funding_offers():
     """
     endpoint = "auth/r/funding/offers/fUST"
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint)
-    }
-
-    response = requests.post(f"{API}/{endpoint}", headers=headers)
+    response = auth_post(endpoint)
 
     if response.status_code != 200:
         raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
@@ -103,12 +58,7 @@ def submit_funding_order(amount, rate, period):
         "period": period
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint, payload)
-    }
-
-    response = requests.post(f"{API}/{endpoint}", json=payload, headers=headers)
+    response = auth_post(endpoint, payload)
 
     if response.status_code != 200:
         raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
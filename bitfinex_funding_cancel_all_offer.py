@@ -20,64 +20,33 @@ Bitfinex Wallets Reader (.env 版本)
     python3 bitfinex_wallets_reader.py
 """
 
-from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import auth_post
 
-# 載入 .env
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-print(API_KEY)
-print(API_SECRET)
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
-
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1_000))
-    message = f"/api/v2/{endpoint}{nonce}"
+def cancel_all_funding_offers(currency=None):
+    """
+    取消所有 funding offers（指定 currency 時只取消該幣別，例如 "UST"）
+    回傳 API JSON 回應
+    """
+    endpoint = "auth/w/funding/offer/cancel/all"
+    payload = {"currency": currency} if currency else None
 
-    if payload is not None:
-        message += json.dumps(payload)
+    response = auth_post(endpoint, payload)
 
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
 
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
+    return response.json()
 
 def get_wallets():
-    endpoint = "auth/w/funding/offer/cancel/all"
-
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint)
-    }
-
     print("💰 正在讀取 Bitfinex offer資訊 ...")
-    response = requests.post(f"{API}/{endpoint}", headers=headers)
 
     try:
-        data = response.json()
+        data = cancel_all_funding_offers()
         print("✅ 回應內容：")
         print(json.dumps(data, indent=2))
     except Exception as e:
         print("⚠️ 無法解析伺服器回應:", e)
-        print(response.text)
 
 if __name__ == "__main__":
     get_wallets()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex Funding Offer Cancel API
+---------------------------------
+https://docs.bitfinex.com/reference/rest-auth-cancel-funding-offer
+
+可被其他 Python 檔案 import：
+
+from bitfinex_funding_cancel_offer import cancel_funding_offer, cancel_funding_offers
+
+功能：
+1️⃣ cancel_funding_offer(offer_id)：取消單一筆 funding offer
+2️⃣ cancel_funding_offers(ids)：多筆同時取消，依原順序回傳每一筆的結果
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from bitfinex_client import auth_post
+from greenleaf_config import get_config
+
+# ----------------------------
+# 取消單筆掛單
+# ----------------------------
+def cancel_funding_offer(offer_id: int):
+    """
+    取消一筆 funding offer
+    回傳 API JSON 回應（result[6] 狀態、result[7] 說明）
+    """
+    endpoint = "auth/w/funding/offer/cancel"
+
+    response = auth_post(endpoint, {"id": int(offer_id)})
+
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
+
+    try:
+        return response.json()
+    except Exception as e:
+        raise Exception(f"❌ 無法解析 API JSON 回應: {e}")
+
+# ----------------------------
+# 批次取消
+# ----------------------------
+def cancel_funding_offers(offer_ids, max_workers=None):
+    """
+    同時取消多筆 funding offer
+    max_workers: 預設讀取 BFX_SUBMIT_WORKERS（預設 4）
+
+    回傳與 offer_ids 相同順序的 list，失敗的項目是該筆的 Exception
+    """
+    offer_ids = list(offer_ids)
+    if not offer_ids:
+        return []
+
+    if max_workers is None:
+        max_workers = get_config().get_int("BFX_SUBMIT_WORKERS", 4)
+
+    def cancel(offer_id):
+        try:
+            return cancel_funding_offer(offer_id)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(offer_ids)))) as pool:
+        return list(pool.map(cancel, offer_ids))
+
+# ----------------------------
+# 測試用
+# ----------------------------
+if __name__ == "__main__":
+    import sys
+
+    for result in cancel_funding_offers(sys.argv[1:]):
+        print(result if isinstance(result, Exception) else json.dumps(result, indent=2))
@@ -1,48 +1,12 @@
 from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
-
-# 載入 .env
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 沒找到 API_KEY / API_SECRET，請確認 .env 是否正確設定")
-
-
-def _build_auth_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        API_SECRET.encode("utf8"),
-        message.encode("utf8"),
-        hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
+from bitfinex_client import auth_post
 
 
 def get_funding_credits(symbol="fUSD", raw=False):
 
     endpoint = f"auth/r/funding/credits/{symbol}"
-    headers = {"Content-Type": "application/json", **_build_auth_headers(endpoint)}
-    response = requests.post(f"{API}/{endpoint}", headers=headers)
+    response = auth_post(endpoint)
 
     if response.status_code != 200:
         raise Exception(f"❌ API error: {response.status_code}\n{response.text}")
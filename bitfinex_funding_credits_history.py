@@ -7,48 +7,32 @@ Bitfinex Active Funding Credits with APR
 自動篩選 ACTIVE 放貸，並計算日利率 / 年化利率百分比
 """
 
-from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import auth_post
 
 # -----------------------------
-# 載入 .env
+# 取得 funding credits history（原始資料）
 # -----------------------------
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
+def get_funding_credits_history(symbol="fUST", start=None, end=None, limit=500):
+    """
+    取得變動利率放貸歷史（原始 array list，新 → 舊）
+    start / end: 毫秒時間戳，可選；limit 最多 500
+    """
+    endpoint = f"auth/r/funding/credits/{symbol}/hist"
 
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
+    payload = {"limit": limit}
+    if start is not None:
+        payload["start"] = start
+    if end is not None:
+        payload["end"] = end
 
-# -----------------------------
-# 認證 headers
-# -----------------------------
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1000))
-    message = f"/api/v2/{endpoint}{nonce}"
+    response = auth_post(endpoint, payload)
 
-    if payload is not None:
-        message += json.dumps(payload)
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
 
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
+    return response.json()
 
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
 
 # -----------------------------
 # 取得 funding credits history
@@ -70,21 +54,7 @@ def get_funding_credits(symbol="fUST", limit=50):
             ...
         ]
     """
-    endpoint = f"auth/r/funding/credits/{symbol}/hist"
-
-    payload = {"limit": limit}
-
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint, payload)
-    }
-
-    response = requests.post(f"{API}/{endpoint}", headers=headers, json=payload)
-
-    if response.status_code != 200:
-        raise Exception(f"❌ API 錯誤: {response.status_code}\n{response.text}")
-
-    data = response.json()
+    data = get_funding_credits_history(symbol, limit=limit)
     results = []
 
     for item in data:
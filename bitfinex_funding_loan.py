@@ -10,42 +10,9 @@ Docs:
 https://docs.bitfinex.com/reference/rest-auth-funding-loans
 """
 
-import os
 import json
-import hmac
-import hashlib
-import requests
+from bitfinex_client import auth_post
 from datetime import datetime
-from dotenv import load_dotenv
-
-# Load .env
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ Missing BFX_API_KEY or BFX_API_SECRET in .env")
-
-def _build_auth_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    sig = hmac.new(
-        API_SECRET.encode(),
-        message.encode(),
-        hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": sig
-    }
 
 def get_funding_loans(symbol="fUST", raw=False):
     """
@@ -70,12 +37,7 @@ def get_funding_loans(symbol="fUST", raw=False):
 
     endpoint = f"auth/r/funding/loans/{symbol}"
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_auth_headers(endpoint)
-    }
-
-    response = requests.post(f"{API}/{endpoint}", headers=headers)
+    response = auth_post(endpoint)
 
     if response.status_code != 200:
         raise Exception(f"❌ API Error {response.status_code}: {response.text}")
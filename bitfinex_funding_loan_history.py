@@ -5,45 +5,28 @@
 https://docs.bitfinex.com/reference/rest-auth-funding-loans-hist
 """
 
-from datetime import datetime
-import os,time
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import auth_post
 
-# 載入 .env
-load_dotenv()
+def get_funding_loans_history(symbol="fUST", start=None, end=None, limit=500):
+    """
+    取得固定利率放貸歷史（原始 array list，新 → 舊）
+    start / end: 毫秒時間戳，可選；limit 最多 500
+    """
+    endpoint = f"auth/r/funding/loans/{symbol}/hist"
 
-API = "https://api.bitfinex.com/v2"
+    payload = {"limit": limit}
+    if start is not None:
+        payload["start"] = start
+    if end is not None:
+        payload["end"] = end
 
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-print(API_KEY)
-print(API_SECRET)
+    response = auth_post(endpoint, payload)
 
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
 
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1_000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
+    return response.json()
 
 def get_wallets():
     endpoint = "auth/r/funding/loans/fUST/hist"
@@ -52,13 +35,8 @@ def get_wallets():
         "limit":50
     } 
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint, payload)
-    }
-
     print("💰 正在讀取 Bitfinex user資訊 ...")
-    response = requests.post(f"{API}/{endpoint}", headers=headers, json=payload)
+    response = auth_post(endpoint, payload)
 
     try:
         data = response.json()
@@ -6,56 +6,22 @@ Bitfinex Funding Order Submit API
 ---------------------------------
 可被其他 Python 檔案 import：
 
-from bitfinex_submit_order import submit_funding_order
+from bitfinex_funding_submit_offer import submit_funding_order
+
+from bitfinex_funding_submit_offer import submit_funding_orders
 
 功能：
 1️⃣ 傳入 amount, rate, period
 2️⃣ 執行 fUST funding order
 3️⃣ 回傳 API JSON 回應
+4️⃣ submit_funding_orders()：多筆同時送出（同時最多 max_workers 筆），
+   依原順序回傳每一筆的結果
 """
 
-from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
-
-# ----------------------------
-# 載入環境變數
-# ----------------------------
-load_dotenv()
-
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
-
-# ----------------------------
-# 產生認證標頭
-# ----------------------------
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
-    }
+from concurrent.futures import ThreadPoolExecutor
+from bitfinex_client import auth_post
+from greenleaf_config import get_config
 
 # ----------------------------
 # 執行掛單
@@ -84,12 +50,7 @@ def submit_funding_order(amount: float, rate: float, period: int, order_type="LI
         "flags": flags
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint, payload)
-    }
-
-    response = requests.post(f"{API}/{endpoint}", headers=headers, json=payload)
+    response = auth_post(endpoint, payload)
 
     if response.status_code != 200:
         raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
@@ -99,6 +60,37 @@ def submit_funding_order(amount: float, rate: float, period: int, order_type="LI
     except Exception as e:
         raise Exception(f"❌ 無法解析 API JSON 回應: {e}")
 
+# ----------------------------
+# 批次掛單
+# ----------------------------
+def submit_funding_orders(orders, order_type="LIMIT", symbol="fUST", flags=0, max_workers=None):
+    """
+    同時送出多筆 funding order
+
+    orders: [(amount, rate, period), ...]
+    max_workers: 同時送出的筆數，預設讀取 BFX_SUBMIT_WORKERS（預設 4）
+
+    回傳與 orders 相同順序的 list：
+    成功的項目是 API JSON 回應（result[6] 狀態、result[7] 說明），
+    失敗的項目是該筆的 Exception，不影響其他筆
+    """
+    orders = list(orders)
+    if not orders:
+        return []
+
+    if max_workers is None:
+        max_workers = get_config().get_int("BFX_SUBMIT_WORKERS", 4)
+
+    def submit(order):
+        amount, rate, period = order
+        try:
+            return submit_funding_order(amount, rate, period, order_type, symbol, flags)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(orders)))) as pool:
+        return list(pool.map(submit, orders))
+
 # ----------------------------
 # 測試用
 # ----------------------------
@@ -106,3 +98,7 @@ if __name__ == "__main__":
     # 測試用範例
     result = submit_funding_order(amount=150, rate=0.0003673, period=20)
     print(json.dumps(result, indent=2))
+
+    results = submit_funding_orders([(150, 0.0003673, 20), (150, 0.0003673, 20)])
+    for idx, result in enumerate(results):
+        print(f"第 {idx+1} 筆:", result if isinstance(result, Exception) else result[6:8])
@@ -8,65 +8,41 @@ https://docs.bitfinex.com/reference/rest-auth-info-funding
 
 """
 
-from datetime import datetime
-import os
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import auth_post
 
-# 載入 .env
-load_dotenv()
+def get_funding_info(symbol="fUST"):
+    """
+    取得帳戶 funding 平均利率與天數
+    回傳 dict：
+        yield_loan / yield_lend: 平均日利率（借入 / 借出）
+        duration_loan / duration_lend: 平均天數
+    """
+    endpoint = f"auth/r/info/funding/{symbol}"
 
-API = "https://api.bitfinex.com/v2"
+    response = auth_post(endpoint)
 
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-print(API_KEY)
-print(API_SECRET)
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
-
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1_000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
 
+    # ["sym", SYMBOL, [YIELD_LOAN, YIELD_LEND, DURATION_LOAN, DURATION_LEND]]
+    info = response.json()[2]
     return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
+        "yield_loan": info[0],
+        "yield_lend": info[1],
+        "duration_loan": info[2],
+        "duration_lend": info[3],
     }
 
 def get_wallets():
-    #endpoint = "auth/r/info/funding/fUSD"
-    endpoint = "auth/r/info/funding/fUST"
-
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint)
-    }
-
     print("💰 正在讀取 Bitfinex user資訊 ...")
-    response = requests.post(f"{API}/{endpoint}", headers=headers)
 
     try:
-        data = response.json()
+        data = get_funding_info("fUST")
         print("✅ 回應內容：")
         print(json.dumps(data, indent=2))
     except Exception as e:
         print("⚠️ 無法解析伺服器回應:", e)
-        print(response.text)
 
 if __name__ == "__main__":
     get_wallets()
@@ -4,73 +4,43 @@
 
 """
 
-from datetime import datetime
-import os,time
 import json
-import hmac
-import hashlib
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import auth_post
 
-# 載入 .env
-load_dotenv()
+def get_ledgers(currency="UST", category=28, wallet="funding", limit=25, start=None, end=None):
+    """
+    取得 ledgers 紀錄並回傳 Python list
+    category 28 = 利息（對照表 https://docs.bitfinex.com/reference/rest-auth-ledgers#ledger-entry-arrays）
+    start / end: 毫秒時間戳，可選
+    """
+    endpoint = f"auth/r/ledgers/{currency}/hist"
 
-API = "https://api.bitfinex.com/v2"
-
-API_KEY = os.getenv("BFX_API_KEY")
-API_SECRET = os.getenv("BFX_API_SECRET")
-print(API_KEY)
-print(API_SECRET)
-
-if not API_KEY or not API_SECRET:
-    raise ValueError("❌ 無法讀取 API_KEY 或 API_SECRET，請確認 .env 檔內容")
-
-def _build_authentication_headers(endpoint, payload=None):
-    nonce = str(round(datetime.now().timestamp() * 1_000))
-    message = f"/api/v2/{endpoint}{nonce}"
-
-    if payload is not None:
-        message += json.dumps(payload)
-
-    signature = hmac.new(
-        key=API_SECRET.encode("utf8"),
-        msg=message.encode("utf8"),
-        digestmod=hashlib.sha384
-    ).hexdigest()
-
-    return {
-        "bfx-apikey": API_KEY,
-        "bfx-nonce": nonce,
-        "bfx-signature": signature
+    payload = {
+        "category": category,
+        "wallet": wallet,
+        "limit": limit
     }
+    if start is not None:
+        payload["start"] = start
+    if end is not None:
+        payload["end"] = end
 
-def get_wallets():
-    #endpoint = "auth/r/info/funding/fUSD"
-    currency = "UST"
-    endpoint = "auth/r/ledgers/UST/hist"
+    response = auth_post(endpoint, payload)
 
-    payload = {
-        "category":28,
-        # 對照表 https://docs.bitfinex.com/reference/rest-auth-ledgers#ledger-entry-arrays
-        "wallet": "funding",
-        "limit": 25
-    } 
+    if response.status_code != 200:
+        raise Exception(f"❌ API 錯誤：{response.status_code}\n{response.text}")
 
-    headers = {
-        "Content-Type": "application/json",
-        **_build_authentication_headers(endpoint, payload)
-    }
+    return response.json()
 
+def get_wallets():
     print("💰 正在讀取 Bitfinex ledgers 資訊 ...")
-    response = requests.post(f"{API}/{endpoint}", headers=headers, json=payload)
 
     try:
-        data = response.json()
+        data = get_ledgers("UST", category=28, wallet="funding", limit=25)
         print("✅ 回應內容：")
         print(json.dumps(data, indent=2))
     except Exception as e:
         print("⚠️ 無法解析伺服器回應:", e)
-        print(response.text)
 
 if __name__ == "__main__":
     get_wallets()
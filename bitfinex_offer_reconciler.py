@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Funding 掛單對帳（只改有差異的掛單）
+------------------------------------
+原本的功能1流程是「取消所有掛單 → 重新查餘額 → 全部重新掛單」，
+取消到重新掛單之間資金全部閒置，每一筆也都要多花一次 API 呼叫。
+
+這裡比對目前的掛單（get_funding_offers）與想要的掛單（desired ladder）：
+1️⃣ 金額、利率、天數都相同的掛單保留不動
+2️⃣ 只取消多出來的掛單（同時送出）
+3️⃣ 取消完成後，只送出缺少的掛單（同時送出）
+
+可被其他 Python 檔案 import：
+    from bitfinex_offer_reconciler import plan_reconcile, reconcile
+
+    desired = [(200, 0.0003, 30), (200, 0.0003, 30), (250, 0.00028, 20)]
+    summary = reconcile(desired)
+"""
+
+import json
+from collections import defaultdict
+from bitfinex_funding_active_offer import get_funding_offers
+from bitfinex_funding_cancel_offer import cancel_funding_offers
+from bitfinex_funding_submit_offer import submit_funding_orders
+
+
+# offer array 欄位
+# [ID, SYMBOL, MTS_CREATE, MTS_UPDATE, AMOUNT, AMOUNT_ORIG, OFFER_TYPE, _, _, FLAGS,
+#  STATUS, _, _, _, RATE, PERIOD, ...]
+OFFER_ID = 0
+OFFER_AMOUNT = 4
+OFFER_RATE = 14
+OFFER_PERIOD = 15
+
+RATE_DIGITS = 8     # 利率比對到小數第 8 位
+AMOUNT_DIGITS = 2   # 金額比對到小數第 2 位
+
+
+def _key(amount, rate, period):
+    return (round(float(amount), AMOUNT_DIGITS), round(float(rate), RATE_DIGITS), int(period))
+
+
+def offers_total(offers):
+    """目前掛單的總金額（取消後會回到可用餘額）"""
+    return sum(offer[OFFER_AMOUNT] for offer in offers)
+
+
+def plan_reconcile(offers, desired):
+    """
+    offers: get_funding_offers() 的結果
+    desired: [(amount, rate, period), ...]
+
+    回傳 (keep, cancel_ids, submit)
+        keep: 保留的 offer
+        cancel_ids: 要取消的 offer ID
+        submit: 要新送出的 (amount, rate, period)，維持 desired 的順序
+    同樣的掛單有多筆時逐筆配對（例如想要 3 筆、目前有 2 筆 → 只補 1 筆）
+    """
+    existing = defaultdict(list)
+    for offer in offers:
+        existing[_key(offer[OFFER_AMOUNT], offer[OFFER_RATE], offer[OFFER_PERIOD])].append(offer)
+
+    keep = []
+    submit = []
+    for order in desired:
+        matches = existing.get(_key(*order))
+        if matches:
+            keep.append(matches.pop(0))
+        else:
+            submit.append(tuple(order))
+
+    cancel_ids = [offer[OFFER_ID] for matches in existing.values() for offer in matches]
+    return keep, cancel_ids, submit
+
+
+def reconcile(desired, offers=None, max_workers=None):
+    """
+    讓目前掛單與 desired 一致
+    offers: 已取得的目前掛單，None 時呼叫 get_funding_offers()
+
+    回傳 dict：
+        kept: 保留的筆數
+        cancelled: [(offer_id, API 回應或 Exception), ...]
+        submitted: [((amount, rate, period), API 回應或 Exception), ...]
+    """
+    if offers is None:
+        offers = get_funding_offers()
+
+    keep, cancel_ids, submit = plan_reconcile(offers, desired)
+
+    # 先取消：釋放的資金才能用來送出新的掛單
+    cancel_results = cancel_funding_offers(cancel_ids, max_workers=max_workers)
+    submit_results = submit_funding_orders(submit, max_workers=max_workers)
+
+    return {
+        "kept": len(keep),
+        "cancelled": list(zip(cancel_ids, cancel_results)),
+        "submitted": list(zip(submit, submit_results)),
+    }
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    def _offer(offer_id, amount, rate, period):
+        row = [None] * 21
+        row[OFFER_ID], row[OFFER_AMOUNT], row[OFFER_RATE], row[OFFER_PERIOD] = offer_id, amount, rate, period
+        return row
+
+    current = [
+        _offer(1, 200, 0.0003, 30),
+        _offer(2, 200, 0.0003, 30),
+        _offer(3, 150, 0.0002, 2),
+    ]
+    desired = [(200, 0.0003, 30), (200, 0.0003, 30), (200, 0.0003, 30), (150, 0.00031, 20)]
+
+    keep, cancel_ids, submit = plan_reconcile(current, desired)
+    print("✅ 保留：", [offer[OFFER_ID] for offer in keep])
+    print("🗑️ 取消：", cancel_ids)
+    print("📌 新掛單：", json.dumps(submit))
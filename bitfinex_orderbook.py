@@ -8,15 +8,15 @@
 https://docs.bitfinex.com/reference/rest-public-book
 
 此檔案拆成可供 import 的模組：
-    from bitfinex_orderbook import get_orderbook, get_top5_rates
+    from bitfinex_orderbook import get_orderbook, get_top5_rates, get_top_rates
+
+需要向量化處理時改用 get_orderbook_array()，回傳 bitfinex_book.FundingBook
 """
 
-import requests
+from bitfinex_client import get_api_url, http_get
+from bitfinex_cache import cached
 import json
-import copy
-
-
-API = "https://api.bitfinex.com/v2"
+import heapq
 
 
 # ---------------------------------------------------------
@@ -43,13 +43,16 @@ def add_annual_rate_percent(data, rate_idx=0):
     data 中第 rate_idx 個元素（日利率）轉成年利率百分比
     並新增一欄 annual_rate_percent
     """
-    result = copy.deepcopy(data)
-    
-    for item in result:
+    result = []
+
+    # 原始資料每一筆都是數字，只需淺複製 + 新增一欄，不必 deepcopy
+    for item in data:
         if len(item) > rate_idx:
             daily_rate = item[rate_idx]
             annual_rate = daily_rate * 365
-            item.append(round(annual_rate * 100, 2))  # 新增：年化（％）
+            result.append(item + [round(annual_rate * 100, 2)])  # 新增：年化（％）
+        else:
+            result.append(list(item))
     return result
 
 
@@ -64,30 +67,96 @@ def process_data(data, unique_idx=1, rate_idx=0):
 # 主要 API 函式（給其他檔案呼叫）
 # ---------------------------------------------------------
 
-def get_orderbook(symbol="fUST", precision="P1", length=25):
-    """
-    呼叫 Bitfinex Orderbook + 自動整理資料
-    回傳 Python list
-    """
+@cached("book")
+def _fetch_raw_orderbook(symbol, precision, length):
     endpoint = f"book/{symbol}/{precision}?len={length}"
-    url = f"{API}/{endpoint}"
+    url = f"{get_api_url()}/{endpoint}"
 
-    response = requests.get(url)
+    response = http_get(url)
     if response.status_code != 200:
         raise Exception(f"API 錯誤：{response.status_code} - {response.text}")
 
-    raw = response.json()
+    return response.json()
+
+
+def get_orderbook(symbol="fUST", precision="P1", length=25):
+    """
+    呼叫 Bitfinex Orderbook + 自動整理資料
+    回傳 Python list
+    """
+    raw = _fetch_raw_orderbook(symbol, precision, length)
     processed = process_data(raw, unique_idx=1, rate_idx=0)
     return processed   # ← 給 main.py 用
 
 
+def get_orderbook_array(symbol="fUST", precision="P1", length=25):
+    """
+    與 get_orderbook() 相同的整理結果，但回傳 FundingBook（NumPy 陣列）
+    """
+    from bitfinex_book import FundingBook
+
+    raw = _fetch_raw_orderbook(symbol, precision, length)
+    return FundingBook.from_raw(raw).unique_by_period()
+
+
 # ---------------------------------------------------------
-# 新增函式：取得前五筆利率最高
+# 取得前 k 筆利率最高
 # ---------------------------------------------------------
 
+def _rate_summary(item, symbol=None):
+    summary = {
+        "annual_rate_percent": item[4],
+        "period": item[1],
+        "amount": round(abs(item[3]))
+    }
+    if symbol is not None:
+        summary["symbol"] = symbol
+    return summary
+
+
+def _passes(item, min_period, max_period, min_amount):
+    if len(item) < 5:
+        return False
+    if min_period is not None and item[1] < min_period:
+        return False
+    if max_period is not None and item[1] > max_period:
+        return False
+    if min_amount is not None and abs(item[3]) < min_amount:
+        return False
+    return True
+
+
+def get_top_rates(orderbook, k=5, min_period=None, max_period=None, min_amount=None):
+    """
+    從整理過的 orderbook 取得前 k 筆年化利率最高的資料
+    orderbook: list、FundingBook，或 {symbol: orderbook} 合併多個幣種
+    min_period / max_period / min_amount: 可選的篩選條件
+
+    使用大小為 k 的 heap（heapq.nlargest），O(n log k)，不必整本排序；
+    同分時保持原本順序。合併多個幣種時每筆多一個 "symbol" 欄位。
+    """
+    if isinstance(orderbook, dict):
+        candidates = (
+            (symbol, item)
+            for symbol, book in orderbook.items()
+            for item in book
+            if _passes(item, min_period, max_period, min_amount)
+        )
+        top = heapq.nlargest(k, candidates, key=lambda x: x[1][4])
+        return [_rate_summary(item, symbol) for symbol, item in top]
+
+    if hasattr(orderbook, "top"):
+        top = orderbook.filter(min_period, max_period, min_amount).top(k)
+    else:
+        candidates = (item for item in orderbook if _passes(item, min_period, max_period, min_amount))
+        top = heapq.nlargest(k, candidates, key=lambda x: x[4])
+
+    return [_rate_summary(item) for item in top]
+
+
 def get_top5_rates(orderbook):
     """
-    從整理過的 orderbook 取得前五筆年化利率最高的資料
+    從整理過的 orderbook（list 或 FundingBook）取得前五筆年化利率最高的資料
     回傳 list of dict:
         {
             "annual_rate_percent": ...,
@@ -95,19 +164,91 @@ def get_top5_rates(orderbook):
             "amount": ...
         }
     """
-    # 排序：按年化利率降序
-    sorted_data = sorted(orderbook, key=lambda x: x[4], reverse=True)
-    top5 = sorted_data[:5]
+    return get_top_rates(orderbook, k=5)
 
-    # 提取需要欄位
-    result = []
-    for item in top5:
-        result.append({
-            "annual_rate_percent": item[4],
-            "period": item[1],
-            "amount": round(abs(item[3]))
-        })
-    return result
+
+class TopKTracker:
+    """
+    隨訂單簿增量更新維護前 k 名（不必每次重新排序整本）
+
+    update(key, row) 新增 / 更新一個價位，row 為 None 表示刪除；
+    只有前 k 名中的價位被刪除或變差時才需要重建（O(n log k)），
+    其他更新只比對 heap 頂端，O(log k)。
+
+    可直接掛在 bitfinex_ws_book 的訊息處理上：
+        handler.listeners.append(tracker.book_listener("fUST"))
+    """
+
+    def __init__(self, k=5, min_period=None, max_period=None, min_amount=None):
+        self.k = k
+        self.filters = (min_period, max_period, min_amount)
+        self.levels = {}
+        self._heap = []     # (apr, key)，最小的在頂端
+        self._members = set()
+        self._dirty = False
+
+    def _rebuild(self):
+        top = heapq.nlargest(self.k, self.levels.items(), key=lambda x: x[1][4])
+        self._heap = [(item[4], key) for key, item in top]
+        heapq.heapify(self._heap)
+        self._members = {key for key, _ in top}
+        self._dirty = False
+
+    def update(self, key, row):
+        if row is not None and len(row) == 4:
+            row = add_annual_rate_percent([row])[0]
+
+        if row is None or not _passes(row, *self.filters):
+            if self.levels.pop(key, None) is not None and key in self._members:
+                self._dirty = True
+            return
+
+        previous = self.levels.get(key)
+        self.levels[key] = row
+
+        if self._dirty:
+            return
+        if key in self._members:
+            # 前 k 名中的價位變差時，後面可能有更好的，需要重建
+            if previous is None or row[4] < previous[4]:
+                self._dirty = True
+            else:
+                self._heap = [(row[4] if other == key else apr, other) for apr, other in self._heap]
+                heapq.heapify(self._heap)
+        elif len(self._heap) < self.k:
+            heapq.heappush(self._heap, (row[4], key))
+            self._members.add(key)
+        elif row[4] > self._heap[0][0]:
+            _, dropped = heapq.heapreplace(self._heap, (row[4], key))
+            self._members.discard(dropped)
+            self._members.add(key)
+
+    def reset(self, rows, symbol=None):
+        """以整本訂單簿重新初始化（例如收到 snapshot）"""
+        if symbol is None:
+            self.levels.clear()
+        else:
+            self.levels = {key: row for key, row in self.levels.items() if key[0] != symbol}
+        for row in rows:
+            self.update((symbol, row[0], row[1]), row)
+        self._dirty = True
+
+    def top(self):
+        """回傳與 get_top_rates 相同格式（由高到低）"""
+        if self._dirty:
+            self._rebuild()
+        ordered = sorted(self._heap, key=lambda x: x[0], reverse=True)
+        return [_rate_summary(self.levels[key], key[0]) for _, key in ordered]
+
+    def book_listener(self, symbol):
+        """產生 BookMessageHandler 的 listener，把 WebSocket 更新套用到 tracker"""
+        def listener(book, payload):
+            if payload and isinstance(payload[0], list):
+                self.reset(payload, symbol)
+            else:
+                rate, period, count, amount = payload[:4]
+                self.update((symbol, rate, period), payload if count > 0 else None)
+        return listener
 
 
 # ---------------------------------------------------------
@@ -17,18 +17,34 @@ Bitfinex APR Selector
 使用方法（在其他檔案）：
     from bitfinex_rate_selector import find_max_apr
     best = find_max_apr(data)
+
+data 也可以是 bitfinex_book.FundingBook，會直接用向量化運算
+
+同一本訂單簿要問很多次（不同天數、期間範圍、最小金額）時，先建立索引：
+    index = AprIndex(data)
+    best_30d = find_max_apr(index, 30)
+    results = find_max_apr_batch(index, [(2, 2, None), (2, 30, 1000), (None, 120, None)])
 """
 
+from bisect import bisect_left, bisect_right
+from heapq import merge
+
+
 def find_max_apr(data, max_days=None):
     """
     傳入：
-        data: list of lists
+        data: list of lists 或 FundingBook
         max_days: (int | None) 例如 30，表示只考慮 period <= 30 的資料
 
     回傳：
         年化率最高的那筆 array (符合 max_days 條件)
         如果沒有符合條件則回傳 None
     """
+    if hasattr(data, "max_apr"):
+        if len(data) == 0:
+            raise ValueError("❌ find_max_apr(data) 需要傳入非空的 list")
+        return data.max_apr(max_days)
+
     if not data or not isinstance(data, list):
         raise ValueError("❌ find_max_apr(data) 需要傳入非空的 list")
 
@@ -54,6 +70,111 @@ def find_max_apr(data, max_days=None):
 
 
 
+# ---------------------------------------------------------
+# 期間範圍索引
+# ---------------------------------------------------------
+
+class AprIndex:
+    """
+    每本訂單簿建立一次，回答：
+        period 在 [min_period, max_period]、abs(amount) >= min_amount 的最高年化率
+
+    做法：依 period 排序後建 segment tree，每個節點保存其範圍內的資料
+    依金額由大到小排序，以及對應的年化率 prefix 最大值；
+    查詢時 O(log n) 個節點各做一次二分搜尋，總共 O(log² n)。
+    同分時與 find_max_apr 一樣回傳原本順序中的第一筆。
+    """
+
+    def __init__(self, data):
+        items = [(item[1], i, item) for i, item in enumerate(data) if len(item) >= 5]
+        items.sort(key=lambda x: x[0])
+
+        self._periods = [period for period, _, _ in items]
+        self._items = [item for _, _, item in items]
+        self._size = len(items)
+
+        # 每個節點：(-amount 由小到大, prefix 最佳 key, prefix 最佳 item)
+        n = self._size
+        self._tree = [None] * (2 * n)
+        for pos, (_, i, item) in enumerate(items):
+            key = (item[4], -i)
+            self._tree[n + pos] = ([-abs(item[3])], [key], [item])
+        for node in range(n - 1, 0, -1):
+            self._tree[node] = self._merge(self._tree[2 * node], self._tree[2 * node + 1])
+
+    @staticmethod
+    def _merge(left, right):
+        neg_amounts, best_keys, best_items = [], [], []
+        entries = merge(zip(left[0], left[1], left[2]), zip(right[0], right[1], right[2]),
+                        key=lambda e: e[0])
+
+        # 子節點存的是 prefix 最大值，先還原成每筆自己的 key 再重新累計
+        best_key, best_item = None, None
+        for neg_amount, key, item in entries:
+            neg_amounts.append(neg_amount)
+            if best_key is None or key > best_key:
+                best_key, best_item = key, item
+            best_keys.append(best_key)
+            best_items.append(best_item)
+        return neg_amounts, best_keys, best_items
+
+    def __len__(self):
+        return self._size
+
+    def _node_best(self, node, min_amount):
+        neg_amounts, best_keys, best_items = self._tree[node]
+        if min_amount is None:
+            count = len(neg_amounts)
+        else:
+            count = bisect_right(neg_amounts, -min_amount)
+        if count == 0:
+            return None, None
+        return best_keys[count - 1], best_items[count - 1]
+
+    def query(self, min_period=None, max_period=None, min_amount=None):
+        """回傳符合條件、年化率最高的那筆 array，沒有符合的回傳 None"""
+        lo = 0 if min_period is None else bisect_left(self._periods, min_period)
+        hi = self._size if max_period is None else bisect_right(self._periods, max_period)
+
+        best_key, best_item = None, None
+        lo += self._size
+        hi += self._size
+        while lo < hi:
+            if lo & 1:
+                key, item = self._node_best(lo, min_amount)
+                if key is not None and (best_key is None or key > best_key):
+                    best_key, best_item = key, item
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                key, item = self._node_best(hi, min_amount)
+                if key is not None and (best_key is None or key > best_key):
+                    best_key, best_item = key, item
+            lo //= 2
+            hi //= 2
+        return best_item
+
+    def query_many(self, queries):
+        """
+        queries: [(min_period, max_period, min_amount), ...]，不需要的條件填 None
+        回傳與 queries 相同順序的結果 list
+        """
+        return [self.query(*q) for q in queries]
+
+    def max_apr(self, max_days=None):
+        return self.query(max_period=max_days)
+
+
+def find_max_apr_batch(data, queries):
+    """
+    一次回答多個查詢（只建立一次索引）
+    data: list of lists、FundingBook 或 AprIndex
+    queries: [(min_period, max_period, min_amount), ...]
+    """
+    index = data if isinstance(data, AprIndex) else AprIndex(data)
+    return index.query_many(queries)
+
+
 # ---------------------------------------------------------
 # 測試用（直接執行）
 # ---------------------------------------------------------
@@ -73,3 +194,7 @@ if __name__ == "__main__":
     best = find_max_apr(sample_data)
     print("📌 年化率最高的一筆：")
     print(best)
+
+    index = AprIndex(sample_data)
+    print("📌 2 天 / 30 天內 / 7~60 天且金額 >= 100000：")
+    print(find_max_apr_batch(index, [(None, 2, None), (None, 30, None), (7, 60, 100000)]))
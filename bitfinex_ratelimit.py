@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex Rate-Limit Scheduler
+-----------------------------
+Bitfinex 對每個 REST endpoint 有每分鐘次數上限，任何一個超過時
+整個 IP 會被封鎖 60 秒。這裡以 token bucket 追蹤：
+
+1️⃣ 每個 endpoint 一個 bucket（依 ENDPOINT_LIMITS 的前綴比對）
+2️⃣ 所有 endpoint 共用一個全域 bucket
+3️⃣ 三種優先權：
+    PRIORITY_TRADE   掛單 / 取消掛單
+    PRIORITY_ACCOUNT 餘額、訂單簿等下單前需要的查詢
+    PRIORITY_REPORT  ledgers、summary、歷史紀錄等報表查詢
+   排隊時優先權高的先取得 token；報表查詢不能用掉全域 bucket
+   保留給交易的最後 REPORT_RESERVE 比例
+
+4️⃣ 跨 process 共用：Telegram bot、通知腳本、main.py、daemon 都用同一個 IP，
+   bucket 狀態寫在同一個檔案，以檔案鎖保護（與 bitfinex_auth.NonceSource 相同做法），
+   每次取 token 都先讀入其他 process 用掉的量；優先權排隊只在同一個 process 內
+   檔案位置可用環境變數 BFX_RATE_STATE_FILE 指定，預設為本資料夾下的 .bfx_ratelimit
+   （Windows 沒有 fcntl，只在同一個 process 內有效）
+
+bitfinex_client 在每次送出請求前呼叫 acquire()，遇到 429 時呼叫 penalize()。
+"""
+
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+from greenleaf_config import get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows：只在同一個 process 內限制
+    fcntl = None
+
+
+PRIORITY_TRADE = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_REPORT = 2
+
+# (endpoint 前綴, 每分鐘次數)，由上往下比對第一個符合的
+ENDPOINT_LIMITS = [
+    ("auth/w/funding/offer/submit", 90),
+    ("auth/w/funding/offer/cancel/all", 90),
+    ("auth/w/funding/offer/cancel", 90),
+    ("auth/r/ledgers", 45),
+    ("auth/r/wallets", 90),
+    ("auth/r/funding/offers", 90),
+    ("auth/r/funding/credits", 90),
+    ("auth/r/funding/loans", 90),
+    ("auth/r/funding/trades", 90),
+    ("auth/r/", 90),
+    ("auth/w/", 90),
+    ("book/", 90),
+    ("funding/stats/", 90),
+    ("candles/", 30),
+]
+DEFAULT_LIMIT = 60
+
+# (endpoint 前綴, 優先權)，都不符合時：結尾為 /hist 視為報表，其餘為帳戶查詢
+ENDPOINT_PRIORITIES = [
+    ("auth/w/", PRIORITY_TRADE),
+    ("auth/r/ledgers", PRIORITY_REPORT),
+    ("auth/r/summary", PRIORITY_REPORT),
+    ("auth/r/info", PRIORITY_REPORT),
+    ("candles/", PRIORITY_REPORT),
+]
+
+# 各優先權必須留在全域 bucket 的比例
+REPORT_RESERVE = 0.25
+RESERVES = {
+    PRIORITY_TRADE: 0.0,
+    PRIORITY_ACCOUNT: 0.0,
+    PRIORITY_REPORT: REPORT_RESERVE,
+}
+
+
+def endpoint_priority(endpoint):
+    for prefix, priority in ENDPOINT_PRIORITIES:
+        if endpoint.startswith(prefix):
+            return priority
+    if endpoint.split("?", 1)[0].endswith("/hist"):
+        return PRIORITY_REPORT
+    return PRIORITY_ACCOUNT
+
+
+class _Bucket:
+    # 時間一律用 time.time()：monotonic 的起點每個 process 不同，無法寫進共用檔案
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.blocked_until = 0.0
+
+    def refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now, floor=0.0):
+        """距離可取得一個 token（取完後仍 >= floor）還要多久"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        missing = floor + 1.0 - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+# ---------------------------------------------------------
+# 跨 process 共用狀態
+# ---------------------------------------------------------
+
+GLOBAL_KEY = "*"
+
+
+class _SharedState:
+    """
+    bucket 狀態檔：{key: [tokens, updated, blocked_until]}
+    with shared.locked(buckets): 進入時取得檔案鎖並把檔案內容讀入 buckets，
+    離開時把 buckets 寫回（保留檔案內其他 process 才有的 key）
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._fd = None
+        self._data = None
+        self._buckets = None
+
+    def locked(self, buckets):
+        self._buckets = buckets
+        return self
+
+    def __enter__(self):
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+        chunks = []
+        while True:
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        try:
+            self._data = json.loads(b"".join(chunks) or b"{}")
+        except ValueError:
+            self._data = {}
+
+        for key, bucket in self._buckets.items():
+            saved = self._data.get(key)
+            if saved:
+                bucket.tokens, bucket.updated, bucket.blocked_until = saved
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            for key, bucket in self._buckets.items():
+                self._data[key] = [bucket.tokens, bucket.updated, bucket.blocked_until]
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, json.dumps(self._data).encode("ascii"))
+        finally:
+            # 關閉檔案時會一併釋放 flock
+            os.close(self._fd)
+            self._fd = None
+
+
+class _LocalState:
+    """不共用時的替代品：什麼都不做"""
+
+    def locked(self, buckets):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def _default_state_path():
+    path = get_config().get("BFX_RATE_STATE_FILE")
+    if path:
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bfx_ratelimit")
+
+
+# ---------------------------------------------------------
+# Limiter
+# ---------------------------------------------------------
+
+class RateLimiter:
+    def __init__(self, limits=None, default_limit=DEFAULT_LIMIT, global_limit=None, state_path=None):
+        """
+        state_path: 共用狀態檔；None 時只在同一個 process 內限制
+        """
+        self._limits = ENDPOINT_LIMITS if limits is None else limits
+        self._default_limit = default_limit
+        if global_limit is None:
+            global_limit = get_config().get_int("BFX_RATE_GLOBAL_PER_MIN", 300)
+
+        self._global = _Bucket(global_limit)
+        self._buckets = {}
+        self._shared = _SharedState(state_path) if state_path and fcntl is not None else _LocalState()
+        self._waiting = []  # heap: (priority, seq, key)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _rule(self, endpoint):
+        path = endpoint.split("?", 1)[0]
+        for prefix, per_minute in self._limits:
+            if path.startswith(prefix):
+                return prefix, per_minute
+        return path, self._default_limit
+
+    def _bucket(self, endpoint):
+        key, per_minute = self._rule(endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(per_minute)
+        return key, bucket
+
+    def _all_buckets(self):
+        return dict(self._buckets, **{GLOBAL_KEY: self._global})
+
+    def _wait_time(self, key, priority, now):
+        bucket = self._buckets[key]
+        bucket.refill(now)
+        self._global.refill(now)
+        floor = self._global.capacity * RESERVES.get(priority, 0.0)
+        return max(bucket.wait_time(now), self._global.wait_time(now, floor))
+
+    def acquire(self, endpoint, priority=None):
+        """
+        阻塞直到可以送出 endpoint 的請求
+        回傳等待的秒數
+        """
+        if priority is None:
+            priority = endpoint_priority(endpoint)
+
+        start = time.monotonic()
+        with self._cond:
+            key, bucket = self._bucket(endpoint)
+            ticket = (priority, next(self._seq), key)
+            heapq.heappush(self._waiting, ticket)
+
+            try:
+                while True:
+                    with self._shared.locked(self._all_buckets()):
+                        now = time.time()
+                        wait = self._wait_time(key, priority, now)
+
+                        # 有更高優先權、而且現在就能送出的請求時，先讓它
+                        if wait <= 0 and not self._ahead_ready(ticket, now):
+                            bucket.tokens -= 1
+                            self._global.tokens -= 1
+                            break
+
+                    self._cond.wait(timeout=wait if wait > 0 else 0.05)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+        return time.monotonic() - start
+
+    def _ahead_ready(self, ticket, now):
+        for other in self._waiting:
+            if other < ticket and other[0] < ticket[0]:
+                if self._wait_time(other[2], other[0], now) <= 0:
+                    return True
+        return False
+
+    def penalize(self, endpoint, seconds):
+        """
+        收到 429 時呼叫：清空該 endpoint 與全域 bucket，暫停 seconds 秒
+        （超過限制時整個 IP 都被封鎖，其他 endpoint 繼續送只會延長封鎖；
+        全域 bucket 寫在共用狀態檔，其他 process 也會一起暫停）
+        """
+        with self._cond:
+            _, bucket = self._bucket(endpoint)
+            with self._shared.locked(self._all_buckets()):
+                now = time.time()
+                for target in (bucket, self._global):
+                    target.refill(now)
+                    target.tokens = min(target.tokens, 0.0)
+                    target.blocked_until = max(target.blocked_until, now + seconds)
+            self._cond.notify_all()
+
+
+# ---------------------------------------------------------
+# 共用 limiter
+# ---------------------------------------------------------
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _limiter
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(state_path=_default_state_path())
+    return _limiter
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    limiter = RateLimiter(limits=[("book/", 600)], global_limit=8)
+    order = []
+
+    def worker(endpoint, priority, name):
+        limiter.acquire(endpoint, priority)
+        order.append(name)
+
+    # 先用掉大部分全域 token，再讓報表與交易請求同時排隊
+    for _ in range(6):
+        limiter.acquire("book/fUST/P1")
+
+    threads = [
+        threading.Thread(target=worker, args=("auth/r/ledgers/UST/hist", PRIORITY_REPORT, f"report-{i}"))
+        for i in range(3)
+    ] + [
+        threading.Thread(target=worker, args=("auth/w/funding/offer/submit", PRIORITY_TRADE, f"trade-{i}"))
+        for i in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print("取得 token 的順序:", order)
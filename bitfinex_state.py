@@ -4,30 +4,47 @@
 """
 Bitfinex Public API – Funding Flash Return Rate (FRR)
 https://docs.bitfinex.com/reference/rest-public-funding-stats
+
+stats array：
+[MTS, _, _, FRR, AVG_PERIOD, _, _, FUNDING_AMOUNT, FUNDING_AMOUNT_USED, ...]
+
+需要歷史走勢時請用 greenleaf_funding_stats（本地時間序列，含每小時 / 每日彙總）
 """
 
-import requests
+from bitfinex_client import get_api_url, http_get
+from bitfinex_cache import cached
 
-API_BASE = "https://api-pub.bitfinex.com/v2"
+@cached("funding_stats")
+def _fetch_funding_stats(symbol, limit):
+    endpoint = f"/funding/stats/{symbol}/hist"
+    params = {"limit": limit}
 
-def get_frr_history(symbol="fUST", limit=1):
+    url = get_api_url(public=True) + endpoint
+    resp = http_get(url, params=params)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def get_funding_stats(symbol="fUST", start=None, end=None, limit=250):
     """
-    取得 Funding Flash Return Rate (FRR) 歷史資料（只取第一筆）
+    查詢 start <= MTS <= end 的 funding stats（新 → 舊，單頁最多 250 筆，不經過快取）
     """
-
     endpoint = f"/funding/stats/{symbol}/hist"
     params = {"limit": limit}
+    if start is not None:
+        params["start"] = start
+    if end is not None:
+        params["end"] = end
 
-    url = API_BASE + endpoint
-    resp = requests.get(url, params=params)
+    resp = http_get(get_api_url(public=True) + endpoint, params=params)
     resp.raise_for_status()
-    data = resp.json()
-
-    if not data:
-        return None
+    return resp.json()
 
-    row = data[0]  # 只取第一筆
 
+def format_frr(row):
+    """
+    stats array → FRR dict
+    """
     mts = row[0]            # timestamp (ms)
     frr_rate = row[3]       # FRR 日利率 (rate per day)
     avg_period = row[4]     # 平均借款天數
@@ -50,6 +67,19 @@ def get_frr_history(symbol="fUST", limit=1):
     return result
 
 
+def get_frr_history(symbol="fUST", limit=1):
+    """
+    取得 Funding Flash Return Rate (FRR) 歷史資料（只取第一筆）
+    """
+
+    data = _fetch_funding_stats(symbol, limit)
+
+    if not data:
+        return None
+
+    return format_frr(data[0])  # 只取第一筆
+
+
 # 測試用
 if __name__ == "__main__":
     hist = get_frr_history("fUST")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex WebSocket 帳戶事件
+---------------------------
+官方文件：
+https://docs.bitfinex.com/docs/ws-auth
+https://docs.bitfinex.com/reference/ws-auth-wallets
+https://docs.bitfinex.com/reference/ws-auth-funding-offers
+
+原本只有定期呼叫 get_wallets() 才會發現有閒置餘額，
+還款的資金最多要閒置一整個檢查間隔才會重新放貸。
+
+這裡用認證過的 WebSocket（channel 0）即時接收：
+    錢包        ws / wu
+    funding 掛單 fos / fon / fou / foc
+    變動利率放貸 fcs / fcn / fcu / fcc
+    固定利率放貸 fls / fln / flu / flc
+並維護目前的帳戶狀態（AccountState），事件以 asyncio.Queue 提供給其他程式。
+
+可被其他 Python 檔案 import：
+    from bitfinex_ws_account import AccountStream
+
+    stream = AccountStream()
+    queue = stream.subscribe()
+    asyncio.create_task(stream.run())
+
+    while True:
+        event = await queue.get()
+        if event.group == "wallet" and stream.state.funding_available("UST") > 150:
+            ...
+
+需要安裝：
+    pip install websockets
+"""
+
+import json
+import time
+import asyncio
+from collections import namedtuple
+
+
+AUTH_FILTERS = ("funding", "wallet")
+
+# 事件代碼 → (分類, 是否為 snapshot)
+EVENT_TYPES = {
+    "ws": ("wallet", True),
+    "wu": ("wallet", False),
+    "fos": ("offer", True),
+    "fon": ("offer", False),
+    "fou": ("offer", False),
+    "foc": ("offer", False),
+    "fcs": ("credit", True),
+    "fcn": ("credit", False),
+    "fcu": ("credit", False),
+    "fcc": ("credit", False),
+    "fls": ("loan", True),
+    "fln": ("loan", False),
+    "flu": ("loan", False),
+    "flc": ("loan", False),
+}
+
+CLOSE_EVENTS = {"foc", "fcc", "flc"}
+
+# wallet array：[WALLET_TYPE, CURRENCY, BALANCE, UNSETTLED_INTEREST, AVAILABLE_BALANCE, ...]
+WALLET_AVAILABLE = 4
+
+
+AccountEvent = namedtuple("AccountEvent", "type group snapshot data timestamp")
+
+
+class AccountAuthError(Exception):
+    pass
+
+
+# ---------------------------------------------------------
+# 帳戶狀態
+# ---------------------------------------------------------
+
+class AccountState:
+    def __init__(self):
+        self.wallets = {}   # (wallet_type, currency) -> wallet array
+        self.offers = {}    # id -> offer array
+        self.credits = {}   # id -> credit array
+        self.loans = {}     # id -> loan array
+        self.updated_at = 0.0
+
+    def _table(self, group):
+        return {"offer": self.offers, "credit": self.credits, "loan": self.loans}[group]
+
+    def apply(self, event):
+        if event.group == "wallet":
+            rows = event.data if event.snapshot else [event.data]
+            if event.snapshot:
+                self.wallets.clear()
+            for row in rows:
+                self.wallets[(row[0], row[1])] = row
+        else:
+            table = self._table(event.group)
+            if event.snapshot:
+                table.clear()
+                for row in event.data:
+                    table[row[0]] = row
+            elif event.type in CLOSE_EVENTS:
+                table.pop(event.data[0], None)
+            else:
+                table[event.data[0]] = event.data
+
+        self.updated_at = time.time()
+
+    def funding_available(self, currency="UST"):
+        """funding 錢包可用餘額，尚未收到或尚未計算時回傳 None"""
+        wallet = self.wallets.get(("funding", currency))
+        if wallet is None or len(wallet) <= WALLET_AVAILABLE:
+            return None
+        return wallet[WALLET_AVAILABLE]
+
+
+# ---------------------------------------------------------
+# 訊息處理
+# ---------------------------------------------------------
+
+class AccountMessageHandler:
+    def __init__(self, state=None):
+        self.state = state or AccountState()
+        self.authenticated = False
+        self.listeners = []
+
+    def handle(self, message):
+        """
+        處理一則 WebSocket 訊息（字串或已解析的 JSON）
+        回傳產生的 AccountEvent（沒有則為 None）；認證失敗時丟出 AccountAuthError
+        """
+        if isinstance(message, (str, bytes)):
+            message = json.loads(message)
+
+        if isinstance(message, dict):
+            if message.get("event") == "auth":
+                if message.get("status") != "OK":
+                    raise AccountAuthError(f"❌ WebSocket 認證失敗：{message.get('msg')}")
+                self.authenticated = True
+            return None
+
+        if not isinstance(message, list) or len(message) < 3 or message[0] != 0:
+            return None
+
+        event_type = message[1]
+        if event_type not in EVENT_TYPES:
+            return None
+
+        group, snapshot = EVENT_TYPES[event_type]
+        event = AccountEvent(event_type, group, snapshot, message[2], int(time.time() * 1000))
+        self.state.apply(event)
+
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+
+# ---------------------------------------------------------
+# WebSocket 連線
+# ---------------------------------------------------------
+
+class AccountStream:
+    def __init__(self, url=None, filters=AUTH_FILTERS, reconnect_delay=3.0, signer=None):
+        self.handler = AccountMessageHandler()
+        self.url = url
+        self.filters = filters
+        self.reconnect_delay = reconnect_delay
+        self._signer = signer
+        self._queues = []
+        self._stopped = False
+        self.handler.listeners.append(self._publish)
+
+    @property
+    def state(self):
+        return self.handler.state
+
+    def subscribe(self, maxsize=1000):
+        """
+        取得一個新的事件 queue（可以有多個消費者）
+        queue 滿了時丟掉最舊的事件，不會阻塞 WebSocket 接收
+        """
+        queue = asyncio.Queue(maxsize)
+        self._queues.append(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        if queue in self._queues:
+            self._queues.remove(queue)
+
+    def _publish(self, event):
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _calc_request(self, event):
+        """
+        wu 的可用餘額可能是 null，需要另外要求伺服器計算
+        回傳要送出的 calc 訊息，不需要時回傳 None
+        """
+        if event.group != "wallet":
+            return None
+        rows = event.data if event.snapshot else [event.data]
+        names = [
+            f"wallet_{row[0]}_{row[1]}"
+            for row in rows
+            if row[0] == "funding" and (len(row) <= WALLET_AVAILABLE or row[WALLET_AVAILABLE] is None)
+        ]
+        if not names:
+            return None
+        return json.dumps([0, "calc", None, [[name] for name in names]])
+
+    async def run(self):
+        """持續連線（斷線、握手或協定錯誤都自動重連），直到 stop()；認證失敗時直接丟出例外"""
+        import websockets
+        from bitfinex_client import get_ws_url
+
+        if self._signer is None:
+            from bitfinex_auth import get_signer
+            self._signer = get_signer()
+
+        while not self._stopped:
+            try:
+                async with websockets.connect(self.url or get_ws_url(), ping_interval=20) as ws:
+                    await ws.send(json.dumps(self._signer.ws_auth(self.filters)))
+
+                    async for message in ws:
+                        event = self.handler.handle(message)
+                        if event is not None:
+                            calc = self._calc_request(event)
+                            if calc:
+                                await ws.send(calc)
+                        if self._stopped:
+                            break
+                reason = "伺服器關閉連線"
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                reason = e
+
+            # 不論是錯誤或正常關閉，都等待後再重連
+            self.handler.authenticated = False
+            if not self._stopped:
+                print(f"⚠️ 帳戶 WebSocket 中斷：{reason}，{self.reconnect_delay} 秒後重連")
+                await asyncio.sleep(self.reconnect_delay)
+
+        self.handler.authenticated = False
+
+    def stop(self):
+        self._stopped = True
+
+
+# ---------------------------------------------------------
+# 可直接執行測試
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    async def _demo():
+        stream = AccountStream()
+        queue = stream.subscribe()
+        task = asyncio.create_task(stream.run())
+
+        try:
+            while True:
+                event = await queue.get()
+                print(f"📨 {event.type} ({event.group})：", json.dumps(event.data)[:200])
+                print("💰 funding UST 可用：", stream.state.funding_available("UST"))
+        finally:
+            stream.stop()
+            task.cancel()
+
+    asyncio.run(_demo())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bitfinex WebSocket Funding Order Book
+-------------------------------------
+官方文件：
+https://docs.bitfinex.com/reference/ws-public-books
+
+訂閱 WebSocket `book` channel，在記憶體中維護 funding 訂單簿：
+1️⃣ 收到 snapshot 後建立本地訂單簿，之後只套用增量更新
+2️⃣ 開啟 checksum（conf flag 131072），每次收到 "cs" 就比對 CRC32，
+   不一致時重新訂閱取得新的 snapshot
+3️⃣ rows() 回傳與 get_orderbook() 相同格式：
+   [rate, period, count, amount, annual_rate_percent]
+
+可被其他 Python 檔案 import：
+    from bitfinex_ws_book import FundingBookSubscriber, get_orderbook_fast
+
+    subscriber = FundingBookSubscriber("fUST", "P1", 25)
+    asyncio.create_task(subscriber.run())
+    rows = await get_orderbook_fast("fUST", "P1", 25)   # 有即時訂單簿就直接讀記憶體
+
+離線測試：
+    book = replay("recorded_book.jsonl", "fUST", "P1", 25)
+
+需要安裝：
+    pip install websockets
+"""
+
+import json
+import time
+import zlib
+import asyncio
+from bitfinex_orderbook import process_data
+from bitfinex_client import get_ws_url
+
+
+FLAG_CHECKSUM = 131072
+
+
+# ---------------------------------------------------------
+# 本地訂單簿
+# ---------------------------------------------------------
+
+def _format_number(value):
+    """checksum 使用的數字字串（避免 Python 的科學記號）"""
+    text = repr(value)
+    if "e" in text or "E" in text:
+        text = f"{value:.12f}".rstrip("0").rstrip(".")
+    if text.endswith(".0"):
+        text = text[:-2]
+    return text
+
+
+class LocalFundingBook:
+    """
+    以 (rate, period) 為 key 保存兩邊的價位
+    amount < 0：bid（借款需求），amount > 0：ask（放貸掛單）
+    """
+
+    def __init__(self, symbol="fUST", precision="P1", length=25):
+        self.symbol = symbol
+        self.precision = precision
+        self.length = length
+        self.bids = {}
+        self.asks = {}
+        self.synced = False
+        self.updated_at = 0.0
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.synced = False
+
+    def apply_snapshot(self, entries):
+        self.clear()
+        for entry in entries:
+            self.apply_update(entry)
+        self.synced = True
+
+    def apply_update(self, entry):
+        rate, period, count, amount = entry[:4]
+        key = (rate, period)
+
+        if count > 0:
+            side, other = (self.bids, self.asks) if amount < 0 else (self.asks, self.bids)
+            side[key] = [rate, period, count, amount]
+            other.pop(key, None)
+        elif amount < 0:
+            self.bids.pop(key, None)
+        else:
+            self.asks.pop(key, None)
+
+        self.updated_at = time.time()
+
+    def sorted_bids(self):
+        return sorted(self.bids.values(), key=lambda x: x[0], reverse=True)
+
+    def sorted_asks(self):
+        return sorted(self.asks.values(), key=lambda x: x[0])
+
+    def raw_rows(self):
+        """bids（利率高→低）之後接 asks（利率低→高），與 REST snapshot 同格式"""
+        return self.sorted_bids() + self.sorted_asks()
+
+    def rows(self):
+        """與 get_orderbook() 相同：去重 + 年化"""
+        return process_data(self.raw_rows(), unique_idx=1, rate_idx=0)
+
+    def array(self):
+        """與 rows() 相同內容的 FundingBook（NumPy 陣列）"""
+        from bitfinex_book import FundingBook
+        return FundingBook.from_raw(self.raw_rows()).unique_by_period()
+
+    def checksum(self):
+        bids = self.sorted_bids()
+        asks = self.sorted_asks()
+        parts = []
+
+        for i in range(25):
+            if i < len(bids):
+                parts += [_format_number(bids[i][0]), _format_number(bids[i][3])]
+            if i < len(asks):
+                parts += [_format_number(asks[i][0]), _format_number(asks[i][3])]
+
+        value = zlib.crc32(":".join(parts).encode("utf8"))
+        # Bitfinex 傳送的是 signed 32-bit 整數
+        return value - (1 << 32) if value >= (1 << 31) else value
+
+
+# ---------------------------------------------------------
+# 訊息處理（連線與 replay 共用）
+# ---------------------------------------------------------
+
+class BookChecksumError(Exception):
+    pass
+
+
+class BookMessageHandler:
+    def __init__(self, book, verify_checksum=True):
+        self.book = book
+        self.verify_checksum = verify_checksum
+        self.chan_id = None
+        self.listeners = []
+
+    def handle(self, message):
+        """
+        處理一則 WebSocket 訊息（字串或已解析的 JSON）
+        checksum 不一致時丟出 BookChecksumError
+        """
+        if isinstance(message, (str, bytes)):
+            message = json.loads(message)
+
+        if isinstance(message, dict):
+            if message.get("event") == "subscribed" and message.get("channel") == "book":
+                self.chan_id = message["chanId"]
+                self.book.clear()
+            return
+
+        if not isinstance(message, list) or len(message) < 2:
+            return
+        if self.chan_id is not None and message[0] != self.chan_id:
+            return
+
+        payload = message[1]
+
+        if payload == "hb":
+            return
+
+        if payload == "cs":
+            if self.verify_checksum and self.book.synced:
+                expected = message[2]
+                actual = self.book.checksum()
+                if actual != expected:
+                    self.book.synced = False
+                    raise BookChecksumError(f"❌ checksum 不一致：本地 {actual} / 伺服器 {expected}")
+            return
+
+        if payload and isinstance(payload[0], list):
+            self.book.apply_snapshot(payload)
+        else:
+            self.book.apply_update(payload)
+
+        for listener in self.listeners:
+            listener(self.book, payload)
+
+
+def replay(messages, symbol="fUST", precision="P1", length=25, verify_checksum=True):
+    """
+    離線重播錄下來的訊息
+    messages: 訊息 list，或 JSONL 檔案路徑（每行一則原始訊息）
+    回傳重播後的 LocalFundingBook
+    """
+    book = LocalFundingBook(symbol, precision, length)
+    handler = BookMessageHandler(book, verify_checksum)
+
+    if isinstance(messages, str):
+        with open(messages, encoding="utf-8") as f:
+            messages = [line for line in f if line.strip()]
+
+    for message in messages:
+        handler.handle(message)
+    return book
+
+
+# ---------------------------------------------------------
+# WebSocket 訂閱
+# ---------------------------------------------------------
+
+_live_books = {}
+
+
+class FundingBookSubscriber:
+    def __init__(self, symbol="fUST", precision="P1", length=25, url=None,
+                 verify_checksum=True, record_path=None, reconnect_delay=3.0):
+        self.book = LocalFundingBook(symbol, precision, length)
+        self.handler = BookMessageHandler(self.book, verify_checksum)
+        self.url = url
+        self.record_path = record_path
+        self.reconnect_delay = reconnect_delay
+        self._stopped = False
+
+    @property
+    def key(self):
+        return (self.book.symbol, self.book.precision, self.book.length)
+
+    def _subscribe_message(self):
+        return json.dumps({
+            "event": "subscribe",
+            "channel": "book",
+            "symbol": self.book.symbol,
+            "prec": self.book.precision,
+            "len": str(self.book.length),
+        })
+
+    async def run(self):
+        """持續連線（斷線、握手或協定錯誤都自動重連），直到 stop()"""
+        import websockets
+
+        _live_books[self.key] = self.book
+        record = open(self.record_path, "a", encoding="utf-8") if self.record_path else None
+
+        try:
+            while not self._stopped:
+                try:
+                    async with websockets.connect(self.url or get_ws_url(public=True), ping_interval=20) as ws:
+                        await ws.send(json.dumps({"event": "conf", "flags": FLAG_CHECKSUM}))
+                        await ws.send(self._subscribe_message())
+
+                        async for message in ws:
+                            if record:
+                                record.write(message + "\n")
+                            try:
+                                self.handler.handle(message)
+                            except BookChecksumError as e:
+                                print(e, "→ 重新訂閱")
+                                await self._resubscribe(ws)
+                            if self._stopped:
+                                break
+                    reason = "伺服器關閉連線"
+                except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                    reason = e
+
+                # 不論是錯誤或正常關閉，都視為斷線：標記未同步並等待後再重連
+                self.book.synced = False
+                if not self._stopped:
+                    print(f"⚠️ 訂單簿 WebSocket 中斷：{reason}，{self.reconnect_delay} 秒後重連")
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            self.book.synced = False
+            if _live_books.get(self.key) is self.book:
+                del _live_books[self.key]
+            if record:
+                record.close()
+
+    async def _resubscribe(self, ws):
+        if self.handler.chan_id is not None:
+            await ws.send(json.dumps({"event": "unsubscribe", "chanId": self.handler.chan_id}))
+            self.handler.chan_id = None
+        await ws.send(self._subscribe_message())
+
+    def stop(self):
+        self._stopped = True
+
+
+# ---------------------------------------------------------
+# 主要 API 函式（給其他檔案呼叫）
+# ---------------------------------------------------------
+
+def get_live_orderbook(symbol="fUST", precision="P1", length=25, max_age=30.0):
+    """
+    有正在執行、已同步的訂閱時直接回傳記憶體中的訂單簿，否則回傳 None
+    max_age: 超過幾秒沒有任何更新就視為過期
+    """
+    book = _live_books.get((symbol, precision, length))
+    if book is None or not book.synced:
+        return None
+    if time.time() - book.updated_at > max_age:
+        return None
+    return book.rows()
+
+
+async def get_orderbook_fast(symbol="fUST", precision="P1", length=25, max_age=30.0):
+    """優先讀取即時訂單簿，沒有時改用 REST"""
+    rows = get_live_orderbook(symbol, precision, length, max_age)
+    if rows is not None:
+        return rows
+
+    from bitfinex_async import get_orderbook_async
+    return await get_orderbook_async(symbol, precision, length)
+
+
+# ---------------------------------------------------------
+# 可直接執行測試
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    async def _demo():
+        subscriber = FundingBookSubscriber("fUST", "P1", 25)
+        task = asyncio.create_task(subscriber.run())
+
+        for _ in range(5):
+            await asyncio.sleep(2)
+            rows = get_live_orderbook("fUST", "P1", 25)
+            print("📊 即時訂單簿：", rows[:3] if rows else "尚未同步")
+
+        subscriber.stop()
+        task.cancel()
+
+    asyncio.run(_demo())
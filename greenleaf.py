@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GreenLeaf 命令列工具
+--------------------
+所有功能的單一入口，每個子指令執行時才 import 需要的模組，
+cron 只跑一個功能時不必載入其他模組。
+
+使用方式：
+    python3 greenleaf.py place              # 功能1：查詢餘額 + 批次掛單（main.py）
+    python3 greenleaf.py place --depth      # 依訂單簿深度替每一筆定價
+    python3 greenleaf.py place --reconcile  # 只取消 / 補送有差異的掛單
+    python3 greenleaf.py cancel-all         # 功能2：取消所有掛單
+    python3 greenleaf.py alert --threshold 150
+    python3 greenleaf.py bot                # 啟動 Telegram Bot
+    python3 greenleaf.py daemon             # 常駐排程：定期檢查餘額並掛單、通知、快照
+    python3 greenleaf.py orderbook --symbol fUST
+    python3 greenleaf.py wallets
+    python3 greenleaf.py frr
+    python3 greenleaf.py frr --tier hour --days 7   # 本地 FRR 走勢（每小時彙總）
+    python3 greenleaf.py credits / loans / offers
+    python3 greenleaf.py ledger-sync        # 同步利息紀錄到本地 SQLite（greenleaf.db）
+    python3 greenleaf.py backfill credits --days 1095 --output credits.json
+    python3 greenleaf.py candles --days 90  # 同步 funding 1m K 線（trade:1m:fUST:a30:p2:p30）
+    python3 greenleaf.py backtest --keys trade:1m:fUST:p2,trade:1m:fUST:p30 --max-days 2,30 --batch-size 100,200,500
+    python3 greenleaf.py fake-server        # 本地 Bitfinex（離線測試 / 壓測）
+    python3 greenleaf.py report             # 每日利息、1/7/30/365 天年化、總資金年化
+"""
+
+import sys
+import json
+import argparse
+
+
+# ---------------------------------------------------------
+# 子指令
+# ---------------------------------------------------------
+
+def cmd_place(args):
+    from main import run
+    run(depth_aware=args.depth, reconcile=args.reconcile)
+
+
+def cmd_cancel_all(args):
+    from bitfinex_funding_cancel_all_offer import get_wallets as cancel_all
+    cancel_all()
+
+
+def cmd_alert(args):
+    from telegram_balance_alert import check_funding_balance
+    check_funding_balance(threshold=args.threshold)
+
+
+def cmd_bot(args):
+    from telegram_bot_listener import main
+    main()
+
+
+def cmd_daemon(args):
+    from greenleaf_daemon import main
+    main(depth_aware=args.depth, reconcile=args.reconcile)
+
+
+def cmd_orderbook(args):
+    from bitfinex_orderbook import get_orderbook, get_top5_rates
+
+    data = get_orderbook(args.symbol, args.precision, args.length)
+    print(json.dumps(data, indent=2))
+    print("\n🔥 前五筆利率最高：")
+    print(json.dumps(get_top5_rates(data), indent=2))
+
+
+def cmd_wallets(args):
+    from bitfinex_wallets_reader import get_wallets, get_funding_ust_values
+
+    wallets = get_wallets()
+    print(json.dumps(wallets, indent=2))
+    print("📡 funding UST 餘額:", get_funding_ust_values(wallets))
+
+
+def cmd_frr(args):
+    if args.tier is None:
+        from bitfinex_state import get_frr_history
+        print(json.dumps(get_frr_history(args.symbol), indent=2))
+        return
+
+    import time
+    from greenleaf_funding_stats import sync_funding_stats, get_series, DAY_MS
+
+    sync_funding_stats(args.symbol)
+    start = int(time.time() * 1000) - args.days * DAY_MS
+    for row in get_series(args.symbol, args.tier, start=start):
+        mts = time.strftime("%Y-%m-%d %H:%M", time.gmtime(row[0] / 1000))
+        print(f"{mts}  FRR 年化 {row[1] * 365 * 100:8.4f}%")
+
+
+def cmd_credits(args):
+    from bitfinex_funding_credits import get_funding_credits
+    print(json.dumps(get_funding_credits(args.symbol), indent=2, ensure_ascii=False))
+
+
+def cmd_loans(args):
+    from bitfinex_funding_loan import get_funding_loans
+    print(json.dumps(get_funding_loans(args.symbol), indent=2, ensure_ascii=False))
+
+
+def cmd_offers(args):
+    from bitfinex_funding_active_offer import get_funding_offers
+    print(json.dumps(get_funding_offers(), indent=2))
+
+
+def cmd_ledger_sync(args):
+    from greenleaf_ledger_sync import sync_ledgers
+    added = sync_ledgers(args.currency, category=args.category, wallet=args.wallet)
+    print(f"✅ 新增 {added} 筆 ledgers")
+
+
+def cmd_backfill(args):
+    import time
+    from greenleaf_backfill import backfill_history, DAY_MS
+
+    end = int(time.time() * 1000)
+    rows = backfill_history(args.kind, args.symbol, start=end - args.days * DAY_MS, end=end,
+                            window_days=args.window)
+    text = json.dumps(rows, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"✅ {args.kind}：{len(rows)} 筆，已寫入 {args.output}")
+    else:
+        print(text)
+
+
+def cmd_candles(args):
+    from bitfinex_candles import candle_key
+    from greenleaf_candles import sync_candles, find_gaps, repair_gaps, get_candle_store
+
+    key = candle_key(args.symbol, args.timeframe, args.period)
+    written = sync_candles(key, days=args.days)
+    if args.gaps:
+        written += repair_gaps(key)
+
+    store = get_candle_store(key)
+    print(f"✅ {key} 寫入 {written} 筆，本地共 {len(store)} 筆")
+    gaps = find_gaps(key)
+    if gaps:
+        print(f"🕳️ 缺口 {len(gaps)} 個：", gaps[:10])
+
+
+def cmd_backtest(args):
+    from greenleaf_config import get_config
+    from greenleaf_backtest import load_market, run_grid
+
+    keys = args.keys or get_config().get("GREENLEAF_CANDLE_KEYS", "trade:1m:fUST:a30:p2:p30")
+    market = load_market([k.strip() for k in keys.split(",") if k.strip()], days=args.days)
+
+    def values(text, cast):
+        return [cast(x) for x in text.split(",") if x.strip()]
+
+    grid = {
+        "max_days": values(args.max_days, int),
+        "batch_size": values(args.batch_size, float),
+        "min_chunk": values(args.min_chunk, float),
+        "rate_offset": values(args.rate_offset, float),
+    }
+    results = run_grid(market, grid, max_workers=args.workers, capital=args.capital)
+
+    print(f"📊 {len(results)} 組參數（{args.days} 天，本金 {args.capital} UST），依年化排序：")
+    for item in results[:args.top]:
+        print(
+            f"max_days={item['max_days']:>3} batch={item['batch_size']:>6g} min_chunk={item['min_chunk']:>4g} "
+            f"offset={item['rate_offset']:>5g} | 年化 {item['apr']:7.3f}% | 成交 {item['loans']:>4} 筆 "
+            f"| 等待中位數 {item['wait_median']} 分 | 未成交 {item['unfilled']}"
+        )
+
+
+def cmd_fake_server(args):
+    import time
+    from bitfinex_fake_server import FakeBitfinex, benchmark
+
+    if args.bench:
+        for count, elapsed, rate in benchmark(orders=args.bench, latency=args.latency):
+            print(f"🚀 workers={count:>2}：{elapsed:.2f} 秒，{rate:.1f} 筆/秒")
+        return
+
+    server = FakeBitfinex(port=args.port, ws_port=args.ws_port, latency=args.latency,
+                          error_rate=args.error_rate, balance=args.balance, time_scale=args.time_scale)
+    with server:
+        print("✅ 本地 Bitfinex 已啟動，請在 .env 或環境變數加入：")
+        for name, value in server.env().items():
+            print(f"{name}={value}")
+        try:
+            while True:
+                time.sleep(60)
+                print(f"📡 已處理 {server.requests} 個 REST 請求")
+        except KeyboardInterrupt:
+            print("🛑 停止")
+
+
+def cmd_report(args):
+    from greenleaf_analytics import update_daily_interest, build_report
+
+    if args.sync:
+        from greenleaf_ledger_sync import sync_ledgers
+        sync_ledgers(args.currency, category=28)
+    update_daily_interest(args.currency)
+    report = build_report(args.currency)
+
+    if report["latest"] is None:
+        print("⚠️ 本地沒有利息紀錄，請先執行 ledger-sync")
+        return
+
+    print(f"💰 總利息：{report['total_interest']:.4f} {args.currency}（{len(report['days'])} 天）")
+    print(f"📈 總資金年化：{report['total_apr']}%")
+    print(json.dumps(report["latest"], indent=2))
+
+
+# ---------------------------------------------------------
+# 參數解析
+# ---------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="greenleaf", description="GreenLeaf Bitfinex 放貸工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("place", help="查詢餘額並批次掛單")
+    p.add_argument("--depth", action="store_true", help="依訂單簿深度替每一筆定價")
+    p.add_argument("--reconcile", action="store_true", help="與目前掛單比對，只取消 / 補送有差異的掛單")
+    p.set_defaults(func=cmd_place)
+
+    sub.add_parser("cancel-all", help="取消所有掛單").set_defaults(func=cmd_cancel_all)
+
+    p = sub.add_parser("alert", help="餘額超過門檻時發送 Telegram 通知")
+    p.add_argument("--threshold", type=float, default=1)
+    p.set_defaults(func=cmd_alert)
+
+    sub.add_parser("bot", help="啟動 Telegram Bot").set_defaults(func=cmd_bot)
+
+    p = sub.add_parser("daemon", help="常駐排程：定期檢查餘額並掛單、通知、快照")
+    p.add_argument("--depth", action="store_true", help="依訂單簿深度替每一筆定價")
+    p.add_argument("--reconcile", action="store_true", help="與目前掛單比對，只取消 / 補送有差異的掛單")
+    p.set_defaults(func=cmd_daemon)
+
+    p = sub.add_parser("orderbook", help="查詢訂單簿與前五高利率")
+    p.add_argument("--symbol", default="fUST")
+    p.add_argument("--precision", default="P1")
+    p.add_argument("--length", type=int, default=25)
+    p.set_defaults(func=cmd_orderbook)
+
+    sub.add_parser("wallets", help="查詢錢包與 funding 餘額").set_defaults(func=cmd_wallets)
+
+    p = sub.add_parser("frr", help="查詢市場 FRR（--tier 顯示本地歷史走勢）")
+    p.add_argument("--symbol", default="fUST")
+    p.add_argument("--tier", choices=["raw", "hour", "day"], help="本地時間序列的粒度")
+    p.add_argument("--days", type=int, default=7)
+    p.set_defaults(func=cmd_frr)
+
+    for name, func, default_symbol, help_text in [
+        ("credits", cmd_credits, "fUST", "查詢變動利率放貸"),
+        ("loans", cmd_loans, "fUST", "查詢固定利率放貸"),
+    ]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--symbol", default=default_symbol)
+        p.set_defaults(func=func)
+
+    sub.add_parser("offers", help="查詢目前掛單").set_defaults(func=cmd_offers)
+
+    p = sub.add_parser("ledger-sync", help="同步 ledgers 到本地 SQLite")
+    p.add_argument("--currency", default="UST")
+    p.add_argument("--category", type=int, default=28, help="28 = 利息")
+    p.add_argument("--wallet", default="funding")
+    p.set_defaults(func=cmd_ledger_sync)
+
+    p = sub.add_parser("candles", help="同步 funding K 線到本地（data/candles）")
+    p.add_argument("--symbol", default="fUST")
+    p.add_argument("--timeframe", default="1m")
+    p.add_argument("--period", default="a30:p2:p30", help="例如 p2、p30、a30:p2:p30")
+    p.add_argument("--days", type=int, default=None, help="回補天數（預設 GREENLEAF_CANDLE_DAYS）")
+    p.add_argument("--gaps", action="store_true", help="重新抓取缺口")
+    p.set_defaults(func=cmd_candles)
+
+    p = sub.add_parser("backtest", help="用本地 K 線回測掛單參數")
+    p.add_argument("--keys", help="candle key，逗號分隔（預設 GREENLEAF_CANDLE_KEYS）")
+    p.add_argument("--days", type=int, default=90)
+    p.add_argument("--capital", type=float, default=1000)
+    p.add_argument("--max-days", default="30")
+    p.add_argument("--batch-size", default="200")
+    p.add_argument("--min-chunk", default="150")
+    p.add_argument("--rate-offset", default="0", help="例如 0,0.05,0.1（利率提高的比例）")
+    p.add_argument("--workers", type=int)
+    p.add_argument("--top", type=int, default=10)
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser("fake-server", help="啟動本地 Bitfinex 測試伺服器（REST + WebSocket）")
+    p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--ws-port", type=int, default=8081)
+    p.add_argument("--latency", type=float, default=0.08, help="每個請求的延遲中位數（秒）")
+    p.add_argument("--error-rate", type=float, default=0.0, help="隨機回傳 5xx 的比例")
+    p.add_argument("--balance", type=float, default=10000)
+    p.add_argument("--time-scale", type=float, default=1.0, help="放貸週期加速倍數")
+    p.add_argument("--bench", type=int, help="壓測：送出 N 筆掛單並比較不同平行數")
+    p.set_defaults(func=cmd_fake_server)
+
+    p = sub.add_parser("report", help="利息與年化報酬報表（本地資料）")
+    p.add_argument("--currency", default="UST")
+    p.add_argument("--sync", action="store_true", help="先同步 ledgers")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("backfill", help="平行回補 funding 歷史資料")
+    p.add_argument("kind", choices=["credits", "loans", "offers", "trades", "ledgers"])
+    p.add_argument("--symbol", default="fUST", help="ledgers 請用幣別，例如 UST")
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--window", type=int, default=30, help="初始區間天數")
+    p.add_argument("--output")
+    p.set_defaults(func=cmd_backfill)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GreenLeaf 通知引擎
+------------------
+原本 telegram_balance_alert 每次執行只要餘額超過門檻就送一次通知，
+cron 每 5 分鐘跑一次就會收到一樣的訊息；還款、放款成功也沒有通知。
+
+AlertEngine：
+1️⃣ 邊緣觸發：門檻只在「未超過 → 超過」時通知一次，回到門檻以下才重新武裝
+2️⃣ 放貸狀態差異：比對前後兩次的 credits / loans，
+   新出現 → 放款成功，消失 → 還款
+3️⃣ 去重：同一個通知 key 在 ALERT_DEDUP_SECONDS 內只送一次
+4️⃣ 批次：通知先累積，flush() 時合併成一則 Telegram 訊息
+5️⃣ 狀態寫入 JSON 檔，cron 分次執行也能正確判斷邊緣
+
+資料來源可以是定期查詢（observe_positions）或帳戶 WebSocket（observe_event）。
+
+可用環境變數或 .env 調整：
+    GREENLEAF_ALERT_STATE   狀態檔（預設 greenleaf_alerts.json）
+    GREENLEAF_ALERT_BATCH   WebSocket 事件累積幾秒後送出（預設 5）
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from greenleaf_config import get_config
+
+
+ALERT_DEDUP_SECONDS = 7 * 86400
+
+TELEGRAM_LIMIT = 4000
+
+# credit / loan array：[ID, SYMBOL, SIDE, MTS_CREATE, MTS_UPDATE, AMOUNT, FLAGS, STATUS, ..., RATE, PERIOD, ...]
+POSITION_AMOUNT = 5
+POSITION_RATE = 11
+POSITION_PERIOD = 12
+
+POSITION_NAMES = {"credit": "變動利率", "loan": "固定利率"}
+
+
+def _position_from_row(row):
+    return {
+        "id": row[0],
+        "amount": row[POSITION_AMOUNT],
+        "rate": row[POSITION_RATE] or 0,
+        "period": row[POSITION_PERIOD],
+    }
+
+
+def _position_from_item(item):
+    """get_funding_credits / get_funding_loans 整理後的 item"""
+    return {
+        "id": item["id"],
+        "amount": item["amount"],
+        "rate": item["rate"] or 0,
+        "period": item["period"],
+    }
+
+
+def _describe(position):
+    annual = round(position["rate"] * 365 * 100, 2)
+    return f"{abs(position['amount'])} UST @ 年化 {annual}% / {position['period']}天"
+
+
+class AlertEngine:
+    def __init__(self, state_path=None, send=None):
+        """
+        send: 送出一則文字的函式，預設 telegram_balance_alert.send_telegram_message
+        """
+        self.state_path = state_path or get_config().get("GREENLEAF_ALERT_STATE", "greenleaf_alerts.json")
+        self._send = send
+        self._pending = []          # [(去重 key 或 None, 文字), ...]
+        self._queued = set()        # 待送中（含送出中）的去重 key
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.state = self._load()
+
+    # -----------------------------
+    # 狀態檔
+    # -----------------------------
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("levels", {})
+        state.setdefault("positions", {})
+        state.setdefault("sent", {})
+        return state
+
+    def save(self):
+        # 在 lock 內序列化一份副本，避免 observe_event 同時修改 dict
+        with self._lock:
+            data = json.dumps(self.state, ensure_ascii=False)
+
+        with self._save_lock:
+            tmp = f"{self.state_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.state_path)
+
+    # -----------------------------
+    # 產生通知
+    # -----------------------------
+
+    def push(self, text):
+        """直接加入待送通知（已由呼叫端自行去重，例如 greenleaf_rate_detector）"""
+        with self._lock:
+            self._pending.append((None, text))
+
+    def notify(self, key, text):
+        """
+        加入待送通知；同一個 key 已送過（且未過期）或已在待送中時忽略
+        key 在實際送出成功後才記錄為已送出
+        """
+        now = time.time()
+        with self._lock:
+            sent = self.state["sent"]
+            if key in sent and now - sent[key] < ALERT_DEDUP_SECONDS:
+                return False
+            if key in self._queued:
+                return False
+            self._queued.add(key)
+            self._pending.append((key, text))
+            return True
+
+    def observe_level(self, name, active, text):
+        """
+        邊緣觸發：active 由 False 變 True 時通知一次
+        回傳是否產生通知
+        """
+        with self._lock:
+            was_active = self.state["levels"].get(name, False)
+            self.state["levels"][name] = bool(active)
+
+        if active and not was_active:
+            with self._lock:
+                self._pending.append((None, text))
+            return True
+        return False
+
+    def observe_positions(self, group, positions):
+        """
+        group: "credit" 或 "loan"
+        positions: 目前完整的放貸列表（get_funding_credits()["items"] 或原始 array）
+        第一次觀察只記錄狀態，不通知
+        """
+        current = {}
+        for item in positions:
+            position = _position_from_item(item) if isinstance(item, dict) else _position_from_row(item)
+            current[str(position["id"])] = position
+
+        with self._lock:
+            previous = self.state["positions"].get(group)
+            self.state["positions"][group] = current
+
+        if previous is None:
+            return
+
+        name = POSITION_NAMES.get(group, group)
+        for key in current.keys() - previous.keys():
+            self.notify(f"open:{group}:{key}", f"✅ 放款成功（{name}）：{_describe(current[key])}")
+        for key in previous.keys() - current.keys():
+            self.notify(f"close:{group}:{key}", f"💸 已還款（{name}）：{_describe(previous[key])}")
+
+    def observe_event(self, event):
+        """bitfinex_ws_account 的 AccountEvent"""
+        if event.group not in POSITION_NAMES:
+            return
+
+        if event.snapshot:
+            self.observe_positions(event.group, event.data)
+            return
+
+        position = _position_from_row(event.data)
+        key = str(position["id"])
+        name = POSITION_NAMES[event.group]
+
+        with self._lock:
+            table = self.state["positions"].setdefault(event.group, {})
+            if event.type in ("fcc", "flc"):
+                previous = table.pop(key, None)
+            else:
+                previous = table.get(key)
+                table[key] = position
+
+        if event.type in ("fcn", "fln"):
+            self.notify(f"open:{event.group}:{key}", f"✅ 放款成功（{name}）：{_describe(position)}")
+        elif event.type in ("fcc", "flc"):
+            self.notify(f"close:{event.group}:{key}", f"💸 已還款（{name}）：{_describe(previous or position)}")
+
+    # -----------------------------
+    # 送出
+    # -----------------------------
+
+    @property
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """
+        把累積的通知合併送出並儲存狀態，回傳送出的則數
+        send 失敗時，尚未送出的通知放回待送（下次 flush 重送）後再拋出例外
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            cutoff = time.time() - ALERT_DEDUP_SECONDS
+            self.state["sent"] = {k: v for k, v in self.state["sent"].items() if v >= cutoff}
+
+        # [(合併後的文字, [(key, text), ...]), ...]
+        messages = []
+        for item in pending:
+            text = item[1]
+            if messages and len(messages[-1][0]) + len(text) + 1 <= TELEGRAM_LIMIT:
+                messages[-1][0] += "\n" + text
+                messages[-1][1].append(item)
+            else:
+                messages.append([text, [item]])
+
+        send = self._send
+        if send is None:
+            from telegram_balance_alert import send_telegram_message as send
+
+        done = 0
+        try:
+            for text, items in messages:
+                print(text)
+                send(text)
+                done += 1
+
+                now = time.time()
+                with self._lock:
+                    for key, _ in items:
+                        if key is not None:
+                            self.state["sent"][key] = now
+                            self._queued.discard(key)
+        except Exception:
+            with self._lock:
+                unsent = [item for _, items in messages[done:] for item in items]
+                self._pending = unsent + self._pending
+            raise
+        finally:
+            self.save()
+
+        return done
+
+
+# ---------------------------------------------------------
+# 定期查詢
+# ---------------------------------------------------------
+
+def poll_positions(engine, symbol="fUST"):
+    """查詢 credits / loans 並比對差異（不會 flush）"""
+    from bitfinex_funding_credits import get_funding_credits
+    from bitfinex_funding_loan import get_funding_loans
+
+    engine.observe_positions("credit", get_funding_credits(symbol)["items"])
+    engine.observe_positions("loan", get_funding_loans(symbol)["items"])
+
+
+# ---------------------------------------------------------
+# WebSocket 事件
+# ---------------------------------------------------------
+
+async def consume_events(queue, engine, batch_window=None):
+    """
+    從 AccountStream.subscribe() 的 queue 讀取事件，
+    第一則通知出現後等待 batch_window 秒，把期間的通知合併送出
+    """
+    if batch_window is None:
+        batch_window = get_config().get_float("GREENLEAF_ALERT_BATCH", 5)
+
+    loop = asyncio.get_running_loop()
+    deadline = None
+
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout)
+            engine.observe_event(event)
+            if deadline is None and engine.has_pending:
+                deadline = loop.time() + batch_window
+        except asyncio.TimeoutError:
+            try:
+                await asyncio.to_thread(engine.flush)
+                deadline = None
+            except Exception as e:
+                # 通知已放回待送，稍後再試；不讓單次失敗結束整個通知 task
+                print(f"⚠️ 通知送出失敗，{batch_window:g} 秒後重試：{e}")
+                deadline = loop.time() + batch_window
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "alerts.json")
+    engine = AlertEngine(path, send=lambda text: None)
+
+    engine.observe_positions("credit", [{"id": 1, "amount": 200, "rate": 0.0003, "period": 30}])
+    engine.observe_level("balance", True, "🚨 Funding UST 餘額 400 (> 150)")
+    engine.observe_level("balance", True, "🚨 Funding UST 餘額 400 (> 150)")  # 不會重複
+    engine.observe_positions("credit", [{"id": 2, "amount": 200, "rate": 0.0004, "period": 7}])
+    print("📨 送出", engine.flush(), "則")
+
+    engine = AlertEngine(path, send=lambda text: None)   # 重新載入狀態（模擬下一次 cron）
+    engine.observe_level("balance", True, "🚨 Funding UST 餘額 400 (> 150)")
+    print("📨 重新執行後送出", engine.flush(), "則")
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+利息與年化報酬分析
+------------------
+紀錄介面需要：每日利息、每日年化、總資金年化。
+
+1️⃣ 每日彙總（materialized）：
+   由本地 ledgers（greenleaf_ledger_sync，category 28 = 利息）彙總到 daily_interest 表，
+   只重算有新資料的日子：ledger 同步每次寫入都會記錄涵蓋的 MTS 範圍（dirty range），
+   這裡重算該範圍內的日子後清除；同步中斷後才補進中間的日子也會被重算
+2️⃣ 滾動年化（向量化）：
+   把每日利息與本金攤成連續的日陣列，用 cumsum 一次算出所有日子的 1 / 7 / 30 / 365 天 APR
+   本金優先使用帳戶快照（greenleaf_snapshots）的每日平均 balance，
+   沒有快照的日子改用 ledger 的 balance（入帳後餘額 - 當日利息）
+
+使用方式：
+    python3 greenleaf.py report
+
+    from greenleaf_analytics import update_daily_interest, build_report
+    update_daily_interest("UST")
+    report = build_report("UST")
+"""
+
+import numpy as np
+from greenleaf_db import connect, get_checkpoint, set_checkpoint
+
+
+DAY_MS = 86400 * 1000
+INTEREST_CATEGORY = 28
+DEFAULT_WINDOWS = (1, 7, 30, 365)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_interest (
+    currency TEXT NOT NULL,
+    day INTEGER NOT NULL,          -- UTC 日序號（mts // 86400000）
+    interest REAL NOT NULL,
+    balance REAL,                  -- 當日最後一筆利息入帳後的餘額
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (currency, day)
+);
+"""
+
+
+# ---------------------------------------------------------
+# 每日彙總
+# ---------------------------------------------------------
+
+def _refresh_days(conn, currency, min_mts=None, max_mts=None):
+    """重算 min_mts <= mts < max_mts 之間的日子"""
+    where = "currency = ? AND category = ?"
+    params = [currency, INTEREST_CATEGORY]
+    if min_mts is not None:
+        where += " AND mts >= ?"
+        params.append(min_mts)
+    if max_mts is not None:
+        where += " AND mts < ?"
+        params.append(max_mts)
+
+    # SQLite：只有一個 MAX() 時，balance 取自 mts 最大的那一筆（當日最後入帳後的餘額）
+    cursor = conn.execute(
+        f"""
+        INSERT OR REPLACE INTO daily_interest (currency, day, interest, balance, entries)
+        SELECT ?, d, interest, balance, entries FROM (
+            SELECT mts / {DAY_MS} AS d, SUM(amount) AS interest, balance, COUNT(*) AS entries, MAX(mts)
+            FROM ledgers WHERE {where}
+            GROUP BY d
+        )
+        """,
+        [currency] + params,
+    )
+    return cursor.rowcount
+
+
+def update_daily_interest(currency="UST", conn=None):
+    """
+    把新的利息紀錄彙總到 daily_interest，回傳重算的天數
+    """
+    from greenleaf_ledger_sync import SCHEMA as LEDGER_SCHEMA, pop_dirty_range
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(LEDGER_SCHEMA + SCHEMA)
+        dirty = pop_dirty_range(conn, currency)
+        name = f"daily_interest:{currency}"
+
+        # 第一次（或在開始記錄 dirty range 之前建立的資料）整段重算
+        if get_checkpoint(conn, name) is None:
+            updated = _refresh_days(conn, currency)
+            set_checkpoint(conn, name, {"full_refresh": True})
+        elif dirty is None:
+            updated = 0
+        else:
+            # 以整天為單位重算 dirty range 涵蓋的日子
+            min_mts, max_mts = dirty
+            updated = _refresh_days(
+                conn, currency,
+                min_mts=min_mts // DAY_MS * DAY_MS,
+                max_mts=(max_mts // DAY_MS + 1) * DAY_MS,
+            )
+
+        conn.commit()
+        return updated
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def load_daily(currency="UST", conn=None):
+    """
+    讀取每日彙總，回傳連續日陣列（沒有利息的日子補 0）：
+        days, interest, ledger_capital
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(SCHEMA)
+        rows = conn.execute(
+            "SELECT day, interest, balance FROM daily_interest WHERE currency = ? ORDER BY day", (currency,)
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    if not rows:
+        empty = np.zeros(0)
+        return empty.astype("i8"), empty, empty
+
+    data = np.array(rows, dtype="f8")
+    first, last = int(data[0, 0]), int(data[-1, 0])
+    days = np.arange(first, last + 1, dtype="i8")
+    offset = data[:, 0].astype("i8") - first
+
+    interest = np.zeros(len(days))
+    interest[offset] = data[:, 1]
+
+    # 本金 = 入帳後餘額 - 當日利息；沒有入帳的日子沿用前一天
+    capital = np.full(len(days), np.nan)
+    capital[offset] = data[:, 2] - data[:, 1]
+    filled = np.where(np.isnan(capital), 0, np.arange(len(days)))
+    np.maximum.accumulate(filled, out=filled)
+    capital = capital[filled]
+
+    return days, interest, capital
+
+
+def snapshot_capital(days):
+    """
+    帳戶快照的每日平均 balance（對齊 days），沒有快照的日子為 NaN
+    """
+    from greenleaf_snapshots import get_snapshot_store
+
+    result = np.full(len(days), np.nan)
+    if len(days) == 0:
+        return result
+
+    rows = get_snapshot_store().range(int(days[0]) * DAY_MS, (int(days[-1]) + 1) * DAY_MS - 1)
+    balance = np.asarray(rows["balance"])
+    valid = ~np.isnan(balance)
+    if not valid.any():
+        return result
+
+    index = np.asarray(rows["mts"])[valid] // DAY_MS - days[0]
+    sums = np.bincount(index, weights=balance[valid], minlength=len(days))
+    counts = np.bincount(index, minlength=len(days))
+    has = counts > 0
+    result[has] = sums[has] / counts[has]
+    return result
+
+
+# ---------------------------------------------------------
+# 年化計算（向量化）
+# ---------------------------------------------------------
+
+def rolling_apr(interest, capital, windows=DEFAULT_WINDOWS):
+    """
+    interest / capital: 連續日陣列
+    回傳 {天數: APR % 陣列}；資料不足 N 天的位置為 NaN
+    APR = N 天利息總和 / N 天平均本金 * 365 / N * 100
+    """
+    interest_sum = np.concatenate([[0.0], np.cumsum(interest)])
+    capital_sum = np.concatenate([[0.0], np.cumsum(np.nan_to_num(capital))])
+
+    result = {}
+    for n in windows:
+        apr = np.full(len(interest), np.nan)
+        if len(interest) >= n:
+            total = interest_sum[n:] - interest_sum[:-n]
+            avg_capital = (capital_sum[n:] - capital_sum[:-n]) / n
+            with np.errstate(divide="ignore", invalid="ignore"):
+                apr[n - 1:] = np.where(avg_capital > 0, total / avg_capital * 365 / n * 100, np.nan)
+        result[n] = apr
+    return result
+
+
+def build_report(currency="UST", windows=DEFAULT_WINDOWS, use_snapshots=True, conn=None):
+    """
+    回傳 dict：
+        days / interest / capital / apr: 每日陣列（apr 為 {天數: 陣列}）
+        latest: 最新一天的利息、各期間 APR
+        total_interest / total_apr: 全期間利息與總資金年化
+    """
+    days, interest, capital = load_daily(currency, conn)
+
+    if use_snapshots and len(days):
+        from_snapshots = snapshot_capital(days)
+        capital = np.where(np.isnan(from_snapshots), capital, from_snapshots)
+
+    apr = rolling_apr(interest, capital, windows)
+
+    report = {
+        "days": days,
+        "interest": interest,
+        "capital": capital,
+        "apr": apr,
+        "total_interest": float(interest.sum()),
+        "total_apr": None,
+        "latest": None,
+    }
+
+    if len(days):
+        avg_capital = np.nanmean(capital)
+        if avg_capital > 0:
+            report["total_apr"] = round(float(interest.sum() / avg_capital * 365 / len(days) * 100), 4)
+        report["latest"] = {
+            "day": int(days[-1]),
+            "interest": float(interest[-1]),
+            **{f"apr_{n}d": (None if np.isnan(apr[n][-1]) else round(float(apr[n][-1]), 4)) for n in windows},
+        }
+    return report
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+    import json
+
+    started = time.perf_counter()
+    updated = update_daily_interest("UST")
+    report = build_report("UST")
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"📊 重算 {updated} 天，共 {len(report['days'])} 天（{elapsed:.1f} ms）")
+    print("💰 總利息：", round(report["total_interest"], 4), "| 總資金年化：", report["total_apr"], "%")
+    print(json.dumps(report["latest"], indent=2))
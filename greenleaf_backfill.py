@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+歷史資料平行回補
+----------------
+credits / loans / offers / trades 的 history 每次只抓一頁，
+多年的帳戶要一頁一頁往回翻會非常慢。
+
+backfill()：
+1️⃣ 把 [start, end] 切成多個時間區間，同時送出（速度由 bitfinex_ratelimit 控制）
+2️⃣ 某個區間回傳筆數達到單頁上限時，代表還有更舊的資料：
+   已取得的資料保留，剩下的 [start, 最舊一筆的 MTS] 再切成兩半平行抓取
+3️⃣ 以 ID 去重（區間邊界重疊的紀錄只保留一筆），依 MTS 由舊到新排序
+
+可被其他 Python 檔案 import：
+    from greenleaf_backfill import backfill_history
+
+    rows = backfill_history("credits", "fUST", start=..., end=...)
+
+也可以用在任何 fetch(start, end, limit) 形式的 API：
+    rows = backfill(fetch, start, end, window=30 * DAY_MS, limit=500, mts_index=4)
+"""
+
+import time
+import importlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from greenleaf_config import get_config
+
+
+DAY_MS = 86400 * 1000
+
+# 名稱 → (模組, 函式, MTS 欄位, 單頁上限)
+SOURCES = {
+    "credits": ("bitfinex_funding_credits_history", "get_funding_credits_history", 4, 500),
+    "loans": ("bitfinex_funding_loan_history", "get_funding_loans_history", 4, 500),
+    "offers": ("bitfinex_funding_offer_history", "get_funding_offers_history", 3, 500),
+    "trades": ("bitfinex_funding_trades", "get_funding_trades_history", 2, 500),
+    "ledgers": ("bitfinex_ledgers", "get_ledgers", 3, 2500),
+    "stats": ("bitfinex_state", "get_funding_stats", 0, 250),
+}
+
+
+def _split(start, end, parts):
+    """[start, end] 切成 parts 個不重疊的區間"""
+    step = max(1, (end - start + 1) // parts)
+    windows = []
+    low = start
+    while low <= end:
+        high = min(end, low + step - 1)
+        windows.append((low, high))
+        low = high + 1
+    return windows
+
+
+def backfill(fetch, start, end, window, limit, mts_index, max_workers=None, id_index=0):
+    """
+    fetch(start, end, limit) → rows（新 → 舊，最多 limit 筆）
+    window: 初始區間長度（毫秒）
+    回傳去重後、依 MTS 由舊到新排序的 rows
+    """
+    if max_workers is None:
+        max_workers = get_config().get_int("GREENLEAF_BACKFILL_WORKERS", 4)
+
+    parts = max(1, -(-(end - start + 1) // window))
+    rows_by_id = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(fetch, low, high, limit): (low, high) for low, high in _split(start, end, parts)}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                low, high = pending.pop(future)
+                rows = future.result()
+
+                for row in rows:
+                    rows_by_id[row[id_index]] = row
+
+                if len(rows) < limit:
+                    continue
+
+                # 達到單頁上限：剩下的部分切半再抓
+                oldest = min(row[mts_index] for row in rows)
+                if oldest <= low:
+                    print(f"⚠️ {low} 同一毫秒超過 {limit} 筆，部分資料可能缺漏")
+                    continue
+                for sub_low, sub_high in _split(low, oldest, 2):
+                    pending[pool.submit(fetch, sub_low, sub_high, limit)] = (sub_low, sub_high)
+
+    return sorted(rows_by_id.values(), key=lambda row: row[mts_index])
+
+
+def backfill_history(kind, symbol="fUST", start=None, end=None, window_days=30, max_workers=None, **filters):
+    """
+    kind: SOURCES 的名稱（credits / loans / offers / trades / ledgers / stats）
+    symbol: funding 類為 "fUST"，ledgers 為幣別（例如 "UST"）
+    start / end: 毫秒時間戳；預設 end = 現在，start = end 往前 365 天
+    filters: 其他傳給 API 函式的參數（例如 ledgers 的 category=28）
+    """
+    module_name, func_name, mts_index, limit = SOURCES[kind]
+    func = getattr(importlib.import_module(module_name), func_name)
+
+    if end is None:
+        end = int(time.time() * 1000)
+    if start is None:
+        start = end - 365 * DAY_MS
+
+    def fetch(low, high, page_limit):
+        return func(symbol, start=low, end=high, limit=page_limit, **filters)
+
+    return backfill(fetch, start, end, window_days * DAY_MS, limit, mts_index, max_workers)
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import random
+
+    # 模擬 API：2 萬筆紀錄、單頁 500 筆
+    history = sorted(
+        ([i, "fUST", random.randint(0, 1000 * DAY_MS)] for i in range(20000)),
+        key=lambda row: -row[2],
+    )
+    calls = []
+
+    def fake_fetch(low, high, limit):
+        calls.append((low, high))
+        return [row for row in history if low <= row[2] <= high][:limit]
+
+    started = time.perf_counter()
+    rows = backfill(fake_fetch, 0, 1000 * DAY_MS, 30 * DAY_MS, 500, mts_index=2)
+    print(f"✅ 取得 {len(rows)} 筆（API 呼叫 {len(calls)} 次，{time.perf_counter() - started:.1f} 秒）")
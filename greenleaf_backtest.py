@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+放貸策略回測
+------------
+用本地 funding K 線（greenleaf_candles）重播 main.py 的決策流程，
+估計不同參數的成交等待時間與實際年化，不必拿真錢上線測試。
+
+決策流程與 main.py 相同：
+1️⃣ 閒置資金 > min_balance 時，用 find_max_apr(orderbook, max_days) 找最高 APR
+2️⃣ plan_batches(idle, batch_size, min_chunk) 分批（最後一筆 < min_chunk 併入上一筆）
+3️⃣ 全部以同一個利率掛單（可加 rate_offset，例如 0.05 = 利率提高 5%）
+
+市場模型：
+- 每個 candle key（例如 trade:1m:fUST:p2、trade:1m:fUST:p30）視為訂單簿裡的一個天數，
+  某一分鐘的訂單簿 = 各 key 最近一根 K 線的收盤利率
+- 掛單利率 r 的成交：之後 HIGH >= r 的 K 線成交量依序累積，
+  累積量達到該筆（含排在前面的筆數）金額時成交（numpy 向量化，一次算完整批）
+- 成交後借出 period 天，到期本金 + 利息（扣手續費）回到閒置資金，下一分鐘重新掛單
+- 沒成交的掛單一直掛著（main.py 不會自動取消）
+
+參數組合用 ProcessPoolExecutor 平行計算，市場資料只在每個 worker 初始化時傳一次。
+
+可被其他 Python 檔案 import：
+    from greenleaf_backtest import load_market, simulate, run_grid
+
+    market = load_market(["trade:1m:fUST:p2", "trade:1m:fUST:p30"], days=90)
+    print(simulate(market, max_days=30, batch_size=200, min_chunk=150))
+    results = run_grid(market, {"max_days": [2, 30], "batch_size": [100, 200, 500]})
+
+使用方式（需先 python3 greenleaf.py candles 同步 K 線）：
+    python3 greenleaf.py backtest --days 90 --max-days 2,30 --batch-size 100,200,500
+"""
+
+import os
+import time
+import heapq
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from bitfinex_candles import TIMEFRAMES, parse_key
+from bitfinex_rate_selector import find_max_apr
+from main import plan_batches
+
+
+DAY_MS = 86400 * 1000
+BLOCK = 4096           # 找成交時每次往後看的 K 線數
+LENDING_FEE = 0.15     # Bitfinex 放貸手續費
+
+DEFAULT_PARAMS = {
+    "max_days": 30,
+    "batch_size": 200,
+    "min_chunk": 150,
+    "rate_offset": 0.0,
+}
+
+
+# ---------------------------------------------------------
+# 市場資料
+# ---------------------------------------------------------
+
+def _key_period(key):
+    """"trade:1m:fUST:a30:p2:p30" → 30（彙總區間取上限天數）"""
+    _, _, period = parse_key(key)
+    return max(int(part[1:]) for part in period.split(":") if part.startswith("p"))
+
+
+def load_market(keys, days=90, end=None):
+    """
+    把多個 candle key 對齊成同一條時間軸（同一個 timeframe）
+    回傳 dict：
+        mts (T,)          時間
+        close (T, K)      最近一根 K 線的收盤日利率（往後延續，開始前為 NaN）
+        high (T, K)       該分鐘的最高日利率（沒有成交為 -inf）
+        volume (T, K)     該分鐘成交量（沒有成交為 0）
+        periods (K,)      每個 key 的天數
+        step              timeframe 毫秒數
+    """
+    from greenleaf_candles import get_candle_store
+
+    timeframes = {parse_key(key)[0] for key in keys}
+    if len(timeframes) != 1:
+        raise Exception(f"❌ candle key 的 timeframe 必須相同：{sorted(timeframes)}")
+    step = TIMEFRAMES[timeframes.pop()]
+
+    if end is None:
+        end = int(time.time() * 1000)
+    end = end // step * step
+    start = end - days * DAY_MS
+
+    mts = np.arange(start, end, step, dtype="i8")
+    close = np.full((len(mts), len(keys)), np.nan)
+    high = np.full((len(mts), len(keys)), -np.inf)
+    volume = np.zeros((len(mts), len(keys)))
+
+    for col, key in enumerate(keys):
+        rows = get_candle_store(key).range(start, end - 1)
+        if len(rows) == 0:
+            print(f"⚠️ {key} 在回測區間內沒有 K 線，請先執行 greenleaf.py candles")
+            continue
+        index = (np.asarray(rows["mts"]) - start) // step
+        close[index, col] = rows["close"]
+        high[index, col] = rows["high"]
+        volume[index, col] = rows["volume"]
+
+        # 收盤利率往後延續到下一根 K 線
+        last = np.where(np.isnan(close[:, col]), 0, np.arange(len(mts)))
+        np.maximum.accumulate(last, out=last)
+        close[:, col] = close[last, col]
+
+    return {
+        "mts": mts,
+        "close": close,
+        "high": high,
+        "volume": volume,
+        "periods": np.array([_key_period(key) for key in keys]),
+        "step": step,
+    }
+
+
+def book_at(market, t):
+    """
+    第 t 分鐘的訂單簿（與 get_orderbook 相同欄位，最後多一欄 key 編號）
+    [daily_rate, period, count, amount, annual_rate_percent, col]
+    """
+    rows = []
+    for col, rate in enumerate(market["close"][t]):
+        if np.isnan(rate):
+            continue
+        period = int(market["periods"][col])
+        rows.append([float(rate), period, 1, -float(market["volume"][t, col]), round(rate * 365 * 100, 2), col])
+    return rows
+
+
+# ---------------------------------------------------------
+# 成交模擬
+# ---------------------------------------------------------
+
+def fill_indices(high, volume, start, rate, amounts):
+    """
+    同一個利率、同時掛出的多筆金額，依序成交的位置（沒成交為 len(high)）
+    high / volume: 單一 key 的欄位
+    """
+    total = len(high)
+    need = np.cumsum(amounts)
+    result = np.full(len(amounts), total, dtype="i8")
+    done = 0
+    carried = 0.0
+
+    for block_start in range(start, total, BLOCK):
+        h = high[block_start:block_start + BLOCK]
+        filled = np.cumsum(np.where(h >= rate, volume[block_start:block_start + BLOCK], 0.0)) + carried
+        hit = np.searchsorted(filled, need[done:], side="left")
+        inside = hit < len(filled)
+        count = int(inside.sum())
+        result[done:done + count] = block_start + hit[:count]
+        done += count
+        if done == len(amounts):
+            break
+        carried = filled[-1]
+
+    return result
+
+
+def simulate(market, max_days=30, batch_size=200, min_chunk=150, rate_offset=0.0,
+             capital=1000.0, min_balance=150.0, fee=LENDING_FEE):
+    """
+    重播一組參數，回傳 dict：
+        apr: 回測期間的實際年化 %（利息 / 本金）
+        interest: 利息總額（扣手續費，跨過結束時間的借款依比例計算）
+        loans: 成交筆數
+        wait_mean / wait_median: 掛單到成交的分鐘數
+        unfilled: 回測結束時仍未成交的金額
+    """
+    close, high, volume = market["close"], market["high"], market["volume"]
+    total = len(market["mts"])
+    minutes_per_step = market["step"] / 60000
+    steps_per_day = DAY_MS // market["step"]
+
+    valid = np.flatnonzero(~np.isnan(close).all(axis=1))
+    if len(valid) == 0:
+        raise Exception("❌ 回測區間內沒有任何 K 線")
+
+    idle = capital
+    returns = []        # heap：(到期位置, 金額)
+    interest = 0.0
+    waits = []
+    unfilled = 0.0
+    t = int(valid[0])
+
+    while t < total:
+        while returns and returns[0][0] <= t:
+            idle += heapq.heappop(returns)[1]
+
+        best = find_max_apr(book_at(market, t), max_days) if idle > min_balance else None
+
+        if best:
+            rate = best[0] * (1 + rate_offset)
+            period, col = best[1], best[5]
+            chunks = plan_batches(idle, batch_size, min_chunk)
+            fills = fill_indices(high[:, col], volume[:, col], t, rate, chunks)
+
+            for amount, filled_at in zip(chunks, fills):
+                if filled_at >= total:
+                    unfilled += amount
+                    continue
+                waits.append((filled_at - t) * minutes_per_step)
+                due = filled_at + period * steps_per_day
+                earned = amount * rate * period * (1 - fee)
+                if due >= total:
+                    interest += earned * (total - filled_at) / (due - filled_at)
+                else:
+                    interest += earned
+                    heapq.heappush(returns, (int(due), amount + earned))
+            idle = 0.0
+
+        # 下一個決策點：資金到期，或（找不到利率時）下一分鐘
+        if idle > min_balance and not best:
+            t += 1
+        elif returns:
+            t = max(t + 1, returns[0][0])
+        else:
+            break
+
+    days = total / steps_per_day
+    return {
+        "apr": round(float(interest / capital * 365 / days * 100), 4),
+        "interest": round(float(interest), 4),
+        "loans": len(waits),
+        "wait_mean": round(float(np.mean(waits)), 1) if waits else None,
+        "wait_median": round(float(np.median(waits)), 1) if waits else None,
+        "unfilled": round(float(unfilled), 2),
+    }
+
+
+# ---------------------------------------------------------
+# 參數格點（多行程）
+# ---------------------------------------------------------
+
+_market = None
+
+
+def _init_worker(market):
+    global _market
+    _market = market
+
+
+def _run_one(params):
+    return dict(params, **simulate(_market, **params))
+
+
+def run_grid(market, grid, max_workers=None, **fixed):
+    """
+    grid: {參數名稱: [值, ...]}（沒列出的參數使用 DEFAULT_PARAMS）
+    fixed: 所有組合共用的參數（例如 capital=5000）
+    回傳每一組參數的結果，依 apr 由高到低排序
+    """
+    names = list(DEFAULT_PARAMS)
+    values = [grid.get(name, [DEFAULT_PARAMS[name]]) for name in names]
+    combos = [dict(zip(names, combo), **fixed) for combo in itertools.product(*values)]
+
+    if max_workers is None:
+        max_workers = min(len(combos), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        results = [dict(params, **simulate(market, **params)) for params in combos]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(market,)) as pool:
+            results = list(pool.map(_run_one, combos))
+
+    return sorted(results, key=lambda item: -item["apr"])
+
+
+# ---------------------------------------------------------
+# 測試用（模擬 K 線）
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    minutes = 60 * 24 * 60
+    base = np.array([0.0002, 0.00035])            # 2 天 / 30 天的日利率
+    noise = rng.lognormal(0, 0.3, size=(minutes, 2))
+    traded = rng.random((minutes, 2)) < 0.3
+
+    market = {
+        "mts": np.arange(minutes, dtype="i8") * 60000,
+        "close": base * noise,
+        "high": np.where(traded, base * noise * 1.2, -np.inf),
+        "volume": np.where(traded, rng.exponential(500, size=(minutes, 2)), 0.0),
+        "periods": np.array([2, 30]),
+        "step": 60000,
+    }
+
+    started = time.perf_counter()
+    results = run_grid(market, {
+        "max_days": [2, 30],
+        "batch_size": [150, 200, 500],
+        "rate_offset": [0.0, 0.1],
+    }, capital=2000)
+    print(f"⏱️ {len(results)} 組參數，{time.perf_counter() - started:.1f} 秒")
+    for item in results[:5]:
+        print(item)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Funding K 線本地資料（ColumnStore）
+----------------------------------
+訂單簿只有「現在」的利率；調整 find_max_apr 與 150 / 200 的分批常數需要歷史利率，
+每次都去打 API 抓幾個月的分鐘 K 線太慢也容易被限流。
+
+這裡把 candles（bitfinex_candles）同步到本地 ColumnStore：
+
+1️⃣ 每個 candle key 一個資料夾：GREENLEAF_DATA_DIR/candles/<key>
+2️⃣ 增量同步：只抓最後一筆之後（已收盤的）、以及第一筆之前（回補到指定天數）的資料，
+   以 greenleaf_backfill 平行切區間抓取；已經抓過的範圍記在 <key>/covered.json，
+   API 在那段時間本來就沒有 candle 時（包括完全沒有 candle 的 key），
+   之後的同步不會重複請求同一段空區間
+3️⃣ 時間欄位已排序：區間查詢用 searchsorted，O(log n)
+4️⃣ 缺口偵測：相鄰兩筆間隔超過 N 個 timeframe 的區段（沒有成交的時間本來就沒有 candle，
+   所以預設只列出超過 60 個 timeframe 的缺口）；repair_gaps 會重新抓取這些區段
+
+可被其他 Python 檔案 import：
+    from greenleaf_candles import sync_candles, get_candle_store
+
+    sync_candles("trade:1m:fUST:a30:p2:p30", days=90)
+    rows = get_candle_store("trade:1m:fUST:a30:p2:p30").range(start_mts, end_mts)
+    print(rows["high"].max() * 365 * 100)
+
+使用方式：
+    python3 greenleaf.py candles --days 90
+    python3 greenleaf.py candles --timeframe 1h --period p30 --gaps
+
+可用環境變數或 .env 調整：
+    GREENLEAF_CANDLE_KEYS   daemon 要同步的 candle key，逗號分隔（預設 trade:1m:fUST:a30:p2:p30）
+    GREENLEAF_CANDLE_DAYS   第一次同步往回補的天數（預設 90）
+"""
+
+import os
+import json
+import time
+import threading
+from bitfinex_candles import TIMEFRAMES, PAGE_LIMIT, get_candles, parse_key
+from greenleaf_config import get_config
+
+
+DAY_MS = 86400 * 1000
+DEFAULT_KEY = "trade:1m:fUST:a30:p2:p30"
+
+CANDLE_FIELDS = [
+    ("mts", "i8"),
+    ("open", "f8"),
+    ("close", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("volume", "f8"),
+]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_candle_store(key=DEFAULT_KEY):
+    from greenleaf_columnstore import ColumnStore
+    from greenleaf_snapshots import get_data_dir
+
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ColumnStore(os.path.join(get_data_dir(), "candles", key.replace(":", "_")), CANDLE_FIELDS)
+        return _stores[key]
+
+
+def _fetch_range(key, start, end, max_workers=None):
+    from greenleaf_backfill import backfill
+
+    step = TIMEFRAMES[parse_key(key)[0]]
+
+    def fetch(low, high, limit):
+        return get_candles(key, start=low, end=high, limit=limit)
+
+    # 每個區間約一頁的量
+    return backfill(fetch, start, end, step * PAGE_LIMIT, PAGE_LIMIT, mts_index=0, max_workers=max_workers)
+
+
+def _covered_path(store):
+    return os.path.join(store.path, "covered.json")
+
+
+def _load_covered(store):
+    """已經抓過的時間範圍 (start, end)，沒有紀錄時為 (None, None)"""
+    try:
+        with open(_covered_path(store), encoding="utf-8") as f:
+            covered = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    return covered.get("start"), covered.get("end")
+
+
+def _save_covered(store, start, end):
+    tmp = _covered_path(store) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"start": start, "end": end}, f)
+    os.replace(tmp, _covered_path(store))
+
+
+def sync_candles(key=DEFAULT_KEY, days=None, max_workers=None):
+    """
+    同步 candles：最後一筆之後的新資料，以及回補到 days 天前
+    回傳寫入的筆數
+    """
+    if days is None:
+        days = get_config().get_int("GREENLEAF_CANDLE_DAYS", 90)
+
+    store = get_candle_store(key)
+    step = TIMEFRAMES[parse_key(key)[0]]
+    # 只抓已經收盤的 candle，最後一筆之後直接 append，不必重寫檔案
+    now = int(time.time() * 1000) // step * step - 1
+    start = now - days * DAY_MS
+
+    keys = store.read()["mts"]
+    covered_start, covered_end = _load_covered(store)
+    if len(keys) > 0:
+        first, last = int(keys[0]), int(keys[-1])
+        if covered_end is not None:
+            last = max(last, covered_end)
+    elif covered_start is not None and covered_end is not None:
+        # 抓過但完全沒有 candle（例如沒有成交的天數）：只抓之後的新區段
+        first, last = covered_start, covered_end
+    else:
+        first = last = None
+
+    if first is None:
+        ranges = [(start, now)]
+    else:
+        ranges = [(last + 1, now)] if last < now else []
+        # 第一筆之前、已經抓過的區段不再重抓
+        if covered_start is not None:
+            first = min(first, covered_start)
+        if start < first:
+            ranges.append((start, first - 1))
+
+    written = 0
+    for low, high in ranges:
+        rows = _fetch_range(key, low, high, max_workers)
+        if rows:
+            store.append(rows)
+            written += len(rows)
+
+    if covered_start is not None:
+        start = min(start, covered_start)
+    _save_covered(store, start, now)
+    return written
+
+
+def find_gaps(key=DEFAULT_KEY, min_steps=60, start=None, end=None):
+    """
+    間隔超過 min_steps 個 timeframe 的缺口
+    回傳 [(缺口前一筆 MTS, 缺口後一筆 MTS), ...]
+    """
+    step = TIMEFRAMES[parse_key(key)[0]]
+    return get_candle_store(key).gaps(step * min_steps, start, end)
+
+
+def repair_gaps(key=DEFAULT_KEY, min_steps=60, max_workers=None):
+    """
+    重新抓取缺口區段，回傳補上的筆數
+    （缺口若只是沒有成交，重抓後仍然是空的）
+    """
+    step = TIMEFRAMES[parse_key(key)[0]]
+    store = get_candle_store(key)
+
+    written = 0
+    for before, after in find_gaps(key, min_steps):
+        rows = _fetch_range(key, before + step, after - step, max_workers)
+        if rows:
+            store.append(rows)
+            written += len(rows)
+    return written
+
+
+def sync_all(keys=None):
+    """同步多個 candle key，回傳 {key: 寫入筆數}"""
+    if keys is None:
+        keys = [k.strip() for k in get_config().get("GREENLEAF_CANDLE_KEYS", DEFAULT_KEY).split(",") if k.strip()]
+    return {key: sync_candles(key) for key in keys}
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    for key, written in sync_all().items():
+        store = get_candle_store(key)
+        print(f"✅ {key} 寫入 {written} 筆，本地共 {len(store)} 筆")
+        print("🕳️ 缺口：", find_gaps(key)[:10])
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+固定長度紀錄檔（NumPy memmap）
+------------------------------
+快照、K 線這類「時間 + 固定欄位」的資料，用 JSON 存一年份的分鐘資料
+每次讀取都要整份解析；ColumnStore 把每筆資料存成固定長度的 binary record：
+
+    <path>/meta.json   欄位定義（NumPy dtype）與時間欄位名稱
+    <path>/data.bin    依時間排序的 records
+
+1️⃣ 讀取：np.memmap 直接對應檔案，不必解析、也不會整份載入記憶體
+2️⃣ 區間查詢：時間欄位已排序，用 searchsorted 找範圍，O(log n)
+3️⃣ 寫入：時間比最後一筆新的資料直接 append；
+   較舊或重複時間的資料（例如回補）會合併、排序後整份重寫（同一時間以新資料為準）
+
+可被其他 Python 檔案 import：
+    from greenleaf_columnstore import ColumnStore
+
+    store = ColumnStore("data/snapshots", [("mts", "i8"), ("balance", "f8")])
+    store.append([(1700000000000, 1234.5)])
+    rows = store.range(start_mts, end_mts)      # NumPy structured array（唯讀）
+    print(rows["balance"].mean())
+
+需要安裝：
+    pip install numpy
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+
+class ColumnStore:
+    def __init__(self, path, fields, key="mts"):
+        """
+        path: 資料夾
+        fields: NumPy dtype 欄位定義，例如 [("mts", "i8"), ("rate", "f8")]
+        key: 時間欄位（整數毫秒）
+        """
+        self.path = path
+        self.dtype = np.dtype(fields)
+        self.key = key
+        self._data_path = os.path.join(path, "data.bin")
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"fields": [[name, self.dtype[name].str] for name in self.dtype.names], "key": key}
+
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise Exception(f"❌ {path} 的欄位定義與程式不一致：{stored['fields']}")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+    # -----------------------------
+    # 讀取
+    # -----------------------------
+
+    def __len__(self):
+        if not os.path.exists(self._data_path):
+            return 0
+        return os.path.getsize(self._data_path) // self.dtype.itemsize
+
+    def read(self):
+        """整份資料（唯讀 memmap，沒有資料時回傳空陣列）"""
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self._data_path, dtype=self.dtype, mode="r", shape=(count,))
+
+    def range(self, start=None, end=None):
+        """start <= key <= end 的資料（皆可省略）"""
+        data = self.read()
+        keys = data[self.key]
+        lo = 0 if start is None else int(np.searchsorted(keys, start, side="left"))
+        hi = len(data) if end is None else int(np.searchsorted(keys, end, side="right"))
+        return data[lo:hi]
+
+    def last(self):
+        """最後一筆（沒有資料時回傳 None）"""
+        data = self.read()
+        return data[-1] if len(data) else None
+
+    def gaps(self, step, start=None, end=None):
+        """
+        相鄰兩筆間隔超過 step 的缺口
+        回傳 [(缺口前一筆的 key, 缺口後一筆的 key), ...]
+        """
+        keys = np.asarray(self.range(start, end)[self.key])
+        if len(keys) < 2:
+            return []
+        idx = np.flatnonzero(np.diff(keys) > step)
+        return [(int(keys[i]), int(keys[i + 1])) for i in idx]
+
+    # -----------------------------
+    # 寫入
+    # -----------------------------
+
+    def _to_array(self, records):
+        if isinstance(records, np.ndarray):
+            return records.astype(self.dtype, copy=False)
+        if records and isinstance(records[0], dict):
+            records = [tuple(item[name] for name in self.dtype.names) for item in records]
+        return np.array([tuple(item) for item in records], dtype=self.dtype)
+
+    @staticmethod
+    def _dedupe_sorted(data, key):
+        """依 key 穩定排序，同一個 key 保留最後寫入的那筆"""
+        order = np.argsort(data[key], kind="stable")
+        data = data[order]
+        keep = np.ones(len(data), dtype=bool)
+        keep[:-1] = data[key][1:] != data[key][:-1]
+        return data[keep]
+
+    def append(self, records):
+        """
+        寫入 records（structured array、tuple list 或 dict list）
+        回傳寫入後的總筆數
+        """
+        new = self._to_array(records)
+        if len(new) == 0:
+            return len(self)
+
+        with self._lock:
+            new = self._dedupe_sorted(new, self.key)
+            last = self.last()
+
+            if last is None or new[self.key][0] > last[self.key]:
+                with open(self._data_path, "ab") as f:
+                    f.write(new.tobytes())
+            else:
+                merged = self._dedupe_sorted(np.concatenate([np.array(self.read()), new]), self.key)
+                tmp = self._data_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(merged.tobytes())
+                os.replace(tmp, self._data_path)
+
+            return len(self)
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    store = ColumnStore(tempfile.mkdtemp(), [("mts", "i8"), ("value", "f8")])
+
+    minute = 60 * 1000
+    year = np.zeros(365 * 24 * 60, dtype=store.dtype)
+    year["mts"] = np.arange(len(year)) * minute
+    year["value"] = np.random.rand(len(year))
+    year = np.delete(year, range(1000, 1010))     # 製造一個缺口
+
+    store.append(year)
+    store.append([(1005 * minute, 1.0)])          # 回補缺口中的一筆
+
+    started = time.perf_counter()
+    rows = store.range(30 * 24 * 60 * minute, 60 * 24 * 60 * minute)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"📊 共 {len(store)} 筆，查詢 30 天 {len(rows)} 筆，平均 {rows['value'].mean():.4f}（{elapsed:.2f} ms）")
+    print("🕳️ 缺口：", store.gaps(minute))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GreenLeaf 設定
+--------------
+整個程式共用一個設定物件，第一次讀取設定時才載入 .env（只載入一次），
+import 任何模組都不會讀檔，也不會因為缺少某個 key 而失敗。
+
+可被其他 Python 檔案 import：
+    from greenleaf_config import get_config
+
+    config = get_config()
+    api_key, api_secret = config.require("BFX_API_KEY", "BFX_API_SECRET")
+    timeout = config.get_float("BFX_HTTP_READ_TIMEOUT", 15.0)
+"""
+
+import os
+import threading
+
+
+class Config:
+    def __init__(self, env_file=None):
+        self._env_file = env_file
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                from dotenv import load_dotenv
+                load_dotenv(self._env_file)
+                self._loaded = True
+
+    # -----------------------------
+    # 讀取設定值
+    # -----------------------------
+
+    def get(self, name, default=None):
+        self._load()
+        value = os.getenv(name)
+        return default if value is None or value == "" else value
+
+    def get_int(self, name, default):
+        value = self.get(name)
+        return default if value is None else int(value)
+
+    def get_float(self, name, default):
+        value = self.get(name)
+        return default if value is None else float(value)
+
+    def require(self, *names, message=None):
+        """
+        讀取必要設定，任一個缺少就丟出 ValueError
+        只傳一個名稱時回傳單一值，否則回傳 tuple
+        """
+        values = tuple(self.get(name) for name in names)
+        missing = [name for name, value in zip(names, values) if not value]
+
+        if missing:
+            raise ValueError(message or f"❌ 未設定 {', '.join(missing)}，請確認 .env 檔內容")
+
+        return values[0] if len(values) == 1 else values
+
+
+# ---------------------------------------------------------
+# 共用設定物件
+# ---------------------------------------------------------
+
+_config = Config()
+
+
+def get_config():
+    return _config
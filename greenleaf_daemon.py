@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GreenLeaf 常駐排程
+------------------
+功能3「每 5 分鐘檢查餘額 → 有餘額就執行功能1」原本靠 cron 反覆啟動
+main.py / telegram_balance_alert.py，每次都要重新啟動 Python、import 模組，
+記憶體中的連線池、快取、即時訂單簿也都會消失。
+
+這裡用單一 asyncio process 執行所有週期性工作：
+1️⃣ place：檢查 funding 餘額，超過門檻就執行掛單（main.run_async）
+2️⃣ alert：餘額、放款成功、還款通知（telegram_balance_alert + greenleaf_alerts）
+3️⃣ snapshot：帳戶快照（greenleaf_snapshots，NumPy 固定長度紀錄檔）
+4️⃣ rates：高利率偵測（greenleaf_rate_detector，讀取記憶體中的即時訂單簿）
+5️⃣ ledgers：同步利息紀錄到本地 SQLite 並更新每日彙總（greenleaf_analytics）
+6️⃣ stats：同步 FRR / funding stats 時間序列與 hour / day 彙總（greenleaf_funding_stats）
+7️⃣ candles：同步 funding K 線到本地（greenleaf_candles）
+並且持續訂閱 WebSocket 訂單簿，掛單時直接讀取記憶體；
+帳戶 WebSocket（bitfinex_ws_account）收到 funding 錢包可用餘額超過門檻時，
+立即觸發 place，不必等下一次檢查；放貸成立 / 還款事件也即時送出通知。
+
+每個工作：
+- 間隔加上隨機 jitter，避免多個工作同時送出請求
+- 執行時間超過間隔時不會補跑錯過的次數（coalescing），只從結束時重新計時
+- trigger() 可要求立即執行；執行中多次 trigger 只會再多跑一次
+
+可用環境變數或 .env 調整（秒）：
+    GREENLEAF_PLACE_INTERVAL     預設 60
+    GREENLEAF_ALERT_INTERVAL     預設 300
+    GREENLEAF_SNAPSHOT_INTERVAL  預設 60
+    GREENLEAF_RATE_INTERVAL      預設 10
+    GREENLEAF_LEDGER_INTERVAL    預設 3600
+    GREENLEAF_STATS_INTERVAL     預設 300
+    GREENLEAF_CANDLE_INTERVAL    預設 3600
+    GREENLEAF_JOB_JITTER         間隔的隨機比例（預設 0.1 → ±10%）
+    GREENLEAF_MIN_BALANCE        超過才掛單（預設 150）
+    GREENLEAF_ACCOUNT_STREAM     設為 0 時不使用帳戶 WebSocket（預設 1）
+
+使用方式：
+    python3 greenleaf.py daemon
+"""
+
+import random
+import signal
+import asyncio
+import functools
+from greenleaf_config import get_config
+
+
+# ---------------------------------------------------------
+# 排程
+# ---------------------------------------------------------
+
+class PeriodicJob:
+    def __init__(self, name, func, interval, jitter=0.1, run_at_start=True):
+        """
+        func: async function 或一般 function（一般 function 在 worker thread 執行）
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.runs = 0
+        self.coalesced = 0
+        self.last_error = None
+        self._wake = asyncio.Event()
+        self._stopped = False
+
+    def trigger(self):
+        """要求立即執行（執行中呼叫則在結束後馬上再跑一次）"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _next_delay(self, elapsed=0.0):
+        delay = max(0.0, self.interval - elapsed)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _sleep(self, delay):
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _call(self):
+        if asyncio.iscoroutinefunction(self.func):
+            await self.func()
+        else:
+            await asyncio.to_thread(self.func)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        if not self.run_at_start:
+            await self._sleep(self._next_delay())
+
+        while not self._stopped:
+            self._wake.clear()
+            started = loop.time()
+            try:
+                await self._call()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                print(f"⚠️ 排程 {self.name} 失敗：{e}")
+            self.runs += 1
+
+            elapsed = loop.time() - started
+            if elapsed > self.interval:
+                missed = int(elapsed // self.interval)
+                self.coalesced += missed
+                print(f"⚠️ 排程 {self.name} 執行 {elapsed:.1f} 秒，略過 {missed} 次")
+
+            if not self._stopped:
+                await self._sleep(self._next_delay(elapsed))
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+
+    def add(self, job):
+        self.jobs[job.name] = job
+        return job
+
+    def trigger(self, name):
+        self.jobs[name].trigger()
+
+    def stop(self):
+        for job in self.jobs.values():
+            job.stop()
+
+    async def run(self):
+        await asyncio.gather(*(job.run() for job in self.jobs.values()))
+
+
+# ---------------------------------------------------------
+# 工作
+# ---------------------------------------------------------
+
+async def place_if_idle(min_balance=None, depth_aware=False, reconcile=False):
+    """funding UST 可用餘額超過 min_balance 時執行掛單"""
+    from bitfinex_async import get_wallets_async
+    from bitfinex_wallets_reader import get_funding_ust_values
+    from main import run_async
+
+    if min_balance is None:
+        min_balance = get_config().get_float("GREENLEAF_MIN_BALANCE", 150)
+
+    values = get_funding_ust_values(await get_wallets_async())
+    if not values or values[0] <= min_balance:
+        return
+
+    print(f"📡 可用餘額 {values[0]} > {min_balance}，執行掛單")
+    await run_async(depth_aware=depth_aware, reconcile=reconcile)
+
+
+def check_alerts(engine=None):
+    from telegram_balance_alert import check_funding_balance
+    check_funding_balance(threshold=get_config().get_float("GREENLEAF_MIN_BALANCE", 150), engine=engine)
+
+
+async def take_snapshot():
+    from greenleaf_snapshots import take_snapshot as snapshot
+    await snapshot("fUST")
+
+
+def sync_interest_ledgers():
+    from greenleaf_ledger_sync import sync_ledgers
+    from greenleaf_analytics import update_daily_interest
+
+    sync_ledgers("UST", category=28, wallet="funding")
+    update_daily_interest("UST")
+
+
+def sync_candles():
+    from greenleaf_candles import sync_all
+    sync_all()
+
+
+def sync_funding_stats():
+    from greenleaf_funding_stats import sync_all
+    sync_all()
+
+
+async def check_rates(detector, engine):
+    from bitfinex_ws_book import get_orderbook_fast
+    from greenleaf_funding_stats import get_latest_frr_async, get_baseline
+
+    orderbook, frr, baseline = await asyncio.gather(
+        get_orderbook_fast("fUST", "P1", 25),
+        get_latest_frr_async("fUST"),
+        asyncio.to_thread(get_baseline, "fUST"),
+    )
+    if frr and baseline is not None:
+        frr = dict(frr, baseline_percent=baseline)
+    alerts = detector.evaluate(orderbook, frr)
+    if alerts:
+        for alert in alerts:
+            engine.push(alert["text"])
+        await asyncio.to_thread(engine.flush)
+
+
+def build_scheduler(depth_aware=False, reconcile=False, alert_engine=None):
+    config = get_config()
+    jitter = config.get_float("GREENLEAF_JOB_JITTER", 0.1)
+
+    scheduler = Scheduler()
+    scheduler.add(PeriodicJob(
+        "place",
+        functools.partial(place_if_idle, depth_aware=depth_aware, reconcile=reconcile),
+        config.get_float("GREENLEAF_PLACE_INTERVAL", 60),
+        jitter,
+    ))
+    scheduler.add(PeriodicJob(
+        "alert",
+        functools.partial(check_alerts, alert_engine),
+        config.get_float("GREENLEAF_ALERT_INTERVAL", 300),
+        jitter,
+    ))
+    scheduler.add(PeriodicJob("snapshot", take_snapshot, config.get_float("GREENLEAF_SNAPSHOT_INTERVAL", 60), jitter))
+    scheduler.add(PeriodicJob("ledgers", sync_interest_ledgers, config.get_float("GREENLEAF_LEDGER_INTERVAL", 3600), jitter))
+    scheduler.add(PeriodicJob("stats", sync_funding_stats, config.get_float("GREENLEAF_STATS_INTERVAL", 300), jitter))
+    scheduler.add(PeriodicJob("candles", sync_candles, config.get_float("GREENLEAF_CANDLE_INTERVAL", 3600), jitter))
+
+    if alert_engine is not None:
+        from greenleaf_rate_detector import RateDetector
+        scheduler.add(PeriodicJob(
+            "rates",
+            functools.partial(check_rates, RateDetector.from_config(), alert_engine),
+            config.get_float("GREENLEAF_RATE_INTERVAL", 10),
+            jitter,
+        ))
+    return scheduler
+
+
+# ---------------------------------------------------------
+# 帳戶事件 → 觸發掛單
+# ---------------------------------------------------------
+
+async def watch_account(stream, scheduler, min_balance=None):
+    """funding UST 錢包更新且可用餘額超過 min_balance 時立即觸發 place"""
+    if min_balance is None:
+        min_balance = get_config().get_float("GREENLEAF_MIN_BALANCE", 150)
+
+    queue = stream.subscribe()
+    try:
+        while True:
+            event = await queue.get()
+            if event.group != "wallet":
+                continue
+            available = stream.state.funding_available("UST")
+            if available is not None and available > min_balance:
+                scheduler.trigger("place")
+    finally:
+        stream.unsubscribe(queue)
+
+
+async def _run_account_stream(stream):
+    try:
+        await stream.run()
+    except Exception as e:
+        print(f"⚠️ 帳戶 WebSocket 停止，改為只靠定期檢查：{e}")
+
+
+# ---------------------------------------------------------
+# 主程式
+# ---------------------------------------------------------
+
+async def run_daemon(depth_aware=False, reconcile=False):
+    from bitfinex_ws_book import FundingBookSubscriber
+    from greenleaf_alerts import AlertEngine, consume_events
+
+    alert_engine = AlertEngine()
+    scheduler = build_scheduler(depth_aware, reconcile, alert_engine)
+    subscriber = FundingBookSubscriber("fUST", "P1", 25)
+    tasks = [asyncio.create_task(subscriber.run())]
+
+    stream = None
+    if get_config().get("GREENLEAF_ACCOUNT_STREAM", "1") != "0":
+        from bitfinex_ws_account import AccountStream
+        stream = AccountStream()
+        tasks.append(asyncio.create_task(_run_account_stream(stream)))
+        tasks.append(asyncio.create_task(watch_account(stream, scheduler)))
+        tasks.append(asyncio.create_task(consume_events(stream.subscribe(), alert_engine)))
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except NotImplementedError:
+            pass
+
+    print("🌱 GreenLeaf daemon 啟動：", ", ".join(
+        f"{job.name}({job.interval:g}s)" for job in scheduler.jobs.values()
+    ))
+    try:
+        await scheduler.run()
+    finally:
+        subscriber.stop()
+        if stream is not None:
+            stream.stop()
+        for task in tasks:
+            task.cancel()
+        print("🛑 GreenLeaf daemon 停止")
+    return scheduler
+
+
+def main(depth_aware=False, reconcile=False):
+    asyncio.run(run_daemon(depth_aware, reconcile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+GreenLeaf 本地資料庫（SQLite）
+------------------------------
+同步下來的歷史資料都存在同一個 SQLite 檔，報表直接查本地資料，
+不必每次重新下載。
+
+可被其他 Python 檔案 import：
+    from greenleaf_db import connect, get_checkpoint, set_checkpoint
+
+    conn = connect()
+    set_checkpoint(conn, "ledgers:UST:28:funding", {"newest_mts": ...})
+
+資料庫位置可用環境變數或 .env 的 GREENLEAF_DB 指定（預設 greenleaf.db）
+"""
+
+import json
+import sqlite3
+from greenleaf_config import get_config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect(path=None):
+    """
+    開啟資料庫（WAL 模式：同步寫入時其他程式仍可讀取）
+    每個 thread 請使用自己的連線
+    """
+    if path is None:
+        path = get_config().get("GREENLEAF_DB", "greenleaf.db")
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---------------------------------------------------------
+# 同步進度
+# ---------------------------------------------------------
+
+def get_checkpoint(conn, name, default=None):
+    row = conn.execute("SELECT value FROM checkpoints WHERE name = ?", (name,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def set_checkpoint(conn, name, value):
+    """寫入進度（不會 commit，和資料放在同一個 transaction）"""
+    conn.execute(
+        "INSERT INTO checkpoints (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+        (name, json.dumps(value)),
+    )
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    conn = connect(":memory:")
+    set_checkpoint(conn, "demo", {"newest_mts": 1700000000000})
+    print(get_checkpoint(conn, "demo"))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FRR / funding stats 本地時間序列
+--------------------------------
+bitfinex_state.get_frr_history 每次只抓最新一筆，Telegram 每則訊息、
+daemon 的利率偵測與快照都各自打一次 API，也沒有任何歷史可以畫圖或當基準。
+
+這裡把 funding/stats/{symbol}/hist 同步到本地 SQLite（greenleaf_db）：
+
+1️⃣ 增量同步：只抓本地最新一筆之後的資料；第一次往回補 GREENLEAF_STATS_DAYS 天
+   （用 greenleaf_backfill 平行切區間抓取）
+2️⃣ 降採樣：同步後只重算受影響的 hour / day 區間（平均、最高、最低、最後一筆 FRR）
+3️⃣ 讀取：get_latest_frr 在本地資料超過 GREENLEAF_STATS_MAX_AGE 秒沒同步時才打 API，
+   否則直接讀本地；歷史走勢與基準讀 hour / day 彙總表
+   sync=False（Telegram 等需要立刻回覆的地方）只讀本地，沒資料或過期時
+   改打一次 get_frr_history，批次同步留給 daemon
+
+可被其他 Python 檔案 import：
+    from greenleaf_funding_stats import get_latest_frr, get_series, get_baseline
+
+    frr = get_latest_frr("fUST")                        # 與 get_frr_history 相同格式
+    frr = get_latest_frr("fUST", sync=False)            # 只讀本地，不做批次同步
+    rows = get_series("fUST", tier="hour", start=...)   # 每小時彙總
+    avg = get_baseline("fUST", days=7)                  # 7 日平均 FRR 年化 %
+
+可用環境變數或 .env 調整：
+    GREENLEAF_STATS_SYMBOLS    daemon 要同步的幣別，逗號分隔（預設 fUST）
+    GREENLEAF_STATS_DAYS       第一次同步往回補的天數（預設 30）
+    GREENLEAF_STATS_MAX_AGE    本地資料多久沒同步就重新同步（秒，預設 60）
+"""
+
+import time
+import asyncio
+import threading
+from greenleaf_config import get_config
+from greenleaf_db import connect, get_checkpoint, set_checkpoint
+
+
+DAY_MS = 86400 * 1000
+TIERS = {
+    "hour": 3600 * 1000,
+    "day": DAY_MS,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS funding_stats (
+    symbol TEXT NOT NULL,
+    mts INTEGER NOT NULL,
+    frr REAL,                      -- FRR 日利率
+    avg_period REAL,
+    amount REAL,
+    amount_used REAL,
+    PRIMARY KEY (symbol, mts)
+);
+CREATE TABLE IF NOT EXISTS funding_stats_tiers (
+    symbol TEXT NOT NULL,
+    tier TEXT NOT NULL,            -- hour / day
+    bucket INTEGER NOT NULL,       -- 區間起點（毫秒）
+    frr_avg REAL,
+    frr_min REAL,
+    frr_max REAL,
+    frr_last REAL,
+    avg_period REAL,
+    amount REAL,
+    amount_used REAL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (symbol, tier, bucket)
+);
+"""
+
+_sync_lock = threading.Lock()
+
+
+def _checkpoint_name(symbol):
+    return f"funding_stats:{symbol}"
+
+
+def _store(conn, symbol, rows):
+    conn.executemany(
+        "INSERT OR REPLACE INTO funding_stats (symbol, mts, frr, avg_period, amount, amount_used) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [(symbol, row[0], row[3], row[4], row[7], row[8]) for row in rows],
+    )
+
+
+# ---------------------------------------------------------
+# 降採樣
+# ---------------------------------------------------------
+
+def _refresh_tier(conn, symbol, tier, since):
+    """重算 bucket >= since 所在區間的彙總"""
+    step = TIERS[tier]
+    start = since // step * step
+
+    # 先依 bucket 彙總，再用 last_mts 接回原始資料取得最後一筆 FRR
+    cursor = conn.execute(
+        f"""
+        INSERT OR REPLACE INTO funding_stats_tiers
+            (symbol, tier, bucket, frr_avg, frr_min, frr_max, frr_last, avg_period, amount, amount_used, samples)
+        SELECT g.symbol, ?, g.bucket, g.frr_avg, g.frr_min, g.frr_max, s.frr,
+               g.avg_period, s.amount, s.amount_used, g.samples
+        FROM (
+            SELECT symbol, mts / {step} * {step} AS bucket, MAX(mts) AS last_mts,
+                   AVG(frr) AS frr_avg, MIN(frr) AS frr_min, MAX(frr) AS frr_max,
+                   AVG(avg_period) AS avg_period, COUNT(*) AS samples
+            FROM funding_stats WHERE symbol = ? AND mts >= ?
+            GROUP BY bucket
+        ) AS g
+        JOIN funding_stats AS s ON s.symbol = g.symbol AND s.mts = g.last_mts
+        """,
+        (tier, symbol, start),
+    )
+    return cursor.rowcount
+
+
+# ---------------------------------------------------------
+# 同步
+# ---------------------------------------------------------
+
+def sync_funding_stats(symbol="fUST", days=None, conn=None):
+    """
+    抓取本地最新一筆之後的 stats，並更新 hour / day 彙總
+    回傳新增的筆數
+    """
+    from greenleaf_backfill import backfill_history
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(SCHEMA)
+        now = int(time.time() * 1000)
+        newest = conn.execute("SELECT MAX(mts) FROM funding_stats WHERE symbol = ?", (symbol,)).fetchone()[0]
+
+        if newest is None:
+            if days is None:
+                days = get_config().get_int("GREENLEAF_STATS_DAYS", 30)
+            start = now - days * DAY_MS
+        else:
+            start = newest + 1
+
+        rows = backfill_history("stats", symbol, start=start, end=now, window_days=7) if start <= now else []
+
+        if rows:
+            _store(conn, symbol, rows)
+            since = min(row[0] for row in rows)
+            for tier in TIERS:
+                _refresh_tier(conn, symbol, tier, since)
+
+        set_checkpoint(conn, _checkpoint_name(symbol), {"synced_at": now})
+        conn.commit()
+        return len(rows)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def sync_all(symbols=None):
+    """同步多個幣別，回傳 {symbol: 新增筆數}"""
+    if symbols is None:
+        symbols = [s.strip() for s in get_config().get("GREENLEAF_STATS_SYMBOLS", "fUST").split(",") if s.strip()]
+
+    conn = connect()
+    try:
+        return {symbol: sync_funding_stats(symbol, conn=conn) for symbol in symbols}
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------
+# 讀取
+# ---------------------------------------------------------
+
+def get_latest_frr(symbol="fUST", max_age=None, sync=True):
+    """
+    最新一筆 FRR（與 bitfinex_state.get_frr_history 相同格式）
+    sync=True：本地資料超過 max_age 秒沒同步時先同步
+    sync=False：只讀本地；沒有資料或超過 max_age 秒沒同步時改用 get_frr_history（一次 REST）
+    都沒有資料時回傳 None
+    """
+    from bitfinex_state import format_frr, get_frr_history
+
+    if max_age is None:
+        max_age = get_config().get_float("GREENLEAF_STATS_MAX_AGE", 60)
+
+    conn = connect()
+    try:
+        conn.executescript(SCHEMA)
+
+        # 同時有多個查詢時只同步一次，其他查詢等同步完直接讀本地
+        with _sync_lock:
+            state = get_checkpoint(conn, _checkpoint_name(symbol), {"synced_at": 0})
+            stale = time.time() * 1000 - state["synced_at"] > max_age * 1000
+            if stale and sync:
+                sync_funding_stats(symbol, conn=conn)
+                stale = False
+
+        row = conn.execute(
+            "SELECT mts, frr, avg_period, amount, amount_used FROM funding_stats "
+            "WHERE symbol = ? ORDER BY mts DESC LIMIT 1",
+            (symbol,),
+        ).fetchone()
+    finally:
+        conn.close()
+
+    if not sync and (row is None or stale):
+        # 不寫入本地：單獨一筆會讓增量同步以為中間的資料已經抓過
+        return get_frr_history(symbol)
+    if row is None:
+        return None
+
+    mts, frr, avg_period, amount, amount_used = row
+    return format_frr([mts, None, None, frr, avg_period, None, None, amount, amount_used])
+
+
+async def get_latest_frr_async(symbol="fUST", max_age=None, sync=True):
+    return await asyncio.to_thread(get_latest_frr, symbol, max_age, sync)
+
+
+def get_series(symbol="fUST", tier="hour", start=None, end=None, conn=None):
+    """
+    tier: raw / hour / day
+    raw 回傳 [(mts, frr, avg_period, amount, amount_used), ...]
+    hour / day 回傳 [(bucket, frr_avg, frr_min, frr_max, frr_last, avg_period, amount, amount_used, samples), ...]
+    依時間由舊到新
+    """
+    if tier == "raw":
+        sql = "SELECT mts, frr, avg_period, amount, amount_used FROM funding_stats WHERE symbol = ?"
+        column = "mts"
+        params = [symbol]
+    elif tier in TIERS:
+        sql = (
+            "SELECT bucket, frr_avg, frr_min, frr_max, frr_last, avg_period, amount, amount_used, samples "
+            "FROM funding_stats_tiers WHERE symbol = ? AND tier = ?"
+        )
+        column = "bucket"
+        params = [symbol, tier]
+    else:
+        raise Exception(f"❌ 不支援的 tier：{tier}（可用 raw / {' / '.join(TIERS)}）")
+
+    if start is not None:
+        sql += f" AND {column} >= ?"
+        params.append(start)
+    if end is not None:
+        sql += f" AND {column} <= ?"
+        params.append(end)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(SCHEMA)
+        return conn.execute(sql + f" ORDER BY {column}", params).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def get_baseline(symbol="fUST", days=7, conn=None):
+    """
+    最近 days 天（不含今天）的平均 FRR 年化 %（讀 day 彙總），沒有資料時回傳 None
+    """
+    today = int(time.time() * 1000) // DAY_MS * DAY_MS
+    rows = get_series(symbol, "day", start=today - days * DAY_MS, end=today - 1, conn=conn)
+    values = [row[1] for row in rows if row[1] is not None]
+    if not values:
+        return None
+    return round(sum(values) / len(values) * 365 * 100, 4)
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    for symbol, added in sync_all().items():
+        print(f"✅ {symbol} 新增 {added} 筆")
+        print("📌 最新：", get_latest_frr(symbol))
+        print("📊 7 日平均 FRR 年化：", get_baseline(symbol), "%")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ledgers 增量同步（SQLite）
+--------------------------
+bitfinex_ledgers 每次只抓最新 25 筆利息紀錄；
+這裡把 ledgers 同步到本地 SQLite（greenleaf_db），之後利息報表直接查本地：
+
+1️⃣ 第一次：從現在往回翻頁（end = 上一頁最舊的 MTS），直到沒有更舊的資料
+2️⃣ 之後：只從現在往回翻到已經存過的時間點為止
+3️⃣ 每一頁寫入後立刻更新 checkpoint，中斷後從上次的位置繼續往回補
+4️⃣ INSERT OR IGNORE：頁與頁之間重疊的紀錄不會重複
+5️⃣ 每次寫入都記錄這次涵蓋的 MTS 範圍（dirty range），
+   greenleaf_analytics 依這個範圍重算每日彙總（中斷後補進中間的日子也會重算）
+
+ledger array：
+[ID, CURRENCY, WALLET, MTS, _, AMOUNT, BALANCE, _, DESCRIPTION]
+
+使用方式：
+    python3 greenleaf.py ledger-sync --currency UST --category 28
+
+    from greenleaf_ledger_sync import sync_ledgers, query_ledgers
+    sync_ledgers("UST", category=28)
+    rows = query_ledgers("UST", category=28, start=...)
+"""
+
+from bitfinex_ledgers import get_ledgers
+from greenleaf_db import connect, get_checkpoint, set_checkpoint
+
+
+PAGE_LIMIT = 2500   # Bitfinex ledgers 單頁上限
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledgers (
+    id INTEGER PRIMARY KEY,
+    currency TEXT NOT NULL,
+    wallet TEXT,
+    category INTEGER,
+    mts INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    balance REAL,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS ledgers_currency_category_mts ON ledgers (currency, category, mts);
+"""
+
+
+def _checkpoint_name(currency, category, wallet):
+    return f"ledgers:{currency}:{category}:{wallet}"
+
+
+def _dirty_name(currency):
+    return f"ledgers_dirty:{currency}"
+
+
+def _mark_dirty(conn, currency, rows):
+    """把 rows 的 MTS 範圍併入尚未彙總的範圍（與寫入同一個 transaction）"""
+    mts = [row[3] for row in rows]
+    dirty = get_checkpoint(conn, _dirty_name(currency))
+    if dirty is not None:
+        mts += [dirty["min_mts"], dirty["max_mts"]]
+    set_checkpoint(conn, _dirty_name(currency), {"min_mts": min(mts), "max_mts": max(mts)})
+
+
+def pop_dirty_range(conn, currency):
+    """
+    取出並清除尚未彙總的 MTS 範圍，回傳 (min_mts, max_mts) 或 None
+    呼叫端在同一個 transaction 內重算後 commit
+    """
+    dirty = get_checkpoint(conn, _dirty_name(currency))
+    if dirty is None:
+        return None
+    conn.execute("DELETE FROM checkpoints WHERE name = ?", (_dirty_name(currency),))
+    return dirty["min_mts"], dirty["max_mts"]
+
+
+def _store(conn, rows, category):
+    if not rows:
+        return
+    _mark_dirty(conn, rows[0][1], rows)
+    conn.executemany(
+        "INSERT OR IGNORE INTO ledgers (id, currency, wallet, category, mts, amount, balance, description) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(row[0], row[1], row[2], category, row[3], row[5], row[6], row[8] if len(row) > 8 else None)
+         for row in rows],
+    )
+
+
+def _count(conn, currency, category):
+    return conn.execute(
+        "SELECT COUNT(*) FROM ledgers WHERE currency = ? AND category = ?", (currency, category)
+    ).fetchone()[0]
+
+
+def _page_back(fetch, end, stop_mts, on_page):
+    """
+    從 end 往回翻頁，直到資料用完或碰到 stop_mts（含）為止
+    回傳 True 表示已經翻到最舊的資料
+    """
+    while True:
+        rows = fetch(end)
+        if not rows:
+            return True
+
+        on_page(rows)
+
+        oldest = min(row[3] for row in rows)
+        if stop_mts is not None and oldest <= stop_mts:
+            return False
+        if len(rows) < PAGE_LIMIT:
+            return True
+
+        # 下一頁從 oldest 開始（含），同一毫秒剩下的紀錄會一起抓到，重疊的由 INSERT OR IGNORE 去重；
+        # 整頁都是同一毫秒時只能往前推 1ms，該毫秒超過一頁的部分會缺漏
+        if oldest == max(row[3] for row in rows):
+            print(f"⚠️ ledgers {oldest} 同一毫秒超過 {PAGE_LIMIT} 筆，部分資料可能缺漏")
+            end = oldest - 1
+        else:
+            end = oldest
+
+
+def sync_ledgers(currency="UST", category=28, wallet="funding", conn=None):
+    """
+    同步 ledgers 到本地資料庫，回傳新增的筆數
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(SCHEMA)
+        name = _checkpoint_name(currency, category, wallet)
+        state = get_checkpoint(conn, name, {"newest_mts": None, "oldest_mts": None, "complete": False})
+        before = _count(conn, currency, category)
+
+        def fetch(end):
+            return get_ledgers(currency, category, wallet, limit=PAGE_LIMIT, end=end)
+
+        def store_new(rows):
+            _store(conn, rows, category)
+            conn.commit()
+
+        # 1️⃣ 上次同步之後的新紀錄（翻到 newest_mts 為止）
+        if state["newest_mts"] is not None:
+            top = None
+
+            def on_new_page(rows):
+                nonlocal top
+                top = max(top or 0, max(row[3] for row in rows))
+                store_new(rows)
+
+            _page_back(fetch, None, state["newest_mts"], on_new_page)
+            if top is not None:
+                state["newest_mts"] = max(state["newest_mts"], top)
+                set_checkpoint(conn, name, state)
+                conn.commit()
+
+        # 2️⃣ 還沒補完的舊紀錄（從 oldest_mts 繼續往回）；
+        #    本地還沒有任何紀錄（newest_mts 為 None）時每次都從現在往回翻
+        if not state["complete"] or state["newest_mts"] is None:
+            def on_old_page(rows):
+                mts = [row[3] for row in rows]
+                if state["newest_mts"] is None:
+                    state["newest_mts"] = max(mts)
+                state["oldest_mts"] = min(mts) if state["oldest_mts"] is None else min(state["oldest_mts"], *mts)
+                _store(conn, rows, category)
+                set_checkpoint(conn, name, state)
+                conn.commit()
+
+            reached_end = _page_back(fetch, state["oldest_mts"], None, on_old_page)
+            # 一筆都沒抓到時不標記完成，否則之後的新紀錄永遠不會被同步
+            state["complete"] = reached_end and state["newest_mts"] is not None
+            set_checkpoint(conn, name, state)
+            conn.commit()
+
+        return _count(conn, currency, category) - before
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def query_ledgers(currency="UST", category=28, start=None, end=None, conn=None):
+    """
+    查詢本地 ledgers（MTS 由舊到新）
+    回傳 [(id, mts, amount, balance, description), ...]
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.executescript(SCHEMA)
+        sql = "SELECT id, mts, amount, balance, description FROM ledgers WHERE currency = ? AND category = ?"
+        params = [currency, category]
+        if start is not None:
+            sql += " AND mts >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND mts <= ?"
+            params.append(end)
+        return conn.execute(sql + " ORDER BY mts", params).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    added = sync_ledgers("UST", category=28)
+    rows = query_ledgers("UST", category=28)
+    print(f"✅ 同步完成，新增 {added} 筆，本地共 {len(rows)} 筆利息紀錄")
+    if rows:
+        print("📌 最新一筆：", rows[-1])
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+高利率偵測（遲滯 + 冷卻時間）
+----------------------------
+利率飆高時原本只能手動在 Telegram 輸入「查詢利率」；
+RateDetector 在每次訂單簿更新時計算各天數區間（band）的最高 APR，
+並與排序好的門檻列表比較：
+
+1️⃣ 門檻用 bisect 找出目前跨過幾個門檻，每次更新每個 band 只需 O(log 門檻數)
+2️⃣ 遲滯：往上跨過門檻時通知；要跌到「門檻 - hysteresis」以下才算離開，
+   在門檻附近來回跳動不會重複通知
+3️⃣ 冷卻時間：同一個 band、同一個門檻在 cooldown 秒內只通知一次
+4️⃣ FRR（get_frr_history）視為一個獨立的 band
+
+每次更新只建一次 AprIndex，所有 band 都用它查詢。
+
+可用環境變數或 .env 調整：
+    GREENLEAF_RATE_THRESHOLDS   APR 門檻（%），逗號分隔（預設 15,20,30）
+    GREENLEAF_RATE_BANDS        天數區間，逗號分隔（預設 2-30,31-120）
+    GREENLEAF_RATE_HYSTERESIS   遲滯幅度（APR %，預設 1）
+    GREENLEAF_RATE_COOLDOWN     冷卻秒數（預設 1800）
+    GREENLEAF_RATE_MIN_AMOUNT   只看金額 >= 此值的訂單（預設 0）
+
+使用方法：
+    from greenleaf_rate_detector import RateDetector
+
+    detector = RateDetector.from_config()
+    for alert in detector.evaluate(get_orderbook(), get_frr_history()):
+        print(alert["text"])
+"""
+
+import time
+from bisect import bisect_right
+from bitfinex_rate_selector import AprIndex
+from greenleaf_config import get_config
+
+
+FRR_BAND = "FRR"
+
+
+def _parse_bands(text):
+    """"2-30,31-120" → [("2-30天", 2, 30), ("31-120天", 31, 120)]"""
+    bands = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        low, high = int(low), int(high or low)
+        bands.append((f"{low}-{high}天", low, high))
+    return bands
+
+
+class RateDetector:
+    def __init__(self, thresholds, bands, hysteresis=1.0, cooldown=1800.0, min_amount=None):
+        """
+        thresholds: APR 門檻（%）
+        bands: [(名稱, min_period, max_period), ...]
+        """
+        self.thresholds = sorted(thresholds)
+        self.bands = list(bands)
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.min_amount = min_amount
+        self._levels = {}      # band 名稱 -> 目前跨過的門檻數
+        self._fired_at = {}    # (band 名稱, 門檻) -> 上次通知時間
+
+    @classmethod
+    def from_config(cls):
+        config = get_config()
+        thresholds = [float(x) for x in config.get("GREENLEAF_RATE_THRESHOLDS", "15,20,30").split(",") if x.strip()]
+        return cls(
+            thresholds,
+            _parse_bands(config.get("GREENLEAF_RATE_BANDS", "2-30,31-120")),
+            hysteresis=config.get_float("GREENLEAF_RATE_HYSTERESIS", 1.0),
+            cooldown=config.get_float("GREENLEAF_RATE_COOLDOWN", 1800.0),
+            min_amount=config.get_float("GREENLEAF_RATE_MIN_AMOUNT", 0.0) or None,
+        )
+
+    # -----------------------------
+    # 門檻判斷
+    # -----------------------------
+
+    def observe(self, band, apr, detail=None, now=None):
+        """
+        單一 band 的最新 APR
+        跨過新的門檻（且不在冷卻中）時回傳通知 dict，否則回傳 None
+        """
+        if now is None:
+            now = time.time()
+
+        level = self._levels.get(band, 0)
+
+        if apr is None:
+            up, down = 0, 0
+        else:
+            up = bisect_right(self.thresholds, apr)
+            down = bisect_right(self.thresholds, apr + self.hysteresis)
+
+        if up > level:
+            self._levels[band] = up
+            threshold = self.thresholds[up - 1]
+            last = self._fired_at.get((band, threshold))
+            if last is not None and now - last < self.cooldown:
+                return None
+            self._fired_at[(band, threshold)] = now
+
+            text = f"🔥 高利率：{band} 年化 {apr:.2f}% ≥ {threshold:g}%"
+            if detail:
+                text += f"（{detail}）"
+            return {"band": band, "apr": apr, "threshold": threshold, "text": text}
+
+        if down < level:
+            self._levels[band] = down
+        return None
+
+    def evaluate(self, orderbook, frr=None, now=None):
+        """
+        orderbook: get_orderbook() / FundingBook / 即時訂單簿 rows()
+        frr: get_frr_history() / get_latest_frr() 的結果（可省略）
+             有 baseline_percent（greenleaf_funding_stats.get_baseline）時一併顯示在通知裡
+        回傳這次更新產生的通知 list
+        """
+        index = AprIndex(orderbook)
+        alerts = []
+
+        for name, min_period, max_period in self.bands:
+            best = index.query(min_period, max_period, self.min_amount)
+            if best is None:
+                alert = self.observe(name, None, now=now)
+            else:
+                detail = f"{best[1]}天，金額 {abs(best[3]):.2f} UST"
+                alert = self.observe(name, best[4], detail, now=now)
+            if alert:
+                alerts.append(alert)
+
+        if frr:
+            # daily_frr_percent 已經是 frr * 365 * 100，也就是年化 %
+            baseline = frr.get("baseline_percent")
+            detail = f"7 日平均 {baseline:.2f}%" if baseline is not None else None
+            alert = self.observe(FRR_BAND, frr["daily_frr_percent"], detail, now=now)
+            if alert:
+                alerts.append(alert)
+
+        return alerts
+
+    def book_listener(self, on_alert, frr_getter=None):
+        """
+        產生 BookMessageHandler 的 listener：每次訂單簿更新都重新判斷
+        on_alert: 收到通知 dict 的 callback
+        frr_getter: 回傳最新 FRR 的函式（可省略）
+        """
+        def listener(book, payload):
+            if not book.synced:
+                return
+            frr = frr_getter() if frr_getter else None
+            for alert in self.evaluate(book.rows(), frr):
+                on_alert(alert)
+        return listener
+
+
+# ---------------------------------------------------------
+# 測試用
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    detector = RateDetector([15, 20, 30], [("2-30天", 2, 30)], hysteresis=1.0, cooldown=60)
+
+    def book(apr):
+        rate = apr / 365 / 100
+        return [[rate, 20, 1, -1000, round(apr, 2)]]
+
+    t = 0
+    for apr in [10, 15.5, 14.8, 15.2, 13.9, 15.1, 21, 35, 19]:
+        t += 30
+        alerts = detector.evaluate(book(apr), now=t)
+        print(f"APR {apr:5.1f}% →", [a["text"] for a in alerts])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+帳戶快照（紀錄介面：總金額、餘額、每日快照）
+--------------------------------------------
+每次快照記錄一筆固定欄位，存在 ColumnStore（NumPy memmap）：
+
+    mts            快照時間（毫秒）
+    balance        funding UST 總額
+    available      可用餘額（閒置）
+    lent           放貸中金額（credits + loans）
+    offered        掛單中金額
+    yield_lend     平均放貸日利率（bitfinex_fundinginfo）
+    duration_lend  平均放貸天數
+    frr            市場 FRR 年化 %（greenleaf_funding_stats）
+
+由 greenleaf_daemon 的 snapshot 工作定期寫入；
+讀取一年份的分鐘快照只是 memmap + searchsorted，不必解析任何 JSON。
+
+可被其他 Python 檔案 import：
+    from greenleaf_snapshots import get_snapshot_store, take_snapshot
+
+    rows = get_snapshot_store().range(start_mts, end_mts)
+    print(rows["balance"][-1], rows["lent"].mean())
+
+資料位置：GREENLEAF_DATA_DIR（預設 data）/snapshots
+"""
+
+import os
+import time
+import asyncio
+from greenleaf_config import get_config
+
+
+SNAPSHOT_FIELDS = [
+    ("mts", "i8"),
+    ("balance", "f8"),
+    ("available", "f8"),
+    ("lent", "f8"),
+    ("offered", "f8"),
+    ("yield_lend", "f8"),
+    ("duration_lend", "f8"),
+    ("frr", "f8"),
+]
+
+_store = None
+
+
+def get_data_dir():
+    return get_config().get("GREENLEAF_DATA_DIR", "data")
+
+
+def get_snapshot_store():
+    global _store
+
+    if _store is None:
+        from greenleaf_columnstore import ColumnStore
+        _store = ColumnStore(os.path.join(get_data_dir(), "snapshots"), SNAPSHOT_FIELDS)
+    return _store
+
+
+async def collect_snapshot(symbol="fUST"):
+    """同時查詢所有快照欄位，回傳 dict"""
+    from bitfinex_async import (
+        get_wallets_async,
+        get_funding_offers_async,
+        get_funding_credits_async,
+        get_funding_loans_async,
+        get_funding_info_async,
+    )
+    from greenleaf_funding_stats import get_latest_frr_async
+
+    currency = symbol[1:]
+    wallets, offers, credits, loans, info, frr = await asyncio.gather(
+        get_wallets_async(),
+        get_funding_offers_async(),
+        get_funding_credits_async(symbol),
+        get_funding_loans_async(symbol),
+        get_funding_info_async(symbol),
+        get_latest_frr_async(symbol),
+    )
+
+    funding = next((item for item in wallets if item[0] == "funding" and item[1] == currency), None)
+    nan = float("nan")
+
+    return {
+        "mts": int(time.time() * 1000),
+        "balance": funding[2] if funding else nan,
+        "available": funding[4] if funding and funding[4] is not None else nan,
+        "lent": sum(abs(item["amount"]) for item in credits["items"] + loans["items"]),
+        "offered": sum(offer[4] for offer in offers),
+        "yield_lend": info["yield_lend"] if info["yield_lend"] is not None else nan,
+        "duration_lend": info["duration_lend"] if info["duration_lend"] is not None else nan,
+        # daily_frr_percent 已經是 frr * 365 * 100，也就是年化 %
+        "frr": frr["daily_frr_percent"] if frr else nan,
+    }
+
+
+async def take_snapshot(symbol="fUST"):
+    """查詢並寫入一筆快照，回傳該筆 dict"""
+    snapshot = await collect_snapshot(symbol)
+    await asyncio.to_thread(get_snapshot_store().append, [snapshot])
+    return snapshot
+
+
+# ---------------------------------------------------------
+# 可直接執行
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    snapshot = asyncio.run(take_snapshot())
+    print("📸 快照：", snapshot)
+    print("📊 共", len(get_snapshot_store()), "筆")
@@ -1,92 +1,161 @@
-from bitfinex_wallets_reader import get_wallets
+import asyncio
+
 from bitfinex_wallets_reader import get_funding_ust_values
-from bitfinex_orderbook import get_orderbook
+from bitfinex_async import get_wallets_async, get_funding_offers_async
+from bitfinex_ws_book import get_orderbook_fast
 from bitfinex_rate_selector import find_max_apr
-from bitfinex_funding_submit_offer import submit_funding_order
+from bitfinex_depth import DepthLadder
+from bitfinex_funding_submit_offer import submit_funding_orders
+from bitfinex_offer_reconciler import reconcile as reconcile_offers, offers_total
 
 # -----------------------------
-# 流程1：檢查餘額
+# 切分批次
 # -----------------------------
-wallets = get_wallets()
-balance = get_funding_ust_values(wallets)
+def plan_batches(balance, batch_size=200, min_chunk=150):
+    """
+    先切成 batch_size 的分段，最後一筆 < min_chunk 時併入上一筆
+    例如 balance=650 → [200, 200, 250]
+    """
+    batch_list = []
+    remaining = balance
 
-if not balance:
-    raise ValueError("❌ 找不到 funding UST 餘額資料")
+    while remaining > 0:
+        if remaining > batch_size:
+            batch_list.append(batch_size)
+            remaining -= batch_size
+        else:
+            batch_list.append(remaining)
+            remaining = 0
 
-current_balance = balance[0]
-print("📡 取得 Bitfinex 餘額資料:", current_balance)
+    if len(batch_list) > 1 and batch_list[-1] < min_chunk:
+        batch_list[-2] += batch_list[-1]
+        batch_list.pop()  # 移除最後一筆（已併入）
 
-# -----------------------------
-# 流程2：取得訂單簿
-# -----------------------------
-orderbook = get_orderbook("fUST", "P1", 25)
-print("📡 取得 Bitfinex Orderbook ...\n")
+    return batch_list
 
-# -----------------------------
-# 流程3：找到最高 APR
-# -----------------------------
-bestRate = find_max_apr(orderbook, 30)
-print("最高 APR:", bestRate)
 
 # -----------------------------
-# 流程4：批次掛單
+# 流程1 + 流程2：同時取得餘額與訂單簿
 # -----------------------------
-if current_balance > 150 and bestRate:
-    print("✅ 執行批次掛單")
+async def _fetch_wallets_and_orderbook(with_offers=False):
+    tasks = [get_wallets_async(), get_orderbook_fast("fUST", "P1", 25)]
+    if with_offers:
+        tasks.append(get_funding_offers_async())
+    return await asyncio.gather(*tasks)
 
-    rate = bestRate[0]
-    period = bestRate[1]
 
-    batch_size = 200
-    remaining = current_balance
+def run(depth_aware=False, reconcile=False):
+    """
+    depth_aware: True 時依訂單簿深度替每一筆分批金額定價，
+                 超出借款需求深度的部分才使用最高 APR 的利率
+    reconcile: True 時把目前掛單的金額一起算進去，
+               只取消 / 補送與目標掛單不同的部分（不必先取消所有掛單）
+    已經在 event loop 裡（例如 greenleaf_daemon）請改用 await run_async(...)
+    """
+    asyncio.run(run_async(depth_aware, reconcile))
 
-    offer_results = []
-    batch_list = []
+
+async def run_async(depth_aware=False, reconcile=False):
+    fetched = await _fetch_wallets_and_orderbook(with_offers=reconcile)
+    wallets, orderbook = fetched[0], fetched[1]
+    offers = fetched[2] if reconcile else []
 
     # -----------------------------
-    # 先切成 200 的分段
+    # 流程1：檢查餘額
     # -----------------------------
-    while remaining > 0:
-        if remaining > batch_size:
-            batch_list.append(batch_size)
-            remaining -= batch_size
-        else:
-            batch_list.append(remaining)
-            remaining = 0
+    balance = get_funding_ust_values(wallets)
+
+    if not balance:
+        raise ValueError("❌ 找不到 funding UST 餘額資料")
+
+    current_balance = balance[0]
+    print("📡 取得 Bitfinex 餘額資料:", current_balance)
+
+    if reconcile:
+        current_balance += offers_total(offers)
+        print(f"📡 目前掛單 {len(offers)} 筆，可重新分配總額:", current_balance)
 
     # -----------------------------
-    # 處理「最後一筆 <150」→ 併入上一筆
+    # 流程2：取得訂單簿
     # -----------------------------
-    if batch_list[-1] < 150 and len(batch_list) > 1:
-        batch_list[-2] += batch_list[-1]
-        batch_list.pop()  # 移除最後一筆（已併入）
+    print("📡 取得 Bitfinex Orderbook ...\n")
 
     # -----------------------------
-    # 逐筆掛單
+    # 流程3：找到最高 APR
     # -----------------------------
-    for amount in batch_list:
-        print(f"📌 掛單中: {amount} UST @ rate={rate}, period={period}")
-        api_result = submit_funding_order(amount=amount, rate=rate, period=period)
-        offer_results.append(api_result)
-
-    print("\n==============================")
-    print("📦 批次掛單完成")
-    print("==============================")
+    bestRate = find_max_apr(orderbook, 30)
+    print("最高 APR:", bestRate)
 
     # -----------------------------
-    # 輸出結果
+    # 流程4：批次掛單
     # -----------------------------
-    for idx, result in enumerate(offer_results):
-        status = result[6]        # SUCCESS
-        description = result[7]   # 說明
-        print(f"第 {idx+1} 筆 | 狀態: {status} | 說明: {description}")
-
-else:
-    print("⚠️ 不符合掛單條件")
+    if current_balance > 150 and bestRate:
+        print("✅ 執行批次掛單")
+
+        rate = bestRate[0]
+        period = bestRate[1]
+
+        batch_list = plan_batches(current_balance)
+
+        # -----------------------------
+        # 依深度替每一筆定價（可選）
+        # -----------------------------
+        if depth_aware:
+            priced = DepthLadder(orderbook).price_chunks(batch_list, max_period=30)
+            orders = [
+                (p["amount"], p["rate"] or rate, p["period"] or period)
+                for p in priced
+            ]
+        else:
+            orders = [(amount, rate, period) for amount in batch_list]
+
+        # -----------------------------
+        # 只調整有差異的掛單
+        # -----------------------------
+        if reconcile:
+            summary = await asyncio.to_thread(reconcile_offers, orders, offers=offers)
+            print(f"\n✅ 保留 {summary['kept']} 筆掛單")
+            for offer_id, result in summary["cancelled"]:
+                status = "ERROR" if isinstance(result, Exception) else result[6]
+                print(f"🗑️ 取消 {offer_id} | 狀態: {status}")
+            for (amount, chunk_rate, chunk_period), result in summary["submitted"]:
+                if isinstance(result, Exception):
+                    print(f"📌 {amount} UST @ rate={chunk_rate}, period={chunk_period} | 狀態: ERROR | 說明: {result}")
+                else:
+                    print(f"📌 {amount} UST @ rate={chunk_rate}, period={chunk_period} | 狀態: {result[6]} | 說明: {result[7]}")
+            return
+
+        # -----------------------------
+        # 同時送出所有掛單
+        # -----------------------------
+        for amount, chunk_rate, chunk_period in orders:
+            print(f"📌 掛單中: {amount} UST @ rate={chunk_rate}, period={chunk_period}")
+        offer_results = await asyncio.to_thread(submit_funding_orders, orders)
+
+        print("\n==============================")
+        print("📦 批次掛單完成")
+        print("==============================")
+
+        # -----------------------------
+        # 輸出結果
+        # -----------------------------
+        for idx, result in enumerate(offer_results):
+            if isinstance(result, Exception):
+                print(f"第 {idx+1} 筆 | 狀態: ERROR | 說明: {result}")
+                continue
+            status = result[6]        # SUCCESS
+            description = result[7]   # 說明
+            print(f"第 {idx+1} 筆 | 狀態: {status} | 說明: {description}")
+
+    else:
+        print("⚠️ 不符合掛單條件")
+
+
+if __name__ == "__main__":
+    run()
 
 
 
 # 流程2
 # 發現高利率 -> # 取消所有掛單 -> # 檢查餘額 -> # 執行掛單
 
-
@@ -10,40 +10,51 @@ Bitfinex Funding Balance Telegram Alert
 功能：
 1. 呼叫 bitfinex_wallets_reader.get_wallets()
 2. 篩選 funding/UST 餘額
-3. 若有任一餘額 > 150，發送 Telegram 通知
+3. 餘額由門檻以下變成超過門檻時，發送一次 Telegram 通知
+4. 比對放貸狀態，通知放款成功與還款
+（狀態存在 greenleaf_alerts 的 JSON 檔，cron 重複執行不會重複通知）
 """
 
-import os
-import requests
-from dotenv import load_dotenv
+from bitfinex_client import http_post
 from bitfinex_wallets_reader import get_wallets, get_funding_ust_values
-
-# ---------------------------------------------------------
-# 讀取 .env
-# ---------------------------------------------------------
-load_dotenv()
-
-TELEGRAM_BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TG_CHAT_ID")
-
-if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-    raise ValueError("❌ TG_BOT_TOKEN 或 TG_CHAT_ID 未設定，請確認 .env")
+from greenleaf_config import get_config
 
 # ---------------------------------------------------------
 # 發送 Telegram 訊息
 # ---------------------------------------------------------
 def send_telegram_message(text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    token, chat_id = get_config().require(
+        "TG_BOT_TOKEN", "TG_CHAT_ID",
+        message="❌ TG_BOT_TOKEN 或 TG_CHAT_ID 未設定，請確認 .env"
+    )
+
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
+        "chat_id": chat_id,
         "text": text
     }
-    requests.post(url, json=payload)
+    response = http_post(url, json=payload)
+
+    # 失敗時丟出例外，讓 AlertEngine 把通知放回待送，而不是記成已送出
+    try:
+        ok = response.json().get("ok", False)
+    except ValueError:
+        ok = False
+    if response.status_code != 200 or not ok:
+        raise Exception(f"❌ Telegram 傳送失敗：{response.status_code}\n{response.text}")
 
 # ---------------------------------------------------------
 # 主流程
 # ---------------------------------------------------------
-def check_funding_balance(threshold=1):
+def check_funding_balance(threshold=1, engine=None):
+    """
+    engine: 共用的 AlertEngine（例如 greenleaf_daemon），None 時建立一個
+    """
+    from greenleaf_alerts import AlertEngine, poll_positions
+
+    if engine is None:
+        engine = AlertEngine()
+
     wallets = get_wallets()
     values = get_funding_ust_values(wallets)
 
@@ -51,14 +62,18 @@ def check_funding_balance(threshold=1):
         print("⚠️ 找不到任何 funding/UST 資料")
         return
 
-    for v in values:
+    for idx, v in enumerate(values):
+        msg = f"🚨 Funding UST 餘額警告：{v} (> {threshold})"
+        if engine.observe_level(f"balance:{idx}", v > threshold, msg):
+            continue
         if v > threshold:
-            msg = f"🚨 Funding UST 餘額警告：{v} (> {threshold})"
-            print(msg)
-            send_telegram_message(msg)
+            print(f"ℹ️ {v} 仍大於 {threshold}，已通知過")
         else:
             print(f"✅ {v} 小於 {threshold}，不通知")
 
+    poll_positions(engine)
+    engine.flush()
+
 # ---------------------------------------------------------
 # 可直接執行
 # ---------------------------------------------------------
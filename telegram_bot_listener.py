@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+import asyncio
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 
-from bitfinex_wallets_reader import get_wallets, get_funding_ust_values
-from bitfinex_funding_credits import get_funding_credits
-from bitfinex_funding_loan import get_funding_loans
-from bitfinex_state import get_frr_history
-from bitfinex_orderbook import get_orderbook, get_top5_rates  # <- 新增匯入
-
-TELEGRAM_TOKEN = os.getenv("TG_BOT_TOKEN")
-
-if not TELEGRAM_TOKEN:
-    raise ValueError("❌ 未設定 TG_BOT_TOKEN，請放在 .env 或環境變數")
+from bitfinex_wallets_reader import get_funding_ust_values
+from bitfinex_orderbook import get_top5_rates
+from bitfinex_async import (
+    get_wallets_async,
+    get_funding_credits_async,
+    get_funding_loans_async,
+)
+from greenleaf_funding_stats import get_latest_frr_async
+from bitfinex_ws_book import FundingBookSubscriber, get_orderbook_fast
+from greenleaf_config import get_config
 
 # ✅ /start 指令
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -35,7 +35,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if text == "查詢餘額":
         await update.message.reply_text("📡 正在查詢 Bitfinex 餘額...")
         try:
-            wallets = get_wallets()
+            wallets = await get_wallets_async()
             values = get_funding_ust_values(wallets)
 
             if not values:
@@ -52,9 +52,13 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif text == "查詢放貸":
         await update.message.reply_text("📡 正在查詢放貸中，請稍候...")
         try:
-            credits = get_funding_credits("fUST")
-            loans = get_funding_loans("fUST")
-            frr = get_frr_history("fUST")
+            # 三個查詢互不相依，同時送出（FRR 只讀本地時間序列，同步交給 daemon）
+            credits, loans, frr = await asyncio.gather(
+                get_funding_credits_async("fUST"),
+                get_funding_loans_async("fUST"),
+                get_latest_frr_async("fUST", sync=False),
+            )
+            frr = frr or {"daily_frr_percent": "-", "annual_frr_percent": "-"}
 
             msg = (
                 "📌 **fUST 放貸狀況**\n\n"
@@ -83,12 +87,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif text == "查詢利率":
         await update.message.reply_text("📡 正在查詢利率前五名，請稍候...")
         try:
-            # 取得整理過的 orderbook
-            orderbook = get_orderbook("fUST", "P1", 25)
+            # 取得整理過的 orderbook 與 FRR（同時送出）
+            orderbook, frr = await asyncio.gather(
+                get_orderbook_fast("fUST", "P1", 25),
+                get_latest_frr_async("fUST", sync=False),
+            )
+            frr = frr or {"daily_frr_percent": "-", "annual_frr_percent": "-"}
             top5 = get_top5_rates(orderbook)
 
-            frr = get_frr_history("fUST")
-
             msg = f"📊 查詢訂單簿：市場frr : {frr['daily_frr_percent']}%, 年化: {frr['annual_frr_percent']}% \n\n"
             for i, t in enumerate(top5, start=1):
                 msg += (
@@ -113,9 +119,15 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "📌 查詢利率"
         )
 
+# ✅ 啟動即時訂單簿（查詢利率直接讀記憶體）
+async def start_orderbook_stream(app):
+    subscriber = FundingBookSubscriber("fUST", "P1", 25)
+    app.bot_data["orderbook_task"] = asyncio.create_task(subscriber.run())
+
 # ✅ 主程式
 def main():
-    app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    token = get_config().require("TG_BOT_TOKEN", message="❌ 未設定 TG_BOT_TOKEN，請放在 .env 或環境變數")
+    app = ApplicationBuilder().token(token).post_init(start_orderbook_stream).build()
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))